@@ -0,0 +1,129 @@
+import datetime
+import threading
+from typing import Dict, Optional
+
+from apscheduler.schedulers.base import BaseScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from pydantic import BaseModel
+from sqlmodel import Session
+
+from src.config import (
+    ADAPTIVE_SCHEDULING_ENABLED,
+    ADAPTIVE_TARGET_ITEMS_PER_POLL,
+    ADAPTIVE_EWMA_ALPHA,
+    ADAPTIVE_MAX_GROWTH,
+    ADAPTIVE_BURST_HOLD_MINUTES,
+)
+from src.database import engine
+from src.scrapers.registry import get_scraper_settings
+from src.source_state import load_source_states, get_or_create_state
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.adaptive")
+
+class RateState(BaseModel):
+    """单个来源的到达速率估计"""
+    interval_minutes: float  # 当前抓取间隔
+    rate: float = 0.0  # 新快讯到达速率 (条/分钟，指数加权平均)
+    last_observed: Optional[datetime.datetime] = None
+    burst_until: Optional[datetime.datetime] = None  # 高危命中后保持最短间隔的截止时间
+
+def compute_interval(state: RateState, min_minutes: float, max_minutes: float, now: datetime.datetime) -> float:
+    """
+    根据到达速率计算下一轮抓取间隔:
+    - 目标是每轮平均抓到 ADAPTIVE_TARGET_ITEMS_PER_POLL 条新快讯 (间隔 = 目标条数 / 速率)
+    - 高危命中后的保持期内固定为最短间隔
+    - 缩短立即生效；延长每轮最多放大 ADAPTIVE_MAX_GROWTH 倍，避免突发结束后立刻放松
+    """
+    if state.burst_until and now < state.burst_until:
+        return min_minutes
+    if state.rate > 0:
+        target = ADAPTIVE_TARGET_ITEMS_PER_POLL / state.rate
+    else:
+        target = max_minutes
+    target = min(target, state.interval_minutes * ADAPTIVE_MAX_GROWTH)
+    return round(max(min_minutes, min(max_minutes, target)), 2)
+
+class AdaptiveScheduler:
+    """
+    自适应抓取调度: 在 APScheduler 之上按来源观测新 ScanRecord 的到达速率，
+    在配置的 [min_interval_minutes, max_interval_minutes] 范围内调整 monitor_<source> 任务的间隔。
+    选定的间隔与速率持久化到 source_state，重启后沿用，并在仪表盘展示。
+    """
+
+    def __init__(self) -> None:
+        self._scheduler: Optional[BaseScheduler] = None
+        self._states: Dict[str, RateState] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, scheduler: BaseScheduler) -> None:
+        self._scheduler = scheduler
+
+    def initial_interval(self, source: str) -> float:
+        """启动时的抓取间隔: 优先沿用上次持久化的间隔"""
+        settings = get_scraper_settings(source)
+        interval = settings.interval_minutes
+        rate = 0.0
+        if ADAPTIVE_SCHEDULING_ENABLED:
+            state = load_source_states([source]).get(source)
+            if state and state.interval_seconds:
+                interval = max(settings.min_interval_minutes, min(settings.max_interval_minutes, state.interval_seconds / 60))
+                rate = state.arrival_rate or 0.0
+        with self._lock:
+            self._states[source] = RateState(interval_minutes=interval, rate=rate)
+        return interval
+
+    def observe(self, source: str, new_scan_records: int, high_risk: bool = False) -> None:
+        """
+        记录一轮成功抓取的结果 (本轮新写入的 ScanRecord 数、是否命中高危类别)，必要时调整任务间隔。
+        已扫描过、被去重跳过的条目不计入；抓取失败的轮次不应调用。
+        """
+        if not ADAPTIVE_SCHEDULING_ENABLED:
+            return
+        settings = get_scraper_settings(source)
+        now = datetime.datetime.now()
+
+        with self._lock:
+            state = self._states.setdefault(source, RateState(interval_minutes=settings.interval_minutes))
+            elapsed = state.interval_minutes
+            if state.last_observed:
+                elapsed = max((now - state.last_observed).total_seconds() / 60, 0.1)
+            observed_rate = new_scan_records / elapsed
+            if state.last_observed is None and state.rate == 0:
+                state.rate = observed_rate
+            else:
+                state.rate = ADAPTIVE_EWMA_ALPHA * observed_rate + (1 - ADAPTIVE_EWMA_ALPHA) * state.rate
+            state.last_observed = now
+            if high_risk:
+                state.burst_until = now + datetime.timedelta(minutes=ADAPTIVE_BURST_HOLD_MINUTES)
+
+            previous = state.interval_minutes
+            state.interval_minutes = compute_interval(
+                state, settings.min_interval_minutes, settings.max_interval_minutes, now
+            )
+            interval, rate = state.interval_minutes, state.rate
+
+        self._persist(source, interval, rate)
+        if interval != previous:
+            self._reschedule(source, interval)
+            reason = "命中高危标签" if high_risk else f"到达速率 {rate:.2f} 条/分钟"
+            logger.info(f"[{source}] 抓取间隔调整: {previous} -> {interval} 分钟 ({reason})")
+
+    def _persist(self, source: str, interval_minutes: float, rate: float) -> None:
+        with Session(engine) as session:
+            state = get_or_create_state(session, source)
+            state.interval_seconds = int(interval_minutes * 60)
+            state.arrival_rate = round(rate, 4)
+            session.add(state)
+            session.commit()
+
+    def _reschedule(self, source: str, interval_minutes: float) -> None:
+        if self._scheduler is None:
+            return
+        job_id = f"monitor_{source}"
+        try:
+            self._scheduler.reschedule_job(job_id, trigger=IntervalTrigger(seconds=int(interval_minutes * 60)))
+        except Exception as e:
+            logger.warning(f"[{source}] 调整任务间隔失败: {e}")
+
+adaptive_scheduler = AdaptiveScheduler()
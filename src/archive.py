@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import zstandard
+from pydantic import BaseModel
+
+from src import config
+from src.scrapers.base import RawNews
+from src.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: 仅靠进程内锁
+    fcntl = None
+
+logger = setup_logger("sentinel.archive")
+
+# 进程内写锁 (跨进程由 flock 保证)
+_write_lock = threading.Lock()
+
+class FrameIndex(BaseModel):
+    """分段文件中一个 zstd 帧的索引 (时间索引，按发布时间过滤时跳过无关帧)"""
+    offset: int
+    length: int
+    count: int
+    min_pub_time: datetime
+    max_pub_time: datetime
+
+def _segment_paths(day: date, directory: Optional[str] = None) -> Tuple[str, str]:
+    base = os.path.join(directory or config.ARCHIVE_DIR, day.isoformat())
+    return f"{base}.zst", f"{base}.idx"
+
+def _append_frame(day: date, items: List[RawNews], directory: Optional[str] = None) -> None:
+    """将同一天的条目压缩为一个独立的 zstd 帧追加到当日分段，并追加一行索引"""
+    data_path, index_path = _segment_paths(day, directory)
+    payload = "".join(item.model_dump_json() + "\n" for item in items).encode("utf-8")
+    frame = zstandard.ZstdCompressor(level=config.ARCHIVE_ZSTD_LEVEL).compress(payload)
+    pub_times = [item.pub_time for item in items]
+
+    with open(data_path, "ab") as data_file:
+        if fcntl:
+            fcntl.flock(data_file, fcntl.LOCK_EX)
+        try:
+            offset = data_file.seek(0, os.SEEK_END)
+            data_file.write(frame)
+            data_file.flush()
+            entry = FrameIndex(
+                offset=offset,
+                length=len(frame),
+                count=len(items),
+                min_pub_time=min(pub_times),
+                max_pub_time=max(pub_times),
+            )
+            with open(index_path, "a", encoding="utf-8") as index_file:
+                index_file.write(entry.model_dump_json() + "\n")
+        finally:
+            if fcntl:
+                fcntl.flock(data_file, fcntl.LOCK_UN)
+
+def archive_items(items: List[RawNews], directory: Optional[str] = None) -> int:
+    """
+    归档原始快讯 (不论是否命中关键词)，按发布日期写入 <ARCHIVE_DIR>/<yyyy-mm-dd>.zst。
+    分段文件只追加: 每次调用为每个日期写入一个独立的 zstd 帧，.idx 记录帧的位置与时间范围。
+    """
+    if not items:
+        return 0
+    by_day: Dict[date, List[RawNews]] = defaultdict(list)
+    for item in items:
+        by_day[item.pub_time.date()].append(item)
+
+    os.makedirs(directory or config.ARCHIVE_DIR, exist_ok=True)
+    with _write_lock:
+        for day, day_items in sorted(by_day.items()):
+            _append_frame(day, day_items, directory)
+    return len(items)
+
+def _read_index(index_path: str) -> List[FrameIndex]:
+    entries = []
+    if not os.path.exists(index_path):
+        return entries
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(FrameIndex.model_validate_json(line))
+            except ValueError:
+                # 写入中断导致的半行索引，跳过
+                logger.warning(f"跳过损坏的归档索引行: {index_path}")
+    return entries
+
+def iter_archive(start: datetime, end: datetime, directory: Optional[str] = None) -> Iterator[RawNews]:
+    """按发布时间 [start, end) 流式读取归档条目，只解压时间范围有交集的帧"""
+    decompressor = zstandard.ZstdDecompressor()
+    day = start.date()
+    while day <= end.date():
+        data_path, index_path = _segment_paths(day, directory)
+        entries = [
+            entry for entry in _read_index(index_path)
+            if entry.max_pub_time >= start and entry.min_pub_time < end
+        ]
+        if entries:
+            with open(data_path, "rb") as data_file:
+                for entry in entries:
+                    data_file.seek(entry.offset)
+                    frame = data_file.read(entry.length)
+                    if len(frame) != entry.length:
+                        logger.warning(f"归档帧不完整，已跳过: {data_path}@{entry.offset}")
+                        continue
+                    for line in decompressor.decompress(frame).decode("utf-8").splitlines():
+                        item = RawNews.model_validate_json(line)
+                        if start <= item.pub_time < end:
+                            yield item
+        day += timedelta(days=1)
@@ -0,0 +1,169 @@
+"""
+历史回填: 按分页列表接口向前翻页直到目标日期，复用定时抓取的去重/过滤/入库流程
+
+用法:
+    python -m src.backfill --since 2026-10-10
+    python -m src.backfill --since 2026-10-10 --source blockbeats --concurrency 8
+    python -m src.backfill --since 2026-10-10 --restart   # 忽略断点，从第一页重新回填
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+import httpx
+from sqlmodel import Session, select
+
+from src.database import engine, init_db
+from src.models import BackfillCheckpoint
+from src.scrapers.base import RawNews
+from src.scrapers.registry import SCRAPER_REGISTRY, enabled_sources
+from src.scrapers.http_scraper import get_http_client, close_http_client
+from src.ingest import ingest_news
+from src.config import BACKFILL_CONCURRENCY, BACKFILL_BATCH_SIZE, BACKFILL_MAX_PAGES
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.backfill")
+
+# SQLite 单写者: 各来源的批量入库串行执行，翻页请求仍然并发
+_ingest_lock = asyncio.Lock()
+
+def backfill_sources() -> List[str]:
+    """已启用且支持回填 (配置了 BACKFILL_URL) 的来源"""
+    return [source for source in enabled_sources() if SCRAPER_REGISTRY[source].BACKFILL_URL]
+
+def load_checkpoint(source: str, since: datetime, restart: bool = False) -> BackfillCheckpoint:
+    """读取来源的回填断点；目标日期变化或 restart 时从第一页重新开始"""
+    with Session(engine) as session:
+        checkpoint = session.exec(select(BackfillCheckpoint).where(BackfillCheckpoint.source == source)).first()
+        if checkpoint is None:
+            checkpoint = BackfillCheckpoint(source=source, since=since)
+        elif restart or checkpoint.since != since:
+            checkpoint.since = since
+            checkpoint.next_page = 1
+            checkpoint.oldest_pub_time = None
+            checkpoint.scanned_count = 0
+            checkpoint.matched_count = 0
+            checkpoint.completed = False
+        session.add(checkpoint)
+        session.commit()
+        session.refresh(checkpoint)
+        return checkpoint
+
+def save_checkpoint(checkpoint: BackfillCheckpoint) -> None:
+    with Session(engine) as session:
+        session.merge(checkpoint)
+        session.commit()
+
+async def _flush(checkpoint: BackfillCheckpoint, pending: List[RawNews]) -> None:
+    """分批入库 (每批一个事务)，全部提交后再保存断点"""
+    for start in range(0, len(pending), BACKFILL_BATCH_SIZE):
+        batch = pending[start:start + BACKFILL_BATCH_SIZE]
+        async with _ingest_lock:
+            result = await asyncio.to_thread(ingest_news, batch, False)
+        checkpoint.scanned_count += result.scanned_count
+        checkpoint.matched_count += result.new_count
+    await asyncio.to_thread(save_checkpoint, checkpoint)
+
+async def backfill_source(
+    source: str,
+    since: datetime,
+    semaphore: asyncio.Semaphore,
+    concurrency: int = BACKFILL_CONCURRENCY,
+    restart: bool = False,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Optional[BackfillCheckpoint]:
+    """
+    回填单个来源: 每次并发请求 concurrency 个连续页面，按页序处理，
+    遇到早于 since 的条目或接口无更多条目时结束。
+    断点 (next_page) 只在对应页面的条目全部入库后推进；期间新快讯会把旧条目挤到后面的页，
+    从断点恢复时只会重复读取少量条目 (由去重过滤)，不会漏读。
+    """
+    scraper = SCRAPER_REGISTRY[source]()
+    if not scraper.BACKFILL_URL:
+        logger.warning(f"[{source}] 不支持历史回填 (未配置 BACKFILL_URL)，跳过")
+        return None
+
+    checkpoint = await asyncio.to_thread(load_checkpoint, source, since, restart)
+    if checkpoint.completed:
+        logger.info(f"[{source}] 已回填至 {since:%Y-%m-%d %H:%M}，跳过 (使用 --restart 重新回填)")
+        return checkpoint
+    logger.info(f"[{source}] 开始回填至 {since:%Y-%m-%d %H:%M}，从第 {checkpoint.next_page} 页开始")
+
+    client = client or get_http_client()
+
+    async def fetch(page_no: int) -> Optional[List[RawNews]]:
+        async with semaphore:
+            return await scraper.fetch_page(client, page_no)
+
+    pending: List[RawNews] = []
+    while not checkpoint.completed:
+        if checkpoint.next_page > BACKFILL_MAX_PAGES:
+            logger.warning(f"[{source}] 已达到回填页数上限 {BACKFILL_MAX_PAGES}，停止回填")
+            break
+        last_page = min(checkpoint.next_page + concurrency, BACKFILL_MAX_PAGES + 1)
+        window = list(range(checkpoint.next_page, last_page))
+        pages = await asyncio.gather(*(fetch(page_no) for page_no in window), return_exceptions=True)
+
+        for page_no, items in zip(window, pages):
+            if isinstance(items, Exception):
+                await _flush(checkpoint, pending)
+                logger.error(f"[{source}] 第 {page_no} 页请求失败，回填中断 (重新执行即可从断点继续): {items}")
+                return checkpoint
+            if items is None:
+                checkpoint.completed = True
+                break
+            pending.extend(item for item in items if item.pub_time >= since)
+            checkpoint.next_page = page_no + 1
+            if items:
+                oldest = min(item.pub_time for item in items)
+                checkpoint.oldest_pub_time = min(oldest, checkpoint.oldest_pub_time or oldest)
+                if oldest < since:
+                    checkpoint.completed = True
+                    break
+
+        if len(pending) >= BACKFILL_BATCH_SIZE or checkpoint.completed:
+            await _flush(checkpoint, pending)
+            pending = []
+            logger.info(
+                f"[{source}] 回填进度: 第 {checkpoint.next_page - 1} 页，"
+                f"已到 {checkpoint.oldest_pub_time}，新增扫描 {checkpoint.scanned_count} 条"
+            )
+
+    if pending:
+        await _flush(checkpoint, pending)
+    logger.info(
+        f"[{source}] 回填{'完成' if checkpoint.completed else '结束'}。"
+        f"新增扫描: {checkpoint.scanned_count}, 新增高危: {checkpoint.matched_count}"
+    )
+    return checkpoint
+
+async def run_backfill(
+    since: datetime,
+    sources: Optional[List[str]] = None,
+    concurrency: int = BACKFILL_CONCURRENCY,
+    restart: bool = False,
+) -> List[Optional[BackfillCheckpoint]]:
+    """多个来源并行回填，共享同一个并发上限"""
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        return await asyncio.gather(*(
+            backfill_source(source, since, semaphore, concurrency, restart)
+            for source in (sources or backfill_sources())
+        ))
+    finally:
+        await close_http_client()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sentinel 历史快讯回填")
+    parser.add_argument("--since", required=True, type=datetime.fromisoformat, help="回填目标日期，如 2026-10-10 或 2026-10-10T08:00")
+    parser.add_argument("--source", action="append", choices=sorted(SCRAPER_REGISTRY), help="指定来源 (可重复)，默认所有支持回填的已启用来源")
+    parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY, help="同时请求的页数")
+    parser.add_argument("--restart", action="store_true", help="忽略断点，从第一页重新回填")
+    args = parser.parse_args()
+
+    init_db()
+    asyncio.run(run_backfill(args.since, args.source, max(1, args.concurrency), args.restart))
+
+if __name__ == "__main__":
+    main()
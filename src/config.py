@@ -12,6 +12,26 @@ else:
     DB_PATH = os.path.join(_BASE_DIR, "data", "sentinel.db")
 SQLITE_URL = f"sqlite:///{DB_PATH}"
 
+# SQLite 连接参数: WAL 模式下读写互不阻塞，写事务之间按 busy_timeout 排队等待
+SQLITE_BUSY_TIMEOUT_MS = 10000
+SQLITE_SYNCHRONOUS = "NORMAL"  # WAL 下 NORMAL 只在检查点时同步磁盘，断电最多丢失最近的事务，不会损坏数据库
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # 内存映射读取 (字节)
+SQLITE_CACHE_SIZE_KB = 64 * 1024  # 每个连接的页缓存 (KiB)
+# Web 只读连接池大小
+SQLITE_READ_POOL_SIZE = 8
+# Web 路由中同步阻塞操作 (规则读写、日志文件读取等) 使用的线程池大小
+WEB_BLOCKING_WORKERS = 4
+
+# 原始快讯归档 (zstd 压缩的按日分段文件，含被过滤掉的条目，供重新打标签)
+ARCHIVE_DIR = os.path.join(os.path.dirname(DB_PATH), "archive")
+ARCHIVE_ENABLED = True
+ARCHIVE_ZSTD_LEVEL = 9  # zstd 压缩级别 (1~22)
+RETAG_CHUNK_SIZE = 20000  # 重新打标签时每批读取的条目数
+
+# 扫描记录保留: scan_record 只保留最近 N 天，更早的记录按月压缩为有序指纹分段 (仍参与去重)
+SCAN_RETENTION_DAYS = 30
+SCAN_SEGMENT_DIR = os.path.join(os.path.dirname(DB_PATH), "scan_segments")
+
 # 抓取源
 SOURCE_URL = "https://www.aicoin.com/zh-Hans/news-flash"
 AICOIN_URL_PREFIX = "https://www.aicoin.com/zh-Hans"
@@ -44,14 +64,92 @@ IGNORE_WORDS = [
     "峰会预告", "早报", "晚报", "行情分析", "涨幅", "跌幅", "狂送", "直播"
 ]
 
+# 以上关键词列表为内置默认规则: 首次启动时写入数据库作为规则集 v1，之后在 Web 后台 (/rules) 维护。
+# 过滤器定期检查生效版本，发布新版本后无需重启即可生效
+RULES_RELOAD_SECONDS = 30
+
+# 批量过滤 (get_risk_tags_batch): 条目数达到阈值时分片到进程池并行匹配
+FILTER_PARALLEL_THRESHOLD = 5000
+FILTER_CHUNK_SIZE = 2000  # 每个分片的条目数
+FILTER_WORKERS = None  # 进程数，None 表示 CPU 核数
+
 # --- 爬虫配置 ---
-CRAWL_INTERVAL_MINUTES = 2  # 抓取间隔 (分钟)
+CRAWL_INTERVAL_MINUTES = 2  # 默认抓取间隔 (分钟)
 HEADLESS = True  # 是否使用无头模式 (不显示浏览器窗口)
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# 数据源插件配置: 每个来源独立调度，慢源不会拖慢快源
+# - enabled: 是否启用
+# - interval_minutes: 初始抓取间隔 (分钟)，默认 CRAWL_INTERVAL_MINUTES
+# - min_interval_minutes / max_interval_minutes: 自适应调度的间隔上下限 (分钟)
+# - timeout_seconds: 单轮抓取超时 (秒)
+# - max_pages: 该来源最多同时占用的浏览器页面数
+SCRAPER_SETTINGS = {
+    "blockbeats": {"enabled": True, "interval_minutes": 2, "min_interval_minutes": 1, "max_interval_minutes": 15, "timeout_seconds": 120, "max_pages": 1},
+    "aicoin": {"enabled": False, "interval_minutes": 2, "min_interval_minutes": 1, "max_interval_minutes": 15, "timeout_seconds": 120, "max_pages": 1},  # 已暂停
+}
+
+# 自适应调度: 按来源的新快讯到达速率在上下限内调整抓取间隔
+ADAPTIVE_SCHEDULING_ENABLED = True
+ADAPTIVE_TARGET_ITEMS_PER_POLL = 2  # 期望每轮抓到的新快讯数 (间隔 = 目标条数 / 到达速率)
+ADAPTIVE_EWMA_ALPHA = 0.3  # 到达速率指数加权平均系数，越大越敏感
+ADAPTIVE_MAX_GROWTH = 1.5  # 每轮间隔最多放大的倍数 (缩短立即生效)
+# 命中高危类别时立即收紧到最短间隔，并保持一段时间。高危类别在规则管理中按类别设置，
+# 以下为内置默认规则与未设置该项的旧版本规则集的默认高危类别
+HIGH_RISK_TAGS = ["安全"]
+ADAPTIVE_BURST_HOLD_MINUTES = 30
+
+# 历史回填 (python -m src.backfill)
+BACKFILL_CONCURRENCY = 4  # 同时请求的列表页数 (所有来源共享)
+BACKFILL_BATCH_SIZE = 500  # 每批入库条数 (一个事务)
+BACKFILL_MAX_PAGES = 2000  # 单个来源最多回填的页数，防止接口异常时无限翻页
+
+# 浏览器池: 常驻 Chromium，全局最多同时打开的页面数
+MAX_BROWSER_PAGES = 4
+# 达到以下任一阈值时自动重启回收
+BROWSER_MAX_USES = 200  # 单个浏览器实例最多租出的页面数
+BROWSER_MAX_MEMORY_MB = 1024  # 浏览器进程树内存上限 (MB)
+# 常驻抓取服务启动时预热浏览器与 HTTP 连接池，首轮抓取无需等待启动
+CRAWL_WARM_UP = True
+
+# 网络拦截模式: 直接捕获快讯列表接口的 JSON 并屏蔽图片/字体/CSS/统计脚本，
+# 接口响应到达即返回；接口未命中或解析失败时自动回退到 DOM 解析
+FEED_INTERCEPT_ENABLED = False
+
+# 轻量 HTTP 爬虫 (无需 JavaScript 的数据源)，共享 keep-alive 连接池
+HTTP_TIMEOUT_SECONDS = 15
+HTTP_MAX_CONNECTIONS = 20
 
 # --- 通知策略配置 ---
 # 推送模式: 'realtime' (实时) 或 'interval' (定时汇总)
 NOTIFICATION_MODE = "realtime"
+# Webhook 请求超时 (秒)，避免推送接口无响应时任务一直挂起
+FEISHU_TIMEOUT_SECONDS = 10
 
 # 定时汇总间隔 (分钟)，仅在 mode='interval' 时生效
 # 建议设为 60 分钟，避免信息轰炸
 NOTIFICATION_INTERVAL_MINUTES = 60
+
+# 实时模式补发 (仅在 mode='realtime' 时生效): 推送失败、或推送后标记前进程退出的快讯保持未推送，
+# 启动时及每隔 REALTIME_RETRY_INTERVAL_MINUTES 分钟逐条补发。推送与标记不在同一事务中，
+# 进程恰好在两者之间退出时重启后会再推送一次 (至少一次，不丢告警)
+REALTIME_RETRY_INTERVAL_MINUTES = 5
+# 只补发入库超过该时间的快讯，留给入库流程自己推送，避免与进行中的推送重复
+REALTIME_RETRY_DELAY_MINUTES = 5
+# 只补发该时间窗口内入库的快讯，长时间停机后不补发过期告警
+REALTIME_RETRY_WINDOW_MINUTES = 60
+
+# 近似重复检测: 不同来源转载或稍后改写的同一条快讯关联到首条 (canonical)，不再重复推送
+NEAR_DUP_ENABLED = True
+# 只与发布时间相差不超过该窗口的近期快讯比较
+NEAR_DUP_WINDOW_HOURS = 24
+# 64 位 SimHash 的最大汉明距离，不超过该值视为近似重复
+NEAR_DUP_MAX_DISTANCE = 3
+
+# 去重缓存: 启动时将 ScanRecord 载入内存，已扫描的条目无需再查数据库
+DEDUP_CACHE_ENABLED = True
+
+# 快讯列表总数缓存 (秒): 本进程入库后立即失效；其他进程 (回填/重新打标签命令) 写入的数据最多延迟该时间计入
+NEWS_COUNT_CACHE_TTL_SECONDS = 300
+# 仪表盘趋势图的天数 (读取统计汇总表)
+DASHBOARD_TREND_DAYS = 7
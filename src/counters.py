@@ -0,0 +1,31 @@
+import datetime
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, select
+
+from src.models import Counter
+
+# 累计扫描条数 (ScanRecord 写入时累加，压缩删除旧记录时不变)
+SCAN_RECORD_COUNTER = "scan_record"
+# 累计快讯数 (NewsFlash 写入时累加，统计汇总重建时重新计数)
+NEWSFLASH_COUNTER = "newsflash"
+
+def increment_counter(connection: Connection, name: str, delta: int) -> None:
+    """计数器累加 (UPSERT，不存在时创建)，在调用方的事务中执行"""
+    if delta == 0:
+        return
+    now = datetime.datetime.now()
+    stmt = insert(Counter).values(name=name, value=delta, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Counter.name],
+        set_={"value": Counter.value + delta, "updated_at": now},
+    )
+    connection.execute(stmt)
+
+def counter_statement(name: str):
+    """计数器当前值 (不存在时无结果，按 0 处理)"""
+    return select(Counter.value).where(Counter.name == name)
+
+def get_counter(session: Session, name: str) -> int:
+    value = session.exec(counter_statement(name)).first()
+    return value or 0
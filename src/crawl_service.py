@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Dict, List, Optional
+
+from src.scrapers.base import BaseScraper, RawNews
+from src.scrapers.registry import SCRAPER_REGISTRY, get_scraper_settings
+from src.scrapers.browser_pool import BrowserPool
+from src.scrapers.http_scraper import get_http_client, close_http_client
+from src.config import FEED_INTERCEPT_ENABLED, CRAWL_WARM_UP
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.crawl_service")
+
+class CrawlService:
+    """
+    常驻抓取服务: 在独立线程中运行一个长期存活的 asyncio 事件循环，
+    持有浏览器池、HTTP 连接池与各来源的爬虫实例，跨抓取周期复用。
+
+    - 调度线程 (APScheduler) 通过 crawl()/submit() 提交协程并阻塞等待结果，各来源并发执行
+    - Playwright 对象与 httpx 连接池绑定事件循环，因此所有异步资源只在这个循环中创建和使用
+    - start() 时可预热浏览器与 HTTP 连接池，首轮抓取无需等待启动
+    - stop() 由 FastAPI lifespan 在调度器停止后调用
+    """
+
+    def __init__(self, warm_up: bool = CRAWL_WARM_UP) -> None:
+        self.warm_up_enabled = warm_up
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pool = BrowserPool()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # 各来源的爬虫实例 (来源级页面并发上限、指纹等状态随实例保留)
+        self._scrapers: Dict[str, BaseScraper] = {}
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动事件循环线程 (幂等)"""
+        with self._lock:
+            if self.is_running():
+                return
+            if self.loop is None or self.loop.is_closed():
+                self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self.loop.run_forever, name="sentinel-crawl-loop", daemon=True)
+            self._thread.start()
+            logger.info("常驻抓取服务已启动")
+            if self.warm_up_enabled:
+                asyncio.run_coroutine_threadsafe(self._warm_up(), self.loop)
+
+    async def _warm_up(self) -> None:
+        get_http_client()
+        try:
+            await self.pool.warm_up()
+        except Exception as e:
+            # 预热失败不影响服务，首次租用页面时会再次尝试启动
+            logger.warning(f"浏览器预热失败: {e}")
+
+    def submit(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """将协程提交到常驻事件循环并等待结果 (在调度线程中调用)"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def get_scraper(self, source: str) -> BaseScraper:
+        """获取来源对应的爬虫实例 (首次使用时按注册表与配置创建)"""
+        if source not in self._scrapers:
+            settings = get_scraper_settings(source)
+            self._scrapers[source] = SCRAPER_REGISTRY[source](
+                pool=self.pool,
+                intercept=FEED_INTERCEPT_ENABLED,
+                max_pages=settings.max_pages,
+            )
+        return self._scrapers[source]
+
+    async def _crawl(self, scraper: BaseScraper, timeout_seconds: float) -> Optional[List[RawNews]]:
+        """运行单个来源的爬虫，超时视为本轮失败 (返回 None)"""
+        try:
+            return await asyncio.wait_for(scraper.run(), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            scraper.fingerprint = None
+            logger.error(f"[{scraper.SOURCE}] 抓取超时 ({timeout_seconds}s)，本轮放弃")
+            return None
+
+    def crawl(self, source: str) -> Optional[List[RawNews]]:
+        """执行一轮抓取 (爬虫实例需已注入高水位与指纹)，本轮失败时返回 None"""
+        scraper = self.get_scraper(source)
+        return self.submit(self._crawl(scraper, get_scraper_settings(source).timeout_seconds))
+
+    async def _close_resources(self) -> None:
+        await self.pool.close()
+        await close_http_client()
+
+    def stop(self) -> None:
+        """关闭浏览器池、HTTP 连接池并停止事件循环"""
+        with self._lock:
+            loop, thread = self.loop, self._thread
+            if loop is None or loop.is_closed():
+                return
+            try:
+                if thread is not None and thread.is_alive():
+                    asyncio.run_coroutine_threadsafe(self._close_resources(), loop).result(timeout=30)
+                    loop.call_soon_threadsafe(loop.stop)
+                    thread.join(timeout=10)
+            finally:
+                if not loop.is_running():
+                    loop.close()
+                # 异步资源绑定已关闭的循环，重新 start() 时需全部重建
+                self.loop = None
+                self._thread = None
+                self.pool = BrowserPool()
+                self._scrapers.clear()
+            logger.info("常驻抓取服务已停止")
+
+# 进程内唯一的抓取服务
+crawl_service = CrawlService()
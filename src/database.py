@@ -1,12 +1,103 @@
 from sqlmodel import create_engine, SQLModel
-from src.config import SQLITE_URL
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from src.config import (
+    SQLITE_URL, SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE,
+    SQLITE_CACHE_SIZE_KB, SQLITE_READ_POOL_SIZE,
+)
+from src.logger import setup_logger
 
-# 数据库引擎
-engine = create_engine(SQLITE_URL)
+logger = setup_logger("sentinel.database")
+
+def _apply_pragmas(dbapi_connection, read_only: bool) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        if not read_only:
+            # journal_mode 持久保存在数据库文件中，由写连接设置即可
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+def _register_functions(dbapi_connection) -> None:
+    """注册触发器使用的 SQL 函数 (短词索引分词)，写入快讯的连接都需要"""
+    # 延迟导入以避免循环依赖
+    from src.search import BIGRAM_FUNCTION, bigram_terms
+    dbapi_connection.create_function(BIGRAM_FUNCTION, 1, bigram_terms, deterministic=True)
+
+def create_write_engine(url: str = SQLITE_URL) -> Engine:
+    """
+    写引擎 (抓取入库、报表、回填等后台任务使用)。
+    写事务以 BEGIN IMMEDIATE 开始: 一开始就申请写锁，锁被占用时按 busy_timeout 等待，
+    避免默认的延迟事务在读升级为写时直接报 "database is locked"。
+    因此只读查询 (轮询规则、加载缓存、查询待推送数据等) 应使用只读引擎，不要占用写锁。
+    """
+    write_engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    @event.listens_for(write_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # 由 SQLAlchemy 控制事务的开始 (见下方 begin 事件)
+        dbapi_connection.isolation_level = None
+        _apply_pragmas(dbapi_connection, read_only=False)
+        _register_functions(dbapi_connection)
+
+    @event.listens_for(write_engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return write_engine
+
+def create_read_engine(url: str = SQLITE_URL, pool_size: int = SQLITE_READ_POOL_SIZE) -> Engine:
+    """只读引擎 (Web 页面使用): 连接池化，PRAGMA query_only 禁止写入；WAL 下读取不受写事务阻塞"""
+    read_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=pool_size,
+    )
+
+    @event.listens_for(read_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_pragmas(dbapi_connection, read_only=True)
+
+    return read_engine
+
+def create_async_read_engine(url: str = SQLITE_URL, pool_size: int = SQLITE_READ_POOL_SIZE) -> AsyncEngine:
+    """
+    异步只读引擎 (Web 路由使用): aiosqlite 在每个连接的后台线程中执行查询，
+    慢查询只占用该连接，不阻塞事件循环上的其他请求与日志流。连接参数与只读引擎一致。
+    """
+    async_engine = create_async_engine(
+        make_url(url).set(drivername="sqlite+aiosqlite"),
+        pool_size=pool_size,
+        max_overflow=pool_size,
+    )
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_pragmas(dbapi_connection, read_only=True)
+
+    return async_engine
+
+# 写引擎 (后台任务)
+engine = create_write_engine()
+# 只读引擎 (命令行工具等同步读取)
+read_engine = create_read_engine()
+# 异步只读引擎 (Web 路由)
+async_read_engine = create_async_read_engine()
 
 def init_db():
     """初始化数据库表结构"""
     # 延迟导入以避免循环依赖
-    from src.models import NewsFlash, Report, DailyStats, ScanRecord
+    from src.models import NewsFlash, NewsTag, Report, DailyStats, ScanRecord, Counter, StatsRollup, SourceState, BackfillCheckpoint, RuleSet, SchemaMigration
+    from src.migrations import run_migrations
+    # 新表直接按模型创建；已存在的表通过迁移补齐新增的列和索引
     SQLModel.metadata.create_all(engine)
-
+    run_migrations(engine)
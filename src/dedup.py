@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from typing import Iterable, List, Set
+from sqlmodel import Session, select
+
+from src.database import read_engine
+from src.models import ScanRecord
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.dedup")
+
+# SQLite 单条语句的参数上限较低，IN 查询分批执行
+IN_QUERY_BATCH = 500
+
+def select_existing(session: Session, column, values: List[str]) -> Set[str]:
+    """分批执行 IN 查询，返回 values 中已存在于 column 的值"""
+    existing: Set[str] = set()
+    for start in range(0, len(values), IN_QUERY_BATCH):
+        batch = values[start:start + IN_QUERY_BATCH]
+        existing.update(session.exec(select(column).where(column.in_(batch))).all())
+    return existing
+
+def source_fingerprint(source_id: str) -> int:
+    """source_id 的 64 位指纹 (集合中只存整数，比存字符串省内存)"""
+    return int.from_bytes(hashlib.blake2b(source_id.encode("utf-8"), digest_size=8).digest(), "big")
+
+class ScanCache:
+    """
+    进程内的已扫描 ID 集合 (ScanRecord 的内存镜像)
+
+    启动时从 ScanRecord 全量加载，入库成功后同步更新。缓存命中即判定为重复，不再访问数据库；
+    未命中的条目可能由其他进程 (如历史回填命令) 写入过，仍需由数据库批量确认。
+    """
+
+    def __init__(self) -> None:
+        self._fingerprints: Set[int] = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __contains__(self, source_id: str) -> bool:
+        self.ensure_loaded()
+        return source_fingerprint(source_id) in self._fingerprints
+
+    def add_many(self, source_ids: Iterable[str]) -> None:
+        fingerprints = {source_fingerprint(source_id) for source_id in source_ids}
+        with self._lock:
+            self._fingerprints |= fingerprints
+
+    def rebuild(self) -> int:
+        """从 ScanRecord 加载全部已扫描 ID (启动时调用)"""
+        fingerprints: Set[int] = set()
+        with Session(read_engine) as session:
+            for source_id in session.exec(select(ScanRecord.source_id).execution_options(yield_per=10000)):
+                fingerprints.add(source_fingerprint(source_id))
+        with self._lock:
+            self._fingerprints = fingerprints
+            self._loaded = True
+        logger.info(f"去重缓存已加载: {len(fingerprints)} 条")
+        return len(fingerprints)
+
+    def ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        try:
+            self.rebuild()
+        except Exception as e:
+            # 数据库不可用时从空缓存开始，所有条目交由数据库确认
+            logger.warning(f"去重缓存加载失败，从空缓存开始: {e}")
+            self._loaded = True
+
+scan_cache = ScanCache()
@@ -1,47 +1,197 @@
-from typing import List
-from src.config import (
-    KEYWORDS_SECURITY, 
-    KEYWORDS_COMPLIANCE, 
-    KEYWORDS_MACRO, 
-    IGNORE_WORDS
-)
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from pydantic import BaseModel
+
+from src import config
+from src.matcher import AhoCorasick
+from src.rules import Rules, RulesKey, IGNORE_CATEGORY, default_rules, load_active_rules
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.filter")
+
+class KeywordMatch(BaseModel):
+    """单个关键词命中，偏移量相对所在字段 (用于高亮与审计)"""
+    keyword: str
+    category: str  # 标签类别，黑名单为 IGNORE_CATEGORY
+    field: str  # 'title' 或 'content'
+    start: int
+    end: int
+
+class RiskMatch(BaseModel):
+    """一条快讯的关键词匹配结果"""
+    tags: List[str] = []  # 命中的标签 (命中黑名单时为空)
+    matches: List[KeywordMatch] = []  # 全部命中 (含黑名单词)
+    ignored: bool = False  # 是否命中黑名单
+    score: float = 0.0  # 命中类别的权重之和
+    rule_version: int = 0  # 使用的规则集版本
+
+class CompiledRules:
+    """某个版本规则编译后的自动机 (只读，整体替换)"""
+
+    def __init__(self, version: int, rules: Rules) -> None:
+        self.version = version
+        self.rules = rules
+        self.key: RulesKey = rules.key()
+        self.matcher = _build_matcher(self.key)
+        self.weights: Dict[str, float] = {category.name: category.weight for category in rules.categories}
+        self.high_risk: Set[str] = set(rules.high_risk_tags())
+
+    def is_high_risk(self, tags: Sequence[str]) -> bool:
+        """是否命中高危类别 (自适应调度据此收紧抓取间隔)"""
+        return any(tag in self.high_risk for tag in tags)
+
+def _build_matcher(key: RulesKey) -> AhoCorasick:
+    return AhoCorasick((word, category) for category, words in key for word in words)
+
+# 当前生效的编译结果: 每次替换都是一次引用赋值，正在使用旧版本的调用不受影响
+_compiled: Optional[CompiledRules] = None
+_checked_at = 0.0
+_compile_lock = threading.Lock()
+
+def get_compiled(force: bool = False) -> CompiledRules:
+    """
+    获取当前生效规则的自动机。
+    每隔 RULES_RELOAD_SECONDS 检查一次数据库中的生效版本，版本变化时重新编译并原子替换；
+    数据库不可用时沿用已加载的版本 (尚未加载时使用内置默认规则，版本号 0)。
+    """
+    global _compiled, _checked_at
+    current = _compiled
+    if current is not None and not force and time.monotonic() - _checked_at < config.RULES_RELOAD_SECONDS:
+        return current
+
+    with _compile_lock:
+        current = _compiled
+        if current is not None and not force and time.monotonic() - _checked_at < config.RULES_RELOAD_SECONDS:
+            return current
+        try:
+            version, rules = load_active_rules()
+        except Exception as e:
+            logger.warning(f"读取规则集失败，沿用{'当前规则' if current else '内置默认规则'}: {e}")
+            version, rules = (current.version, current.rules) if current else (0, default_rules())
+        if current is None or current.version != version:
+            _compiled = CompiledRules(version, rules)
+            if current is not None:
+                logger.info(f"关键词规则已切换: v{current.version} -> v{version}")
+            if not _compiled.high_risk:
+                # 类别被改名或拆分后可能不再有高危类别，命中任何标签都不会收紧抓取间隔
+                logger.warning(f"规则集 v{version} 没有高危类别，命中标签时不会收紧抓取间隔")
+        _checked_at = time.monotonic()
+        return _compiled
+
+def reload_rules() -> CompiledRules:
+    """立即重新加载生效规则 (Web 后台发布/切换版本后调用)"""
+    return get_compiled(force=True)
+
+def _scan_tags(matcher: AhoCorasick, title: str, content: str) -> List[str]:
+    """只计算标签的快速路径 (不构造命中明细)"""
+    hit = {matcher.patterns[index][1] for _, _, index in matcher.iter_matches(f"{title} {content}")}
+    if IGNORE_CATEGORY in hit:
+        return []
+    return [category for category in matcher.categories if category != IGNORE_CATEGORY and category in hit]
+
+def match_risk(title: str, content: str) -> RiskMatch:
+    """
+    单遍扫描标题和正文，返回命中的标签以及每个命中关键词的位置。
+    与 get_risk_tags 判定规则一致: 命中黑名单时不输出标签。
+    """
+    compiled = get_compiled()
+    matcher = compiled.matcher
+    # 与原逻辑一致: 标题和正文以空格拼接后统一检索
+    full_text = f"{title} {content}"
+    content_offset = len(title) + 1
+
+    matches: List[KeywordMatch] = []
+    hit_categories: Set[str] = set()
+    for start, end, index in matcher.iter_matches(full_text):
+        keyword, category = matcher.patterns[index]
+        hit_categories.add(category)
+        if start < content_offset:
+            field, offset = "title", 0
+        else:
+            field, offset = "content", content_offset
+        matches.append(KeywordMatch(keyword=keyword, category=category, field=field, start=start - offset, end=end - offset))
+
+    # 1. 黑名单检查 (优先级最高)
+    if IGNORE_CATEGORY in hit_categories:
+        return RiskMatch(matches=matches, ignored=True, rule_version=compiled.version)
+
+    # 2. 白名单: 同一类别命中一个词即可，标签按规则中的类别顺序输出
+    tags = [category for category in matcher.categories if category != IGNORE_CATEGORY and category in hit_categories]
+    score = sum(compiled.weights.get(tag, 1.0) for tag in tags)
+    return RiskMatch(tags=tags, matches=matches, score=score, rule_version=compiled.version)
+
+def tag_news(title: str, content: str) -> Tuple[List[str], int]:
+    """计算标签，同时返回所用的规则版本 (两者来自同一份规则快照)"""
+    compiled = get_compiled()
+    return _scan_tags(compiled.matcher, title, content), compiled.version
 
 def get_risk_tags(title: str, content: str) -> List[str]:
     """
     根据标题和正文判断是否命中监控关键词。
-    
+
     Returns:
         List[str]: 命中的标签列表 (如 ['安全', '合规'])。
                    如果命中黑名单或未命中白名单，返回空列表。
     """
-    # 拼接标题和内容进行统一检索
-    full_text = f"{title} {content}".lower()
-    
-    # 1. 黑名单检查 (优先级最高)
-    # 如果包含任意黑名单词汇，直接忽略，不生成任何标签
-    for ignore_word in IGNORE_WORDS:
-        if ignore_word.lower() in full_text:
-            return []
-            
-    matched_tags = []
-    
-    # 2. 白名单检查 - 安全类
-    for kw in KEYWORDS_SECURITY:
-        if kw.lower() in full_text:
-            matched_tags.append("安全")
-            break # 同一类别命中一个词即可
-            
-    # 3. 白名单检查 - 合规类
-    for kw in KEYWORDS_COMPLIANCE:
-        if kw.lower() in full_text:
-            matched_tags.append("合规")
-            break
-            
-    # 4. 白名单检查 - 宏观类
-    for kw in KEYWORDS_MACRO:
-        if kw.lower() in full_text:
-            matched_tags.append("宏观")
-            break
-            
-    return matched_tags
+    return tag_news(title, content)[0]
+
+# --- 批量过滤 ---
+
+# 进程池按规则快照创建，规则变化时重建；每个 worker 进程只编译一次自动机
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[RulesKey] = None
+_pool_lock = threading.Lock()
+_worker_matcher: Optional[AhoCorasick] = None
+
+def _init_worker(key: RulesKey) -> None:
+    global _worker_matcher
+    _worker_matcher = _build_matcher(key)
+
+def _tag_chunk(chunk: Sequence[Tuple[str, str]]) -> List[List[str]]:
+    return [_scan_tags(_worker_matcher, title, content) for title, content in chunk]
+
+def _get_pool(key: RulesKey) -> ProcessPoolExecutor:
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is None or key != _pool_key:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=config.FILTER_WORKERS, initializer=_init_worker, initargs=(key,))
+            _pool_key = key
+    return _pool
+
+def shutdown_filter_pool() -> None:
+    """关闭批量过滤进程池"""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_key = None
+
+def get_risk_tags_batch(items: Sequence[Tuple[str, str]], compiled: Optional[CompiledRules] = None) -> List[List[str]]:
+    """
+    批量计算标签: items 为 (标题, 正文) 序列，返回与之一一对应的标签列表。
+    条目数达到 FILTER_PARALLEL_THRESHOLD 时按 FILTER_CHUNK_SIZE 分片到进程池并行匹配，
+    否则在当前进程内逐条匹配 (进程池启动与序列化开销对小批量不划算)。
+    compiled 指定使用的规则快照 (需要记录规则版本时由调用方传入)，默认为当前生效规则。
+    """
+    compiled = compiled or get_compiled()
+    matcher = compiled.matcher
+    if len(items) < config.FILTER_PARALLEL_THRESHOLD:
+        return [_scan_tags(matcher, title, content) for title, content in items]
 
+    size = config.FILTER_CHUNK_SIZE
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    try:
+        pool = _get_pool(compiled.key)
+        results: List[List[str]] = []
+        for part in pool.map(_tag_chunk, chunks):
+            results.extend(part)
+        return results
+    except Exception as e:
+        logger.warning(f"进程池批量过滤失败，回退到单进程: {e}")
+        shutdown_filter_pool()
+        return [_scan_tags(matcher, title, content) for title, content in items]
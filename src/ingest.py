@@ -0,0 +1,313 @@
+import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from pydantic import BaseModel
+from sqlmodel import Session
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert
+
+from src.database import engine
+from src.models import NewsFlash, DailyStats, ScanRecord
+from src.scrapers.base import RawNews
+from src.filter import get_compiled, get_risk_tags_batch
+from src.archive import archive_items
+from src.dedup import scan_cache
+from src.neardup import NearDupIndex, near_dup_index, simhash, to_signed
+from src.tags import insert_news_tags, split_tags, tag_rows
+from src.pagination import news_count_cache
+from src.counters import NEWSFLASH_COUNTER, SCAN_RECORD_COUNTER, increment_counter
+from src.rollup import RollupDelta, apply_rollup
+from src.retention import scan_segments
+from src.config import NOTIFICATION_MODE, ARCHIVE_ENABLED, NEAR_DUP_ENABLED, DEDUP_CACHE_ENABLED
+from src.notifier import send_feishu_card
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.ingest")
+
+# 每批执行的行数 (SQLAlchemy 会把每批再拆成若干条多行 INSERT ... VALUES (...), (...) 语句)
+BULK_INSERT_ROWS = 5000
+
+class IngestResult(BaseModel):
+    """一批快讯的入库结果"""
+    new_count: int = 0  # 新增高危快讯数
+    skip_count: int = 0  # 重复 (已扫描过) 的条目数
+    push_count: int = 0  # 实时推送成功数
+    scanned_count: int = 0  # 新增 ScanRecord 数
+    duplicate_count: int = 0  # 近似重复 (关联到首条，不推送) 的条目数
+    high_risk: bool = False  # 是否命中当前规则的高危类别
+
+class BulkIngestResult(BaseModel):
+    """bulk_ingest 的写入结果"""
+    fresh: List[RawNews] = []  # 实际新写入 ScanRecord 的条目 (按输入顺序)
+    inserted: Dict[str, int] = {}  # 新增首条快讯: source_id -> NewsFlash.id
+    duplicates: Dict[str, int] = {}  # 近似重复: source_id -> 首条快讯 ID
+
+def _chunks(rows: list, size: int = BULK_INSERT_ROWS):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def _insert_ignore(session: Session, model, rows: List[dict], returning) -> list:
+    """
+    多行 INSERT ... ON CONFLICT DO NOTHING RETURNING，返回实际插入的行 (冲突的行被忽略)。
+    以 executemany 方式传参: 语句只编译一次，由 SQLAlchemy 的 insertmanyvalues 合并为多行 VALUES 执行
+    """
+    if not rows:
+        return []
+    stmt = insert(model.__table__).on_conflict_do_nothing().returning(*returning)
+    connection = session.connection()
+    inserted = []
+    for chunk in _chunks(rows):
+        inserted.extend(connection.execute(stmt, chunk).all())
+    return inserted
+
+def _increment_daily_stats(session: Session, count: int) -> None:
+    """今日扫描计数一次性累加 (UPSERT，不存在时创建)"""
+    if count <= 0:
+        return
+    now = datetime.datetime.now()
+    stmt = insert(DailyStats).values(date=now.date(), scanned_count=count, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyStats.date],
+        set_={"scanned_count": DailyStats.scanned_count + count, "updated_at": now},
+    )
+    session.connection().execute(stmt)
+
+def _news_row(item: RawNews, tags: List[str], rule_version: int, fingerprint: Optional[int], duplicate_of: Optional[int], is_pushed: bool, now: datetime.datetime) -> dict:
+    return {
+        "source": item.source,
+        "source_id": item.source_id,
+        "title": item.title,
+        "content": item.content,
+        "url": item.url,
+        "pub_time": item.pub_time,
+        "created_at": now,
+        "updated_at": now,
+        "tags": ",".join(tags),
+        "rule_version": rule_version,
+        "simhash": to_signed(fingerprint) if fingerprint is not None else None,
+        "duplicate_of": duplicate_of,
+        "is_pushed": is_pushed,
+        "in_daily_report": False,
+        "in_weekly_report": False,
+    }
+
+def insert_news(
+    session: Session,
+    tagged: Sequence[Tuple[RawNews, List[str]]],
+    fingerprints: Dict[str, int],
+    index: Optional[NearDupIndex],
+    rule_version: int,
+    is_pushed: bool,
+    now: datetime.datetime,
+    result: BulkIngestResult,
+) -> Tuple[List[Tuple[RawNews, List[str]]], Dict[str, int]]:
+    """
+    在调用方的事务中写入命中规则的条目 (无标签的条目跳过)，bulk_ingest 与重新打标签共用:
+    按 index 查找近似重复的首条 (index 为 None 时不做判断)，先写首条取得 ID，再写关联到首条的重复条目，
+    最后写入标签关联表。source_id 已存在的行由 ON CONFLICT DO NOTHING 跳过 (与并发入库不冲突)。
+    首条的 is_pushed 取参数值，重复条目不推送 (标记为已推送)。
+    结果写入 result.inserted / result.duplicates，返回 (首条条目, 实际写入的 source_id -> 快讯 ID)。
+    """
+    # 1. 近似重复: 先查索引，再查本批已出现的首条 (本批条目暂用批内临时索引)
+    batch_index = NearDupIndex(from_db=False)
+    canonical: List[Tuple[RawNews, List[str]]] = []
+    pending_duplicates: List[Tuple[RawNews, List[str], int, bool]] = []  # (条目, 标签, 首条 ID 或批内序号, 是否批内)
+    for item, tags in tagged:
+        if not tags:
+            continue
+        fingerprint = fingerprints.get(item.source_id)
+        if index is not None and fingerprint is not None:
+            canonical_id = index.find(fingerprint, item.pub_time)
+            if canonical_id is not None:
+                pending_duplicates.append((item, tags, canonical_id, False))
+                continue
+            position = batch_index.find(fingerprint, item.pub_time)
+            if position is not None:
+                pending_duplicates.append((item, tags, position, True))
+                continue
+            batch_index.add(len(canonical), fingerprint, item.pub_time)
+        canonical.append((item, tags))
+
+    # 2. 首条快讯
+    rows = [_news_row(item, tags, rule_version, fingerprints.get(item.source_id), None, is_pushed, now) for item, tags in canonical]
+    result.inserted = {row.source_id: row.id for row in _insert_ignore(session, NewsFlash, rows, [NewsFlash.source_id, NewsFlash.id])}
+
+    # 3. 近似重复条目 (不推送)
+    rows = []
+    for item, tags, target, in_batch in pending_duplicates:
+        canonical_id = result.inserted.get(canonical[target][0].source_id) if in_batch else target
+        if canonical_id is None:
+            # 批内首条的 source_id 已存在于 NewsFlash (如重新打标签补录过)，不再关联，也不推送
+            logger.warning(f"近似重复的首条未写入，跳过关联: {item.source_id}")
+        else:
+            result.duplicates[item.source_id] = canonical_id
+        rows.append(_news_row(item, tags, rule_version, fingerprints.get(item.source_id), canonical_id, True, now))
+    news_ids = dict(result.inserted)
+    news_ids.update((row.source_id, row.id) for row in _insert_ignore(session, NewsFlash, rows, [NewsFlash.source_id, NewsFlash.id]))
+
+    # 4. 标签关联表 (首条与近似重复条目都写入)
+    tag_batch = []
+    for item, tags in tagged:
+        news_id = news_ids.get(item.source_id)
+        if news_id is not None:
+            tag_batch.extend(tag_rows(news_id, tags, item.pub_time))
+    insert_news_tags(session.connection(), tag_batch)
+    return canonical, news_ids
+
+def bulk_ingest(tagged: Sequence[Tuple[RawNews, List[str]]], rule_version: int, notify: bool = True) -> BulkIngestResult:
+    """
+    批量写入一批已打标签的条目，在一个短事务内完成:
+    ScanRecord / NewsFlash / NewsTag 使用多行 INSERT ... ON CONFLICT DO NOTHING (已存在的 ID 自动跳过，RETURNING 取回新行)，
+    今日扫描计数与统计汇总只累加一次。近似重复条目关联到首条 (先写首条取得 ID，再写重复条目)。
+    notify=False 时 (历史回填) 快讯直接标记为已推送；否则由调用方推送后再标记。
+    """
+    result = BulkIngestResult()
+    if not tagged:
+        return result
+
+    # SimHash 在事务外计算，事务内只做索引查询
+    fingerprints: Dict[str, int] = {}
+    if NEAR_DUP_ENABLED:
+        fingerprints = {item.source_id: simhash(item.title, item.content) for item, tags in tagged if tags}
+        near_dup_index.ensure_loaded()
+
+    now = datetime.datetime.now()
+    with Session(engine) as session:
+        # 1. 扫描记录: 冲突 (已被其他进程写入) 的条目不算新条目
+        rows = [{"source_id": item.source_id, "source": item.source, "created_at": now} for item, _ in tagged]
+        fresh_ids = {row.source_id for row in _insert_ignore(session, ScanRecord, rows, [ScanRecord.source_id])}
+        fresh = [(item, tags) for item, tags in tagged if item.source_id in fresh_ids]
+        result.fresh = [item for item, _ in fresh]
+        _increment_daily_stats(session, len(fresh))
+        increment_counter(session.connection(), SCAN_RECORD_COUNTER, len(fresh))
+
+        # 2 ~ 5. 首条快讯、近似重复条目与标签关联表
+        index = near_dup_index if NEAR_DUP_ENABLED else None
+        canonical, news_ids = insert_news(session, fresh, fingerprints, index, rule_version, not notify, now, result)
+
+        # 6. 统计汇总: 扫描数、新增快讯数；回填写入的首条 (以及未能关联的重复条目) 入库即为已推送
+        rollup = RollupDelta()
+        for item, tags in fresh:
+            rollup.add_scanned(now, item.source)
+            if item.source_id in news_ids:
+                pushed = item.source_id not in result.duplicates and (not notify or item.source_id not in result.inserted)
+                rollup.add_matched(now, item.source, tags, pushed)
+        apply_rollup(session.connection(), rollup)
+        increment_counter(session.connection(), NEWSFLASH_COUNTER, len(news_ids))
+
+        session.commit()
+
+    # 提交成功后才更新内存索引 (事务回滚时索引中不会留下未提交的快讯 ID)，快讯列表的总数缓存失效
+    if news_ids:
+        news_count_cache.invalidate()
+    if NEAR_DUP_ENABLED:
+        for item, _ in canonical:
+            news_id = result.inserted.get(item.source_id)
+            if news_id is not None:
+                near_dup_index.add(news_id, fingerprints[item.source_id], item.pub_time)
+    if DEDUP_CACHE_ENABLED:
+        scan_cache.add_many(item.source_id for item, _ in tagged)
+    return result
+
+def mark_pushed(session: Session, news_ids: List[int]) -> int:
+    """
+    标记快讯为已推送并计入统计汇总的推送数，在调用方的事务中执行 (由调用方提交)。
+    只更新尚未标记的快讯，返回本次标记的条数。
+    """
+    rollup = RollupDelta()
+    connection = session.connection()
+    marked = 0
+    for chunk in _chunks(news_ids, 500):
+        rows = connection.execute(
+            update(NewsFlash.__table__)
+            .where(NewsFlash.id.in_(chunk), NewsFlash.is_pushed == False)
+            .values(is_pushed=True)
+            .returning(NewsFlash.source, NewsFlash.created_at, NewsFlash.tags, NewsFlash.duplicate_of)
+        ).all()
+        marked += len(rows)
+        for row in rows:
+            if row.duplicate_of is None:
+                rollup.add_pushed(row.created_at, row.source, split_tags(row.tags))
+    apply_rollup(connection, rollup)
+    return marked
+
+def _mark_pushed(news_ids: List[int]) -> None:
+    if not news_ids:
+        return
+    with Session(engine) as session:
+        mark_pushed(session, news_ids)
+        session.commit()
+
+def ingest_news(raw_news_list: List[RawNews], notify: bool = True) -> IngestResult:
+    """
+    去重 -> 过滤 -> 近似重复检测 -> 入库/推送，一批条目在同一个事务中提交。
+    定时抓取与历史回填共用此流程；notify=False 时 (历史回填) 不推送，
+    且直接标记为已推送，避免被定时汇总当作新快讯补发。
+    """
+    result = IngestResult()
+
+    # 1. 全量查重 (基于 ScanRecord)
+    # 即使是噪音数据，只要 ID 出现过，就说明系统已经扫描过，不应重复计数
+    # 先查内存缓存 (命中即重复，不访问数据库)；缓存未命中的条目由批量 INSERT ... ON CONFLICT 在数据库中确认
+    # 超过保留期的记录已从 ScanRecord 压缩到按月分段，由分段判断
+    scan_segments.refresh()
+    candidates: List[RawNews] = []
+    seen_in_batch = set()
+    for item in raw_news_list:
+        if (
+            item.source_id in seen_in_batch
+            or (DEDUP_CACHE_ENABLED and item.source_id in scan_cache)
+            or item.source_id in scan_segments
+        ):
+            result.skip_count += 1
+            continue
+        seen_in_batch.add(item.source_id)
+        candidates.append(item)
+
+    # 2. 关键词过滤 (高危判断)，整批一次计算 (大批量时自动使用进程池)
+    # 整批使用同一份规则快照，并记录规则版本
+    compiled = get_compiled()
+    tags_list = get_risk_tags_batch([(item.title, item.content) for item in candidates], compiled)
+    tags_by_id = {item.source_id: tags for item, tags in zip(candidates, tags_list)}
+
+    # 3. 批量入库
+    written = bulk_ingest(list(zip(candidates, tags_list)), compiled.version, notify)
+    result.scanned_count = len(written.fresh)
+    result.skip_count += len(candidates) - len(written.fresh)
+    result.new_count = len(written.inserted)
+    result.duplicate_count = len(written.duplicates)
+
+    pushed: List[int] = []
+    for item in written.fresh:
+        tags = tags_by_id[item.source_id]
+        if not tags:
+            continue
+        tags_str = ",".join(tags)
+        result.high_risk = result.high_risk or compiled.is_high_risk(tags)
+        if item.source_id in written.duplicates:
+            logger.info(f"[重复] [{item.source}] {item.pub_time.strftime('%H:%M')} | {item.title[:15]}... | 关联到 #{written.duplicates[item.source_id]}")
+            continue
+        news_id = written.inserted.get(item.source_id)
+        if news_id is None:
+            continue
+        logger.info(f"[新增] [{item.source}] {item.pub_time.strftime('%H:%M')} | {item.title[:15]}... | 标签: {tags_str}")
+
+        # 4. 推送逻辑：根据模式决定是否立即推送 (事务提交后推送，不占用数据库写锁)
+        # 推送失败或标记前进程退出的快讯保持未推送，由 run_realtime_retry() 补发
+        if notify and NOTIFICATION_MODE == "realtime":
+            try:
+                if send_feishu_card(item.title, item.content, item.url, tags_str, item.pub_time):
+                    pushed.append(news_id)
+            except Exception as e:
+                logger.error(f"推送快讯失败: {e}")
+        # interval 模式：不立即推送，等待定时汇总任务处理
+        # is_pushed 保持 False，由 run_interval_summary() 统一处理
+    _mark_pushed(pushed)
+    result.push_count = len(pushed)
+
+    # 5. 归档本批新条目 (含未命中关键词的)，规则调整后可重新打标签
+    if ARCHIVE_ENABLED and written.fresh:
+        try:
+            archive_items(written.fresh)
+        except Exception as e:
+            logger.error(f"归档原始快讯失败: {e}")
+    return result
@@ -0,0 +1,111 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+def fold_case(text: str) -> str:
+    """
+    小写化且保持长度不变 (个别字符如 'İ' 小写后会变成两个字符，保持原样)，
+    保证匹配偏移量可以直接对应原文
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+class AhoCorasick:
+    """
+    Aho-Corasick 多模式匹配自动机 (不区分大小写)
+
+    构建一次后对任意文本单遍扫描，返回所有命中的关键词及其位置 (包括相互重叠的命中)，
+    耗时与文本长度 + 命中数成正比，与关键词数量无关。
+
+    纯 Python 实现的两点优化:
+    - 失配转移预先展开到每个节点的转移表 (_delta)，扫描时每个字符只查一次表
+    - 处于根节点时用正则 (C 实现) 直接跳到下一个可能的关键词首字符
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]]) -> None:
+        """patterns: (关键词, 类别) 序列，同一关键词可属于多个类别"""
+        self.patterns: List[Tuple[str, str]] = []
+        self.categories: List[str] = []  # 类别，按首次出现顺序
+        self._lengths: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for keyword, category in patterns:
+            folded = fold_case(keyword)
+            if not folded:
+                continue
+            node = 0
+            for ch in folded:
+                child = self._goto[node].get(ch)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][ch] = child
+                node = child
+            self._out[node].append(len(self.patterns))
+            self.patterns.append((keyword, category))
+            if category not in self.categories:
+                self.categories.append(category)
+            self._lengths.append(len(folded))
+
+        self._delta: List[Dict[str, int]] = [{} for _ in self._goto]
+        self._build_fail_links()
+        first_chars = "".join(re.escape(ch) for ch in self._goto[0])
+        self._skip: Optional[re.Pattern] = re.compile(f"[{first_chars}]") if first_chars else None
+
+    def _build_fail_links(self) -> None:
+        """
+        广度优先计算失配指针，并把失配链上的输出合并到当前节点；
+        同时展开转移表: 节点自身转移优先，其余沿失配链继承 (根节点的转移在扫描时单独查)
+        """
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            fail_node = self._fail[node]
+            if fail_node:
+                self._delta[node] = {**self._delta[fail_node], **self._goto[node]}
+            else:
+                self._delta[node] = self._goto[node]
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                if self._out[self._fail[child]]:
+                    self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """扫描文本，依次产出 (起始偏移, 结束偏移, 关键词序号)，偏移基于原文"""
+        if self._skip is None:
+            return
+        root, delta, out, lengths = self._goto[0], self._delta, self._out, self._lengths
+        search = self._skip.search
+        text = fold_case(text)
+        length = len(text)
+        node = 0
+        i = 0
+        while i < length:
+            if node:
+                ch = text[i]
+                child = delta[node].get(ch)
+                node = child if child is not None else root.get(ch, 0)
+            else:
+                # 根节点: 跳到下一个关键词首字符
+                found = search(text, i)
+                if found is None:
+                    return
+                i = found.start()
+                node = root[text[i]]
+            i += 1
+            if out[node]:
+                for index in out[node]:
+                    yield i - lengths[index], i, index
@@ -0,0 +1,197 @@
+"""
+数据库迁移: create_all 只会创建缺失的表，不会修改已存在的表 (新增列、索引)。
+迁移按版本号顺序执行，每个版本在一个写事务中完成并记录到 schema_migration 表，启动时自动执行未执行过的版本。
+
+新增迁移: 在文件末尾用 @migration(下一个版本号, "说明") 注册一个函数。
+迁移需可重复执行 (新库由 create_all 建好了完整结构，迁移只会检查后跳过)，使用 add_column / create_index 即可。
+"""
+import datetime
+from typing import Callable, List
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+from src.models import Counter, NewsFlash, ScanRecord, SchemaMigration
+from src.counters import SCAN_RECORD_COUNTER
+from src.tags import insert_news_tags, split_tags, tag_rows
+from src.rollup import rebuild_rollups
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.migrations")
+
+class Migration:
+    def __init__(self, version: int, name: str, apply: Callable[[Connection], None]) -> None:
+        self.version = version
+        self.name = name
+        self.apply = apply
+
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, name: str):
+    """注册迁移 (版本号必须递增)"""
+    def decorator(func: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"迁移版本号必须递增: {version}")
+        MIGRATIONS.append(Migration(version, name, func))
+        return func
+    return decorator
+
+def _columns(conn: Connection, table: str) -> set:
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """列不存在时执行 ALTER TABLE ADD COLUMN (ddl 为列类型及约束，如 'INTEGER NOT NULL DEFAULT 0')"""
+    if column in _columns(conn, table):
+        return
+    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+    logger.info(f"已添加列: {table}.{column}")
+
+def create_index(conn: Connection, table: str, name: str) -> None:
+    """创建模型中声明的索引 (已存在时跳过)"""
+    index = next(index for index in SQLModel.metadata.tables[table].indexes if index.name == name)
+    index.create(conn, checkfirst=True)
+
+_migrations = SchemaMigration.__table__
+
+def applied_versions(engine: Engine) -> List[int]:
+    with engine.connect() as conn:
+        return list(conn.execute(select(_migrations.c.version).order_by(_migrations.c.version)).scalars())
+
+def run_migrations(engine: Engine) -> List[int]:
+    """依次执行未执行过的迁移，返回本次执行的版本号"""
+    applied = []
+    for item in MIGRATIONS:
+        # 每个版本一个事务: 写引擎以 BEGIN IMMEDIATE 开始，多个进程同时启动时串行执行，事务内再检查一次是否已执行
+        with engine.begin() as conn:
+            done = conn.execute(select(_migrations.c.version).where(_migrations.c.version == item.version)).first()
+            if done:
+                continue
+            item.apply(conn)
+            conn.execute(insert(_migrations).values(version=item.version, name=item.name, applied_at=datetime.datetime.now()))
+        applied.append(item.version)
+        logger.info(f"已执行数据库迁移 v{item.version}: {item.name}")
+    return applied
+
+# --- 迁移 ---
+
+@migration(1, "source_state: 页面指纹与自适应调度字段")
+def _source_state_columns(conn: Connection) -> None:
+    add_column(conn, "source_state", "fingerprint", "VARCHAR")
+    add_column(conn, "source_state", "run_count", "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, "source_state", "short_circuit_count", "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, "source_state", "interval_seconds", "INTEGER")
+    add_column(conn, "source_state", "arrival_rate", "FLOAT")
+
+@migration(2, "newsflash: 规则版本与近似重复字段")
+def _newsflash_columns(conn: Connection) -> None:
+    add_column(conn, "newsflash", "rule_version", "INTEGER")
+    add_column(conn, "newsflash", "simhash", "INTEGER")
+    add_column(conn, "newsflash", "duplicate_of", "INTEGER")
+
+@migration(3, "newsflash: 热点查询复合索引")
+def _newsflash_indexes(conn: Connection) -> None:
+    for name in (
+        "ix_newsflash_pushed_created",
+        "ix_newsflash_duplicate_of_pub_time",
+        "ix_newsflash_source_pub_time",
+    ):
+        create_index(conn, "newsflash", name)
+    # 单列 duplicate_of 索引已被 (duplicate_of, pub_time) 取代
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_newsflash_duplicate_of")
+
+@migration(4, "newsflash_fts: 标题/正文全文索引 (FTS5 trigram)")
+def _newsflash_fts(conn: Connection) -> None:
+    # 外部内容表: 索引数据来自 newsflash，由触发器保持同步 (只在标题/正文变化时更新)
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS newsflash_fts USING fts5("
+        "title, content, content='newsflash', content_rowid='id', tokenize='trigram')"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS newsflash_fts_ai AFTER INSERT ON newsflash BEGIN "
+        "INSERT INTO newsflash_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS newsflash_fts_ad AFTER DELETE ON newsflash BEGIN "
+        "INSERT INTO newsflash_fts(newsflash_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS newsflash_fts_au AFTER UPDATE OF title, content ON newsflash BEGIN "
+        "INSERT INTO newsflash_fts(newsflash_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+        "INSERT INTO newsflash_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END"
+    )
+    # 为已有数据建立索引
+    conn.exec_driver_sql("INSERT INTO newsflash_fts(newsflash_fts) VALUES ('rebuild')")
+
+@migration(5, "news_tag: 标签关联表 (由 newsflash.tags 回填)")
+def _news_tag(conn: Connection) -> None:
+    # 表由 create_all 创建；删除快讯时同步删除其标签
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS newsflash_news_tag_ad AFTER DELETE ON newsflash BEGIN "
+        "DELETE FROM news_tag WHERE news_id = old.id; END"
+    )
+    # 按主键分段回填，避免一次读入全部快讯
+    news = NewsFlash.__table__
+    last_id, total = 0, 0
+    while True:
+        rows = conn.execute(
+            select(news.c.id, news.c.tags, news.c.pub_time)
+            .where(news.c.id > last_id, news.c.tags != "")
+            .order_by(news.c.id)
+            .limit(5000)
+        ).all()
+        if not rows:
+            break
+        tag_batch = [tag for row in rows for tag in tag_rows(row.id, split_tags(row.tags), row.pub_time)]
+        insert_news_tags(conn, tag_batch)
+        total += len(tag_batch)
+        last_id = rows[-1].id
+    if total:
+        logger.info(f"已回填快讯标签: {total} 行")
+
+@migration(6, "counter: 累计扫描数 (由 scan_record 初始化)")
+def _scan_record_counter(conn: Connection) -> None:
+    # 之后由入库流程累加，scan_record 中的旧记录压缩删除后总数不变
+    total = conn.execute(select(func.count()).select_from(ScanRecord.__table__)).scalar_one()
+    conn.execute(
+        sqlite_insert(Counter.__table__)
+        .values(name=SCAN_RECORD_COUNTER, value=total, updated_at=datetime.datetime.now())
+        .on_conflict_do_nothing()
+    )
+
+@migration(7, "stats_rollup: 按小时/来源/标签的统计汇总 (由原始表生成)")
+def _stats_rollup(conn: Connection) -> None:
+    # 表由 create_all 创建；扫描记录增加来源列 (已有记录来源未知，汇总中计入空来源)
+    add_column(conn, "scan_record", "source", "VARCHAR")
+    rebuild_rollups(conn)
+
+@migration(8, "newsflash: 删除 (created_at, tags) 覆盖索引 (仪表盘改读统计汇总)")
+def _drop_created_tags_index(conn: Connection) -> None:
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_newsflash_created_tags")
+
+@migration(9, "newsflash_bigram: 1~2 个字符的短词索引 (FTS5 单字/双字)")
+def _newsflash_bigram(conn: Connection) -> None:
+    # 无内容表: 只存倒排索引；分词由写连接注册的 newsflash_bigrams() 完成 (见 database.create_write_engine)
+    terms = "newsflash_bigrams(new.title || ' ' || coalesce(new.content, ''))"
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS newsflash_bigram USING fts5("
+        "terms, content='', contentless_delete=1, tokenize='unicode61 remove_diacritics 0')"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS newsflash_bigram_ai AFTER INSERT ON newsflash BEGIN "
+        f"INSERT INTO newsflash_bigram(rowid, terms) VALUES (new.id, {terms}); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS newsflash_bigram_ad AFTER DELETE ON newsflash BEGIN "
+        "DELETE FROM newsflash_bigram WHERE rowid = old.id; END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS newsflash_bigram_au AFTER UPDATE OF title, content ON newsflash BEGIN "
+        "DELETE FROM newsflash_bigram WHERE rowid = old.id; "
+        f"INSERT INTO newsflash_bigram(rowid, terms) VALUES (new.id, {terms}); END"
+    )
+    # 为已有数据建立索引
+    conn.exec_driver_sql(
+        "INSERT INTO newsflash_bigram(rowid, terms) "
+        "SELECT id, newsflash_bigrams(title || ' ' || coalesce(content, '')) FROM newsflash"
+    )
@@ -1,5 +1,6 @@
 from typing import Optional
 from datetime import datetime, date as dt_date
+from sqlalchemy import Index, String
 from sqlmodel import Field, SQLModel
 
 class NewsFlash(SQLModel, table=True):
@@ -7,6 +8,15 @@ class NewsFlash(SQLModel, table=True):
     快讯数据模型 - 映射到数据库表 'newsflash'
     """
     __tablename__ = "newsflash"
+    __table_args__ = (
+        # 热点查询的复合索引 (见 tests/test_migrations.py 中的 EXPLAIN QUERY PLAN 回归测试)
+        # 定时汇总: is_pushed = 0 AND created_at 范围
+        Index("ix_newsflash_pushed_created", "is_pushed", "created_at"),
+        # 报表/仪表盘最新快讯: 排除近似重复 (duplicate_of IS NULL) + pub_time 范围，按 pub_time 排序
+        Index("ix_newsflash_duplicate_of_pub_time", "duplicate_of", "pub_time"),
+        # 快讯列表按来源筛选，按 pub_time 排序分页
+        Index("ix_newsflash_source_pub_time", "source", "pub_time"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     
@@ -28,12 +38,33 @@ class NewsFlash(SQLModel, table=True):
     
     # 智能标签
     tags: str = Field(default="", description="触发的关键词标签，如 '安全,黑客'")
+    rule_version: Optional[int] = Field(default=None, description="打标签时使用的规则集版本 (0 表示内置默认规则)")
+
+    # 近似重复
+    simhash: Optional[int] = Field(default=None, description="标题+正文的 64 位 SimHash (按有符号整数存储)")
+    duplicate_of: Optional[int] = Field(default=None, description="近似重复时指向首条快讯 (canonical) 的 ID")
     
     # 状态标记
     is_pushed: bool = Field(default=False, description="是否已通过Webhook推送")
     in_daily_report: bool = Field(default=False, description="是否已计入日报")
     in_weekly_report: bool = Field(default=False, description="是否已计入周报")
 
+class NewsTag(SQLModel, table=True):
+    """
+    快讯标签关联表 - 每条快讯的每个标签一行 (NewsFlash.tags 为展示用的冗余字段)
+    按标签筛选/计数走 (tag, pub_time) 索引；pub_time 冗余自 NewsFlash，按标签筛选时可直接按时间排序分页
+    WITHOUT ROWID: 二级索引带有主键 (news_id)，按标签查快讯 ID 只读索引
+    """
+    __tablename__ = "news_tag"
+    __table_args__ = (
+        Index("ix_news_tag_tag_pub_time", "tag", "pub_time"),
+        {"sqlite_with_rowid": False},
+    )
+
+    news_id: int = Field(primary_key=True, foreign_key="newsflash.id", description="快讯 ID")
+    tag: str = Field(primary_key=True, sa_type=String(collation="NOCASE"), description="标签 (不区分大小写)")
+    pub_time: datetime = Field(description="快讯发布时间 (冗余自 NewsFlash)")
+
 class Report(SQLModel, table=True):
     """
     报表归档模型 - 映射到数据库表 'reports'
@@ -72,4 +103,91 @@ class ScanRecord(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     source_id: str = Field(index=True, unique=True, description="来源原始ID")
+    source: Optional[str] = Field(default=None, description="数据来源 (统计汇总重建时使用，旧记录为空)")
     created_at: datetime = Field(default_factory=datetime.now)
+
+class Counter(SQLModel, table=True):
+    """
+    累计计数器 - 每个计数一行 (如 scan_record: 累计扫描条数，旧扫描记录被压缩删除后总数不变)
+    """
+    __tablename__ = "counter"
+
+    name: str = Field(primary_key=True, description="计数器名称")
+    value: int = Field(default=0, description="当前值")
+    updated_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"onupdate": datetime.now})
+
+class StatsRollup(SQLModel, table=True):
+    """
+    统计汇总表 - 按 小时 × 来源 × 标签 累计扫描/匹配/推送数，由入库与推送流程在各自的写事务中增量更新 (见 src/rollup.py)
+    tag 为空字符串的行是该小时该来源的合计；每个标签一行时按快讯的标签分别计数
+    """
+    __tablename__ = "stats_rollup"
+    __table_args__ = (
+        # 仪表盘/趋势图: 合计行 (tag = '') 或指定标签的时间范围
+        Index("ix_stats_rollup_tag_bucket", "tag", "bucket"),
+        {"sqlite_with_rowid": False},
+    )
+
+    bucket: datetime = Field(primary_key=True, description="小时 (按入库时间取整点)")
+    source: str = Field(primary_key=True, description="数据来源 (来源未知的旧扫描记录为空字符串)")
+    tag: str = Field(default="", primary_key=True, sa_type=String(collation="NOCASE"), description="标签 (空字符串为合计)")
+    scanned_count: int = Field(default=0, description="新扫描条目数 (只记在合计行)")
+    matched_count: int = Field(default=0, description="新增快讯数 (含近似重复条目)")
+    pushed_count: int = Field(default=0, description="已推送的首条快讯数")
+
+class SourceState(SQLModel, table=True):
+    """
+    数据源抓取状态 - 记录每个来源的高水位 (最近一次已入库的最新快讯) 与页面指纹，用于增量抓取
+    """
+    __tablename__ = "source_state"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: str = Field(index=True, unique=True, description="数据来源 (e.g., 'aicoin', 'blockbeats')")
+    last_source_id: Optional[str] = Field(default=None, description="高水位: 最新一条快讯的 source_id")
+    last_pub_time: Optional[datetime] = Field(default=None, description="高水位: 最新一条快讯的发布时间")
+    fingerprint: Optional[str] = Field(default=None, description="上一轮列表页面指纹")
+    run_count: int = Field(default=0, description="累计抓取轮数")
+    short_circuit_count: int = Field(default=0, description="因页面指纹未变化而提前结束的轮数")
+    interval_seconds: Optional[int] = Field(default=None, description="自适应调度当前选定的抓取间隔 (秒)")
+    arrival_rate: Optional[float] = Field(default=None, description="新快讯到达速率 (条/分钟，指数加权平均)")
+    updated_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"onupdate": datetime.now})
+
+class BackfillCheckpoint(SQLModel, table=True):
+    """
+    历史回填进度 - 每个来源一条，记录回填目标日期与下一个待抓取的页码，中断后可从断点继续
+    """
+    __tablename__ = "backfill_checkpoint"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: str = Field(index=True, unique=True, description="数据来源 (e.g., 'aicoin', 'blockbeats')")
+    since: datetime = Field(description="回填目标: 抓取到该发布时间为止")
+    next_page: int = Field(default=1, description="下一个待抓取的页码")
+    oldest_pub_time: Optional[datetime] = Field(default=None, description="已回填到的最早发布时间")
+    scanned_count: int = Field(default=0, description="累计新增扫描条数")
+    matched_count: int = Field(default=0, description="累计新增高危条数")
+    completed: bool = Field(default=False, description="是否已回填到目标日期")
+    updated_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"onupdate": datetime.now})
+
+class RuleSet(SQLModel, table=True):
+    """
+    关键词规则集 - 每次发布生成一个新版本，is_active 标记当前生效的版本 (可切换回任意历史版本)
+    """
+    __tablename__ = "rule_set"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = Field(index=True, unique=True, description="规则版本号，从 1 递增")
+    rules_json: str = Field(description="规则内容 JSON: 白名单类别 (关键词/权重) 与黑名单")
+    note: str = Field(default="", description="发布说明")
+    is_active: bool = Field(default=False, index=True, description="是否为当前生效版本")
+    created_at: datetime = Field(default_factory=datetime.now, description="发布时间")
+    activated_at: Optional[datetime] = Field(default=None, description="最近一次生效时间")
+
+class SchemaMigration(SQLModel, table=True):
+    """
+    数据库迁移记录 - 每个已执行的迁移版本一条 (见 src/migrations.py)
+    """
+    __tablename__ = "schema_migration"
+
+    version: int = Field(primary_key=True, description="迁移版本号")
+    name: str = Field(description="迁移说明")
+    applied_at: datetime = Field(default_factory=datetime.now, description="执行时间")
@@ -0,0 +1,225 @@
+import re
+import heapq
+import hashlib
+import datetime
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from sqlmodel import Session, select
+
+from src import config
+from src.database import read_engine
+from src.models import NewsFlash
+from src.matcher import fold_case
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.neardup")
+
+SIMHASH_BITS = 64
+_MASK = (1 << SIMHASH_BITS) - 1
+_SHINGLE_SIZE = 3
+# 去掉空白、标点与符号 (\W 在 Unicode 模式下保留中日韩文字与字母数字)
+_NOISE = re.compile(r"[\W_]+")
+
+def normalize_text(title: str, content: str) -> str:
+    """归一化: 小写化，去掉空白与标点 (不同来源的排版差异不影响指纹)"""
+    return _NOISE.sub("", fold_case(f"{title} {content}"))
+
+# 逐位累加的向量化: 大整数划分为 64 个 32 位通道，第 i 个通道累计第 i 位为 1 的权重。
+# 预先为哈希的每个字节建表，每个特征只需 8 次查表与加法 (而不是 64 次逐位判断)
+_LANE_BITS = 32
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_SPREAD = [
+    [
+        sum(1 << ((position * 8 + bit) * _LANE_BITS) for bit in range(8) if byte >> bit & 1)
+        for byte in range(256)
+    ]
+    for position in range(SIMHASH_BITS // 8)
+]
+
+def _shingle_hash(shingle: str) -> bytes:
+    return hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+
+def simhash(title: str, content: str) -> int:
+    """
+    计算 64 位 SimHash (无符号)。
+    特征为归一化文本的字符 3-gram (中文无需分词)，以出现次数为权重；
+    改写几个字只影响少量特征，指纹只变化少数几位。
+    """
+    text = normalize_text(title, content)
+    if len(text) <= _SHINGLE_SIZE:
+        features = Counter([text])
+    else:
+        features = Counter(text[i:i + _SHINGLE_SIZE] for i in range(len(text) - _SHINGLE_SIZE + 1))
+
+    lanes = 0
+    total = 0
+    for shingle, count in features.items():
+        digest = _shingle_hash(shingle)
+        spread = 0
+        for position, byte in enumerate(reversed(digest)):
+            spread += _SPREAD[position][byte]
+        lanes += spread * count
+        total += count
+    # 某一位为 1 的权重超过一半 (即 +1/-1 加权和为正) 时该位取 1
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        if 2 * (lanes >> (bit * _LANE_BITS) & _LANE_MASK) > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    return ((a ^ b) & _MASK).bit_count()
+
+def to_signed(value: int) -> int:
+    """SQLite INTEGER 为有符号 64 位，入库前转换"""
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+def to_unsigned(value: int) -> int:
+    return value & _MASK
+
+class NearDupIndex:
+    """
+    近期快讯 SimHash 的内存 LSH 索引 (滑动时间窗口)
+
+    64 位指纹切成 max_distance + 1 段，汉明距离不超过 max_distance 的两个指纹至少有一段完全相同
+    (抽屉原理)，因此只需比较任一分段落在同一桶里的候选，查询开销与窗口大小基本无关。
+    只索引首条快讯 (canonical)，重复条目关联到首条，不进入索引。
+    """
+
+    def __init__(
+        self,
+        window_hours: int = config.NEAR_DUP_WINDOW_HOURS,
+        max_distance: int = config.NEAR_DUP_MAX_DISTANCE,
+        from_db: bool = True,
+        sliding_window: bool = True,
+    ) -> None:
+        """
+        from_db=False 时为临时索引 (如批内比对)，不从数据库加载；
+        sliding_window=False 时不淘汰旧条目 (按历史时间段加载的临时索引，见 load_range)
+        """
+        self.window = datetime.timedelta(hours=window_hours)
+        self.sliding_window = sliding_window
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        # 各分段的 (位移, 掩码)，64 位尽量均分
+        self._bands: List[Tuple[int, int]] = []
+        shift = 0
+        for band in range(bands):
+            width = SIMHASH_BITS // bands + (1 if band < SIMHASH_BITS % bands else 0)
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in self._bands]
+        self._entries: Dict[int, Tuple[int, datetime.datetime]] = {}  # news_id -> (指纹, 发布时间)
+        self._expiry: List[Tuple[datetime.datetime, int]] = []  # 按发布时间的最小堆，用于淘汰窗口外的条目 (可能含已失效的旧记录)
+        self._latest: Optional[datetime.datetime] = None
+        self._loaded = not from_db
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _keys(self, fingerprint: int) -> List[int]:
+        return [fingerprint >> shift & mask for shift, mask in self._bands]
+
+    def _evict(self) -> None:
+        if self._latest is None or not self.sliding_window:
+            return
+        horizon = self._latest - self.window
+        while self._expiry and self._expiry[0][0] < horizon:
+            pub_time, news_id = heapq.heappop(self._expiry)
+            # 条目重新加入 (发布时间变化) 或已被移除后，堆中留下的旧记录直接跳过
+            entry = self._entries.get(news_id)
+            if entry is not None and entry[1] == pub_time:
+                self._remove(news_id)
+
+    def _remove(self, news_id: int) -> None:
+        entry = self._entries.pop(news_id, None)
+        if entry is None:
+            return
+        for buckets, key in zip(self._buckets, self._keys(entry[0])):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.discard(news_id)
+                if not bucket:
+                    del buckets[key]
+
+    def add(self, news_id: int, fingerprint: int, pub_time: datetime.datetime) -> None:
+        fingerprint = to_unsigned(fingerprint)
+        with self._lock:
+            self._remove(news_id)
+            self._entries[news_id] = (fingerprint, pub_time)
+            for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+                buckets.setdefault(key, set()).add(news_id)
+            if self.sliding_window:
+                heapq.heappush(self._expiry, (pub_time, news_id))
+            if self._latest is None or pub_time > self._latest:
+                self._latest = pub_time
+            self._evict()
+
+    def find(self, fingerprint: int, pub_time: datetime.datetime) -> Optional[int]:
+        """返回汉明距离最小且发布时间在窗口内的首条快讯 ID，没有近似重复时返回 None"""
+        self.ensure_loaded()
+        fingerprint = to_unsigned(fingerprint)
+        best_id, best_distance = None, self.max_distance + 1
+        with self._lock:
+            candidates: Set[int] = set()
+            for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+                bucket = buckets.get(key)
+                if bucket:
+                    candidates |= bucket
+            for news_id in candidates:
+                other, other_time = self._entries[news_id]
+                if abs(other_time - pub_time) > self.window:
+                    continue
+                distance = hamming_distance(fingerprint, other)
+                if distance < best_distance or (distance == best_distance and best_id is not None and news_id < best_id):
+                    best_id, best_distance = news_id, distance
+        return best_id
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets = [{} for _ in self._bands]
+            self._entries.clear()
+            self._expiry.clear()
+            self._latest = None
+
+    def _load(self, since: datetime.datetime, until: Optional[datetime.datetime] = None) -> None:
+        """加载发布时间在 [since, until] 内的首条快讯；旧数据没有指纹时现场计算"""
+        query = select(NewsFlash.id, NewsFlash.simhash, NewsFlash.title, NewsFlash.content, NewsFlash.pub_time).where(
+            NewsFlash.pub_time >= since, NewsFlash.duplicate_of == None
+        )
+        if until is not None:
+            query = query.where(NewsFlash.pub_time <= until)
+        with Session(read_engine) as session:
+            rows = session.exec(query).all()
+        with self._lock:
+            self.clear()
+            for news_id, fingerprint, title, content, pub_time in rows:
+                self.add(news_id, fingerprint if fingerprint is not None else simhash(title, content), pub_time)
+            self._loaded = True
+
+    def rebuild(self, now: Optional[datetime.datetime] = None) -> int:
+        """从数据库加载窗口内的首条快讯 (启动时调用)"""
+        self._load((now or datetime.datetime.now()) - self.window)
+        logger.info(f"近似重复索引已重建: {len(self._entries)} 条 (窗口 {self.window})")
+        return len(self._entries)
+
+    def load_range(self, start: datetime.datetime, end: datetime.datetime) -> int:
+        """加载可能与 [start, end] 内条目近似重复的首条快讯 (前后各扩展一个窗口)，用于重新打标签等历史数据比对"""
+        self._load(start - self.window, end + self.window)
+        return len(self._entries)
+
+    def ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    # 数据库不可用时从空索引开始，不影响入库
+                    logger.warning(f"近似重复索引重建失败，从空索引开始: {e}")
+                    self._loaded = True
+
+near_dup_index = NearDupIndex()
@@ -1,7 +1,7 @@
 import requests
 import datetime
 from typing import List, Dict
-from src.config import FEISHU_WEBHOOK_URL
+from src.config import FEISHU_WEBHOOK_URL, FEISHU_TIMEOUT_SECONDS
 
 def send_feishu_card(title: str, content: str, url: str, tags: str, pub_time: datetime.datetime = None) -> bool:
     """
@@ -62,7 +62,7 @@ def send_feishu_card(title: str, content: str, url: str, tags: str, pub_time: da
     }
 
     try:
-        resp = requests.post(FEISHU_WEBHOOK_URL, json=payload)
+        resp = requests.post(FEISHU_WEBHOOK_URL, json=payload, timeout=FEISHU_TIMEOUT_SECONDS)
         resp.raise_for_status()
         result = resp.json()
         if result.get("code") == 0:
@@ -131,7 +131,7 @@ def send_feishu_summary(news_items: List[Dict], title_prefix: str = "Sentinel 
     }
 
     try:
-        resp = requests.post(FEISHU_WEBHOOK_URL, json=payload)
+        resp = requests.post(FEISHU_WEBHOOK_URL, json=payload, timeout=FEISHU_TIMEOUT_SECONDS)
         resp.raise_for_status()
         return True
     except Exception as e:
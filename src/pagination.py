@@ -0,0 +1,85 @@
+import datetime
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+from sqlalchemy import and_, func, or_
+from sqlmodel import desc, select
+
+from src.config import NEWS_COUNT_CACHE_TTL_SECONDS
+
+# 快讯列表游标分页: 按 (pub_time, id) 倒序，下一页从上一页最后一条之后继续 (只走索引范围，不像 OFFSET 那样逐行跳过)
+
+CursorKey = Tuple[datetime.datetime, int]
+
+def encode_cursor(pub_time: datetime.datetime, news_id: int) -> str:
+    return f"{pub_time.isoformat()}_{news_id}"
+
+def decode_cursor(value: Optional[str]) -> Optional[CursorKey]:
+    """解析游标，格式不正确时返回 None (退回第一页)"""
+    if not value:
+        return None
+    pub_time, _, news_id = value.rpartition("_")
+    try:
+        return datetime.datetime.fromisoformat(pub_time), int(news_id)
+    except ValueError:
+        return None
+
+def apply_cursor(query, pub_time, news_id, after: Optional[CursorKey] = None, before: Optional[CursorKey] = None):
+    """
+    按 (pub_time, news_id) 排序并从游标处继续。
+    after: 游标之后 (更早) 的一页，倒序；before: 游标之前 (更新) 的一页，按正序返回，调用方需反转。
+    条件写成 pub_time <= t AND (pub_time < t OR id < n)，可直接作为 pub_time 索引的范围条件。
+    """
+    if before is not None:
+        cursor_time, cursor_id = before
+        return (
+            query.where(and_(pub_time >= cursor_time, or_(pub_time > cursor_time, news_id > cursor_id)))
+            .order_by(pub_time, news_id)
+        )
+    if after is not None:
+        cursor_time, cursor_id = after
+        query = query.where(and_(pub_time <= cursor_time, or_(pub_time < cursor_time, news_id < cursor_id)))
+    return query.order_by(desc(pub_time), desc(news_id))
+
+def count_statement(query):
+    """筛选条件下的总数 (去掉排序/分页)"""
+    return select(func.count()).select_from(query.order_by(None).limit(None).offset(None).subquery())
+
+class CountCache:
+    """
+    按筛选条件缓存快讯总数。本进程入库后调用 invalidate() 整体失效；
+    其他进程写入的数据 (回填/重新打标签命令) 在 ttl_seconds 后计入。
+    计数前先取 generation，写入时若期间发生过失效则丢弃 (避免把入库前的旧计数缓存下来)。
+    """
+
+    def __init__(self, ttl_seconds: float = NEWS_COUNT_CACHE_TTL_SECONDS, max_entries: int = 256) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+                return None
+            return entry[0]
+
+    def set(self, key: Hashable, count: int, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                # 淘汰最早写入的条目
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (count, time.monotonic())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+# 全局单例 (Web 列表页读取，入库流程失效)
+news_count_cache = CountCache()
@@ -1,23 +1,28 @@
 import datetime
-from typing import List
+from typing import List, Optional
 from sqlmodel import Session, select
-from src.database import engine
+from src.database import engine, read_engine
 from src.models import NewsFlash, Report
+from src.rollup import RollupTotals, get_rollup_totals
 from src.notifier import send_feishu_summary
 from src.logger import setup_logger
 
 logger = setup_logger("sentinel.report")
 
+def news_in_range_statement(start_time: datetime.datetime, end_time: datetime.datetime):
+    """pub_time 范围内的首条快讯 (走 ix_newsflash_duplicate_of_pub_time 索引)"""
+    return select(NewsFlash).where(
+        NewsFlash.pub_time >= start_time,
+        NewsFlash.pub_time <= end_time,
+        NewsFlash.duplicate_of == None
+    ).order_by(NewsFlash.pub_time.desc())
+
 def get_news_in_range(start_time: datetime.datetime, end_time: datetime.datetime) -> List[NewsFlash]:
     """
-    查询指定时间范围内的所有新闻
+    查询指定时间范围内的所有新闻 (近似重复条目只保留首条)
     """
-    with Session(engine) as session:
-        statement = select(NewsFlash).where(
-            NewsFlash.pub_time >= start_time,
-            NewsFlash.pub_time <= end_time
-        ).order_by(NewsFlash.pub_time.desc())
-        results = session.exec(statement).all()
+    with Session(read_engine) as session:
+        results = session.exec(news_in_range_statement(start_time, end_time)).all()
         return list(results)
 
 def _generate_report_payload(news_list: List[NewsFlash]) -> List[dict]:
@@ -34,7 +39,14 @@ def _generate_report_payload(news_list: List[NewsFlash]) -> List[dict]:
         })
     return payload
 
-def _generate_html_report(title: str, start_time: datetime.datetime, end_time: datetime.datetime, news_list: List[NewsFlash]) -> str:
+def get_period_totals(start_time: datetime.datetime, end_time: datetime.datetime) -> RollupTotals:
+    """
+    统计周期内的抓取/匹配/推送数 (读取按小时的统计汇总，周期首尾按整点计)
+    """
+    with Session(read_engine) as session:
+        return get_rollup_totals(session, start_time, end_time)
+
+def _generate_html_report(title: str, start_time: datetime.datetime, end_time: datetime.datetime, news_list: List[NewsFlash], totals: Optional[RollupTotals] = None) -> str:
     """
     生成简单的静态 HTML 报表内容
     """
@@ -58,6 +70,9 @@ def _generate_html_report(title: str, start_time: datetime.datetime, end_time: d
         html_items.append(item_html)
     
     joined_items = "\n".join(html_items)
+    totals_html = ""
+    if totals:
+        totals_html = f'<p style="color:#666;">周期内抓取 {totals.scanned_count} 条，匹配 {totals.matched_count} 条，推送 {totals.pushed_count} 条。</p>'
     
     full_html = f"""
     <!DOCTYPE html>
@@ -70,6 +85,7 @@ def _generate_html_report(title: str, start_time: datetime.datetime, end_time: d
         <h1 style="border-bottom: 2px solid #10b981; padding-bottom: 10px;">{title}</h1>
         <p style="color:#666;">统计周期: {start_time.strftime('%Y-%m-%d %H:%M')} ~ {end_time.strftime('%Y-%m-%d %H:%M')}</p>
         <p>共收录 {len(news_list)} 条高价值情报。</p>
+        {totals_html}
         <hr style="border:0; border-top:1px solid #eee; margin:20px 0;">
         
         {joined_items}
@@ -119,7 +135,7 @@ def run_daily_report():
     is_sent = send_feishu_summary(items_payload, title_prefix="Sentinel 日报")
     
     # 2. 无论推送是否成功，都尝试生成并保存归档 (作为记录)
-    html_content = _generate_html_report(title, yesterday, now, news_list)
+    html_content = _generate_html_report(title, yesterday, now, news_list, get_period_totals(yesterday, now))
     
     with Session(engine) as session:
         # 保存归档
@@ -160,7 +176,7 @@ def run_weekly_report():
     is_sent = send_feishu_summary(items_payload, title_prefix="Sentinel 周报")
     
     # 2. 生成归档
-    html_content = _generate_html_report(title, last_week, now, news_list)
+    html_content = _generate_html_report(title, last_week, now, news_list, get_period_totals(last_week, now))
     
     with Session(engine) as session:
         # 保存归档
@@ -0,0 +1,124 @@
+"""
+重新打标签: 用当前生效的关键词规则重新过滤归档中的原始快讯，补录新命中的条目 (无需重新抓取)
+
+用法:
+    python -m src.retag --since 2026-09-01
+    python -m src.retag --since 2026-09-01 --until 2026-10-01 --dry-run   # 只统计，不入库
+"""
+import argparse
+import datetime
+from typing import Iterable, Iterator, List, Optional
+from pydantic import BaseModel
+from sqlmodel import Session
+
+from src.database import engine, init_db, read_engine
+from src.models import NewsFlash
+from src.scrapers.base import RawNews
+from src.archive import iter_archive
+from src.filter import get_compiled, get_risk_tags_batch
+from src.neardup import NearDupIndex, simhash
+from src.dedup import select_existing
+from src.ingest import BulkIngestResult, insert_news
+from src.pagination import news_count_cache
+from src.counters import NEWSFLASH_COUNTER, increment_counter
+from src.rollup import RollupDelta, apply_rollup
+from src.config import RETAG_CHUNK_SIZE, NEAR_DUP_ENABLED
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.retag")
+
+class RetagResult(BaseModel):
+    scanned_count: int = 0  # 读取的归档条目数
+    matched_count: int = 0  # 按当前规则命中的条目数
+    inserted_count: int = 0  # 新补录到 NewsFlash 的条目数
+    rule_version: int = 0
+
+def _chunks(items: Iterable[RawNews], size: int) -> Iterator[List[RawNews]]:
+    chunk: List[RawNews] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def retag_archive(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    dry_run: bool = False,
+    directory: Optional[str] = None,
+) -> RetagResult:
+    """
+    流式读取 [start, end) 的归档条目，按 RETAG_CHUNK_SIZE 分批用当前规则并行打标签，
+    将命中且尚未入库的条目写入 NewsFlash。补录的条目标记为已推送 (历史快讯不再推送)，
+    近似重复条目与入库流程一样关联到首条 (含已入库的快讯)。
+    """
+    compiled = get_compiled()
+    result = RetagResult(rule_version=compiled.version)
+    logger.info(f"开始重新打标签: {start} ~ {end}，规则版本 v{compiled.version}{' (dry-run)' if dry_run else ''}")
+
+    for chunk in _chunks(iter_archive(start, end, directory), RETAG_CHUNK_SIZE):
+        result.scanned_count += len(chunk)
+        tags_list = get_risk_tags_batch([(item.title, item.content) for item in chunk], compiled)
+        matched = {}
+        for item, tags in zip(chunk, tags_list):
+            if tags:
+                # 同一条目可能被归档多次 (如回填重叠)，以最后一次为准
+                matched[item.source_id] = (item, tags)
+        result.matched_count += len(matched)
+        if not matched or dry_run:
+            continue
+
+        # 已入库的条目先按只读快照过滤 (不占用写锁)；快照之后并发入库的同一 source_id 由 ON CONFLICT 跳过
+        with Session(read_engine) as session:
+            existing = select_existing(session, NewsFlash.source_id, list(matched))
+        pending = [(item, tags) for source_id, (item, tags) in matched.items() if source_id not in existing]
+        if not pending:
+            continue
+        fingerprints = {item.source_id: simhash(item.title, item.content) for item, _ in pending}
+        # 近似重复: 与入库流程一样关联到首条；归档条目可能早于近期索引的窗口，按本批时间范围从数据库加载临时索引
+        index = None
+        if NEAR_DUP_ENABLED:
+            index = NearDupIndex(from_db=False, sliding_window=False)
+            index.load_range(min(item.pub_time for item, _ in pending), max(item.pub_time for item, _ in pending))
+
+        now = datetime.datetime.now()
+        written = BulkIngestResult()
+        with Session(engine) as session:
+            # 补录的快讯入库即为已推送 (历史快讯不再推送)
+            _, news_ids = insert_news(session, pending, fingerprints, index, compiled.version, True, now, written)
+            # 补录的快讯计入统计汇总与累计快讯数 (近似重复条目不计推送数)
+            rollup = RollupDelta()
+            for item, tags in pending:
+                if item.source_id in news_ids:
+                    rollup.add_matched(now, item.source, tags, pushed=item.source_id not in written.duplicates)
+            apply_rollup(session.connection(), rollup)
+            increment_counter(session.connection(), NEWSFLASH_COUNTER, len(news_ids))
+            session.commit()
+
+        result.inserted_count += len(news_ids)
+        if news_ids:
+            news_count_cache.invalidate()
+        for item, tags in pending:
+            if item.source_id in news_ids:
+                duplicate = f" | 关联到 #{written.duplicates[item.source_id]}" if item.source_id in written.duplicates else ""
+                logger.info(f"[补录] [{item.source}] {item.pub_time.strftime('%m-%d %H:%M')} | {item.title[:15]}... | 标签: {','.join(tags)}{duplicate}")
+
+    logger.info(
+        f"重新打标签完成。归档条目: {result.scanned_count}, 命中: {result.matched_count}, 新补录: {result.inserted_count}"
+    )
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sentinel 归档快讯重新打标签")
+    parser.add_argument("--since", required=True, type=datetime.datetime.fromisoformat, help="开始时间，如 2026-09-01")
+    parser.add_argument("--until", type=datetime.datetime.fromisoformat, default=None, help="结束时间 (不含)，默认当前时间")
+    parser.add_argument("--dry-run", action="store_true", help="只统计命中数量，不写入数据库")
+    args = parser.parse_args()
+
+    init_db()
+    retag_archive(args.since, args.until or datetime.datetime.now(), dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+扫描记录保留策略: scan_record 只保留最近 SCAN_RETENTION_DAYS 天 (按写入时间)，更早的记录按月压缩为
+<SCAN_SEGMENT_DIR>/scan-<yyyy-mm>.bin —— 排序后的 64 位指纹数组 (每条 8 字节，小端)，去重时二分查找。
+live 表与其唯一索引的大小只取决于保留天数，与运行时长无关；累计扫描数保存在 counter 表。
+
+压缩顺序: 先写分段 (临时文件 + 原子替换)，再在写事务中删除对应记录；中途中断时记录同时存在于两处，不影响去重。
+
+用法:
+    python -m src.retention                 # 按配置的保留天数压缩
+    python -m src.retention --days 7
+"""
+import argparse
+import bisect
+import datetime
+import os
+import sys
+import threading
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from src import config
+from src.database import engine, init_db, read_engine
+from src.models import ScanRecord
+from src.dedup import IN_QUERY_BATCH, scan_cache, source_fingerprint
+from src.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: 仅靠进程内锁
+    fcntl = None
+
+logger = setup_logger("sentinel.retention")
+
+# 每批压缩的记录数 (一批一个写事务)
+COMPACT_CHUNK_SIZE = 50000
+
+_compact_lock = threading.Lock()
+
+class CompactResult(BaseModel):
+    """一次压缩的结果"""
+    compacted_count: int = 0  # 从 scan_record 移入分段的记录数
+    months: List[str] = []  # 涉及的月份分段 (yyyy-mm)
+
+def _segment_path(month: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or config.SCAN_SEGMENT_DIR, f"scan-{month}.bin")
+
+def _read_segment(path: str) -> array:
+    fingerprints = array("Q")
+    with open(path, "rb") as f:
+        fingerprints.frombytes(f.read())
+    if sys.byteorder == "big":
+        fingerprints.byteswap()
+    return fingerprints
+
+def _write_segment(path: str, fingerprints: array) -> None:
+    """写入临时文件后原子替换，读方不会看到写了一半的分段"""
+    data = array("Q", fingerprints)
+    if sys.byteorder == "big":
+        data.byteswap()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _merge_segment(month: str, fingerprints: Iterable[int], directory: Optional[str] = None) -> int:
+    """将指纹并入某月的分段 (去重并保持有序)，返回分段中的指纹数"""
+    path = _segment_path(month, directory)
+    merged = set(fingerprints)
+    if os.path.exists(path):
+        merged.update(_read_segment(path))
+    _write_segment(path, array("Q", sorted(merged)))
+    return len(merged)
+
+class ScanSegments:
+    """
+    已压缩的历史扫描记录 (各月分段的只读镜像)，与 ScanCache 一起在入库前判断条目是否扫描过。
+    分段目录发生变化 (本进程或其他进程压缩写入了新分段) 时自动重新加载。
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory
+        self._segments: Dict[str, array] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(fingerprints) for fingerprints in self._segments.values())
+
+    def __contains__(self, source_id: str) -> bool:
+        return self.contains_fingerprint(source_fingerprint(source_id))
+
+    def contains_fingerprint(self, fingerprint: int) -> bool:
+        for fingerprints in self._segments.values():
+            position = bisect.bisect_left(fingerprints, fingerprint)
+            if position < len(fingerprints) and fingerprints[position] == fingerprint:
+                return True
+        return False
+
+    def refresh(self, force: bool = False) -> None:
+        """目录有变化时重新加载 (每批入库前调用一次，未变化时只有一次 stat)"""
+        directory = self.directory or config.SCAN_SEGMENT_DIR
+        try:
+            version = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            version = 0
+        if version == self._version and not force:
+            return
+        with self._lock:
+            segments = {}
+            if version:
+                for name in sorted(os.listdir(directory)):
+                    if name.startswith("scan-") and name.endswith(".bin"):
+                        segments[name[len("scan-"):-len(".bin")]] = _read_segment(os.path.join(directory, name))
+            self._segments = segments
+            self._version = version
+        if segments:
+            logger.info(f"已加载扫描记录分段: {len(segments)} 个月，{len(self)} 条")
+
+# 全局单例
+scan_segments = ScanSegments()
+
+def compact_scan_records(
+    now: Optional[datetime.datetime] = None,
+    retention_days: Optional[int] = None,
+    directory: Optional[str] = None,
+) -> CompactResult:
+    """
+    将写入时间早于保留期的扫描记录按月并入分段并从 scan_record 删除。
+    记录按 id (写入顺序) 分批读取，遇到保留期内的记录即停止。
+    """
+    now = now or datetime.datetime.now()
+    retention_days = config.SCAN_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = now - datetime.timedelta(days=retention_days)
+    directory = directory or config.SCAN_SEGMENT_DIR
+    os.makedirs(directory, exist_ok=True)
+    result = CompactResult()
+    months = set()
+
+    with _compact_lock, open(os.path.join(directory, ".lock"), "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        last_id = 0
+        while True:
+            with Session(read_engine) as session:
+                rows = session.exec(
+                    select(ScanRecord.id, ScanRecord.source_id, ScanRecord.created_at)
+                    .where(ScanRecord.id > last_id)
+                    .order_by(ScanRecord.id)
+                    .limit(COMPACT_CHUNK_SIZE)
+                ).all()
+            expired = [row for row in rows if row.created_at < cutoff]
+            if not expired:
+                break
+
+            # 1. 先写分段
+            by_month: Dict[str, List[int]] = defaultdict(list)
+            for row in expired:
+                by_month[row.created_at.strftime("%Y-%m")].append(source_fingerprint(row.source_id))
+            for month, fingerprints in by_month.items():
+                _merge_segment(month, fingerprints, directory)
+            months.update(by_month)
+
+            # 2. 再删除记录
+            ids = [row.id for row in expired]
+            with Session(engine) as session:
+                connection = session.connection()
+                for start in range(0, len(ids), IN_QUERY_BATCH):
+                    connection.execute(delete(ScanRecord.__table__).where(ScanRecord.id.in_(ids[start:start + IN_QUERY_BATCH])))
+                session.commit()
+            result.compacted_count += len(ids)
+
+            if len(expired) < len(rows) or len(rows) < COMPACT_CHUNK_SIZE:
+                break
+            last_id = rows[-1].id
+
+    result.months = sorted(months)
+    if result.compacted_count:
+        # 去重缓存中的已删除记录转由分段判断
+        scan_segments.refresh(force=True)
+        if scan_cache.loaded:
+            scan_cache.rebuild()
+    logger.info(f"扫描记录压缩完成: 移入分段 {result.compacted_count} 条，月份: {', '.join(result.months) or '-'}")
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sentinel 扫描记录压缩")
+    parser.add_argument("--days", type=int, default=None, help=f"保留天数，默认 {config.SCAN_RETENTION_DAYS}")
+    args = parser.parse_args()
+
+    init_db()
+    compact_scan_records(retention_days=args.days)
+
+if __name__ == "__main__":
+    main()
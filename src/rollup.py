@@ -0,0 +1,228 @@
+"""
+统计汇总表 stats_rollup: 按 小时 × 来源 × 标签 累计扫描数 / 匹配数 / 推送数。
+入库 (bulk_ingest)、推送标记 (实时推送与定时汇总) 与重新打标签补录在各自的写事务中增量更新；
+仪表盘、趋势图与报表只读取几十行汇总数据，不再扫描历史表。
+
+统计口径 (增量更新与重建一致):
+- 小时按入库时间 (ScanRecord / NewsFlash 的 created_at) 取整点
+- tag 为空字符串的行是合计: scanned = 新扫描条目数，matched = 新增快讯数 (含近似重复条目)，pushed = 已推送的首条快讯数
+- 每个标签一行: matched / pushed 按快讯的各个标签分别计数 (有多个标签的快讯计入多行)
+- 已推送 = is_pushed 且不是近似重复条目 (历史回填与补录的快讯入库时即标记为已推送，也计入)
+
+重建: 匹配数与推送数由 newsflash / news_tag 重新计算；扫描数由 scan_record 重新计算，
+已压缩到分段的旧扫描记录 (见 src/retention.py) 不再有时间信息，这些小时保留原有的扫描数。
+
+用法:
+    python -m src.rollup                # 从原始表重建统计汇总
+"""
+import argparse
+import datetime
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+from sqlalchemy import and_, case, delete, func, literal, true, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, select
+
+from src.models import Counter, NewsFlash, NewsTag, ScanRecord, StatsRollup
+from src.counters import NEWSFLASH_COUNTER
+from src.retention import scan_segments
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.rollup")
+
+# 合计行的标签
+TOTAL_TAG = ""
+
+# 与 SQLAlchemy 在 SQLite 中存储 DATETIME 的格式一致，SQL 中取整的小时与 Python 写入的小时是同一个主键
+_HOUR_FORMAT = "%Y-%m-%d %H:00:00.000000"
+
+RollupKey = Tuple[datetime.datetime, str, str]
+
+class RollupTotals(BaseModel):
+    """一段时间内的合计"""
+    scanned_count: int = 0
+    matched_count: int = 0
+    pushed_count: int = 0
+
+def hour_bucket(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def _unique_tags(tags: Iterable[str]) -> List[str]:
+    """与 news_tag 一致: 标签不区分大小写，同一条快讯的重复标签只计一次"""
+    unique: Dict[str, str] = {}
+    for tag in tags:
+        unique.setdefault(tag.lower(), tag)
+    return list(unique.values())
+
+class RollupDelta:
+    """一个写事务内的汇总增量，提交前由 apply_rollup 一次写入"""
+
+    def __init__(self) -> None:
+        self._counts: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def __bool__(self) -> bool:
+        return bool(self._counts)
+
+    def add_scanned(self, created_at: datetime.datetime, source: str, count: int = 1) -> None:
+        if count:
+            self._counts[(hour_bucket(created_at), source, TOTAL_TAG)][0] += count
+
+    def add_matched(self, created_at: datetime.datetime, source: str, tags: Iterable[str], pushed: bool = False) -> None:
+        """新写入一条快讯 (pushed: 写入时即为已推送的首条)"""
+        bucket = hour_bucket(created_at)
+        for tag in [TOTAL_TAG, *_unique_tags(tags)]:
+            counts = self._counts[(bucket, source, tag)]
+            counts[1] += 1
+            if pushed:
+                counts[2] += 1
+
+    def add_pushed(self, created_at: datetime.datetime, source: str, tags: Iterable[str]) -> None:
+        """已有的首条快讯被标记为已推送"""
+        bucket = hour_bucket(created_at)
+        for tag in [TOTAL_TAG, *_unique_tags(tags)]:
+            self._counts[(bucket, source, tag)][2] += 1
+
+    def rows(self) -> List[dict]:
+        return [
+            {"bucket": bucket, "source": source, "tag": tag, "scanned_count": scanned, "matched_count": matched, "pushed_count": pushed}
+            for (bucket, source, tag), (scanned, matched, pushed) in self._counts.items()
+        ]
+
+def apply_rollup(connection: Connection, delta: RollupDelta) -> None:
+    """汇总增量累加到 stats_rollup (UPSERT)，在调用方的事务中执行"""
+    if not delta:
+        return
+    stmt = insert(StatsRollup.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StatsRollup.bucket, StatsRollup.source, StatsRollup.tag],
+        set_={
+            "scanned_count": StatsRollup.scanned_count + stmt.excluded.scanned_count,
+            "matched_count": StatsRollup.matched_count + stmt.excluded.matched_count,
+            "pushed_count": StatsRollup.pushed_count + stmt.excluded.pushed_count,
+        },
+    )
+    connection.execute(stmt, delta.rows())
+
+# --- 查询 ---
+
+def totals_statement(start: datetime.datetime, end: Optional[datetime.datetime] = None):
+    """start 所在小时起 (到 end 所在小时为止) 的合计"""
+    query = select(
+        func.coalesce(func.sum(StatsRollup.scanned_count), 0),
+        func.coalesce(func.sum(StatsRollup.matched_count), 0),
+        func.coalesce(func.sum(StatsRollup.pushed_count), 0),
+    ).where(StatsRollup.tag == TOTAL_TAG, StatsRollup.bucket >= hour_bucket(start))
+    if end is not None:
+        query = query.where(StatsRollup.bucket <= hour_bucket(end))
+    return query
+
+def to_totals(row) -> RollupTotals:
+    return RollupTotals(scanned_count=row[0], matched_count=row[1], pushed_count=row[2])
+
+def get_rollup_totals(session: Session, start: datetime.datetime, end: Optional[datetime.datetime] = None) -> RollupTotals:
+    return to_totals(session.exec(totals_statement(start, end)).one())
+
+def tag_counts_statement(tags: List[str], start: datetime.datetime):
+    """各标签自 start 所在小时起 (按入库时间) 的快讯数"""
+    return (
+        select(StatsRollup.tag, func.sum(StatsRollup.matched_count))
+        .where(StatsRollup.tag.in_(tags), StatsRollup.bucket >= hour_bucket(start))
+        .group_by(StatsRollup.tag)
+    )
+
+def daily_trend_statement(start: datetime.datetime):
+    """自 start 所在小时起按天的合计: (yyyy-mm-dd, 扫描数, 匹配数, 推送数)"""
+    day = func.date(StatsRollup.bucket)
+    return (
+        select(day, func.sum(StatsRollup.scanned_count), func.sum(StatsRollup.matched_count), func.sum(StatsRollup.pushed_count))
+        .where(StatsRollup.tag == TOTAL_TAG, StatsRollup.bucket >= hour_bucket(start))
+        .group_by(day)
+        .order_by(day)
+    )
+
+# --- 重建 ---
+
+def _hour(column):
+    return func.strftime(_HOUR_FORMAT, column)
+
+def _upsert_from_select(connection: Connection, query, columns: List[str]) -> None:
+    """INSERT ... SELECT 汇总结果，已存在的行覆盖这些列"""
+    # SQLite 解析 INSERT ... SELECT ... ON CONFLICT 需要 SELECT 带有 WHERE 子句 (消除歧义)
+    stmt = insert(StatsRollup.__table__).from_select(["bucket", "source", "tag", *columns], query.where(true()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StatsRollup.bucket, StatsRollup.source, StatsRollup.tag],
+        set_={column: getattr(stmt.excluded, column) for column in columns},
+    )
+    connection.execute(stmt)
+
+def _scan_window_start(connection: Connection) -> Optional[datetime.datetime]:
+    """scan_record 完整覆盖的第一个小时 (发生过压缩时最早一条记录所在的小时可能只剩一部分)；无记录时为 None"""
+    earliest = connection.execute(select(func.min(ScanRecord.created_at))).scalar()
+    if earliest is None:
+        return None
+    scan_segments.refresh()
+    start = hour_bucket(earliest)
+    return start + datetime.timedelta(hours=1) if len(scan_segments) else start
+
+def rebuild_rollups(connection: Connection) -> None:
+    """由原始表重新生成统计汇总与累计快讯数，在调用方的写事务中执行 (期间入库流程等待写锁)"""
+    rollup = StatsRollup.__table__
+    scan_start = _scan_window_start(connection)
+
+    # 1. 清空可以重新计算的部分
+    if scan_start is not None:
+        connection.execute(delete(rollup).where(rollup.c.bucket >= scan_start))
+    connection.execute(update(rollup).values(matched_count=0, pushed_count=0))
+
+    # 2. 扫描数 (只记在合计行)
+    if scan_start is not None:
+        records = ScanRecord.__table__
+        bucket, source = _hour(records.c.created_at), func.coalesce(records.c.source, "")
+        query = (
+            select(bucket, source, literal(TOTAL_TAG), func.count())
+            .where(records.c.created_at >= scan_start)
+            .group_by(bucket, source)
+        )
+        _upsert_from_select(connection, query, ["scanned_count"])
+
+    # 3. 匹配数 / 推送数: 合计行按快讯计数，标签行按 news_tag 计数
+    news = NewsFlash.__table__
+    bucket = _hour(news.c.created_at)
+    pushed = func.sum(case((and_(news.c.is_pushed == True, news.c.duplicate_of.is_(None)), 1), else_=0))
+    query = select(bucket, news.c.source, literal(TOTAL_TAG), func.count(), pushed).group_by(bucket, news.c.source)
+    _upsert_from_select(connection, query, ["matched_count", "pushed_count"])
+    tags = NewsTag.__table__
+    query = (
+        select(bucket, news.c.source, tags.c.tag, func.count(), pushed)
+        .select_from(tags.join(news, news.c.id == tags.c.news_id))
+        .group_by(bucket, news.c.source, tags.c.tag)
+    )
+    _upsert_from_select(connection, query, ["matched_count", "pushed_count"])
+
+    # 4. 清理全为 0 的行
+    connection.execute(delete(rollup).where(
+        rollup.c.scanned_count == 0, rollup.c.matched_count == 0, rollup.c.pushed_count == 0
+    ))
+
+    # 累计快讯数 (仪表盘总匹配数)
+    total = connection.execute(select(func.count()).select_from(news)).scalar_one()
+    stmt = insert(Counter.__table__).values(name=NEWSFLASH_COUNTER, value=total, updated_at=datetime.datetime.now())
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[Counter.name], set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at}
+    ))
+
+    rows = connection.execute(select(func.count()).select_from(rollup)).scalar_one()
+    logger.info(f"统计汇总已重建: {rows} 行，快讯 {total} 条，扫描数重算起点: {scan_start or '-'}")
+
+def main() -> None:
+    argparse.ArgumentParser(description="Sentinel 统计汇总重建").parse_args()
+
+    from src.database import engine, init_db
+    init_db()
+    with engine.begin() as conn:
+        rebuild_rollups(conn)
+
+if __name__ == "__main__":
+    main()
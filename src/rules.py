@@ -0,0 +1,128 @@
+import re
+import datetime
+from typing import List, Optional, Tuple
+from pydantic import BaseModel
+from sqlmodel import Session, select, desc
+from sqlalchemy import func
+
+from src import config
+from src.database import engine, read_engine
+from src.models import RuleSet
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.rules")
+
+# 关键词规则快照: ((类别, (关键词, ...)), ...)，黑名单在最前，用于构建自动机
+RulesKey = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+# 黑名单在自动机中的类别名 (不会作为标签输出)
+IGNORE_CATEGORY = "忽略"
+
+class RuleCategory(BaseModel):
+    """白名单类别: 命中任一关键词即打上该标签"""
+    name: str
+    keywords: List[str] = []
+    weight: float = 1.0  # 类别权重，命中类别的权重之和作为风险分
+    # 高危类别: 命中后立即收紧该来源的抓取间隔；None 表示按 config.HIGH_RISK_TAGS 判断 (兼容未设置该字段的旧版本规则集)
+    high_risk: Optional[bool] = None
+
+    def is_high_risk(self) -> bool:
+        return self.high_risk if self.high_risk is not None else self.name in config.HIGH_RISK_TAGS
+
+class Rules(BaseModel):
+    """一个版本的完整规则"""
+    categories: List[RuleCategory] = []
+    ignore_words: List[str] = []  # 黑名单: 命中即丢弃，优先级最高
+
+    def key(self) -> RulesKey:
+        return ((IGNORE_CATEGORY, tuple(self.ignore_words)),) + tuple(
+            (category.name, tuple(category.keywords)) for category in self.categories
+        )
+
+    def keyword_count(self) -> int:
+        return sum(len(category.keywords) for category in self.categories)
+
+    def high_risk_tags(self) -> List[str]:
+        return [category.name for category in self.categories if category.is_high_risk()]
+
+def default_rules() -> Rules:
+    """内置默认规则 (config.py 中的关键词列表)"""
+    return Rules(
+        categories=[
+            RuleCategory(name="安全", keywords=list(config.KEYWORDS_SECURITY), high_risk="安全" in config.HIGH_RISK_TAGS),
+            RuleCategory(name="合规", keywords=list(config.KEYWORDS_COMPLIANCE), high_risk="合规" in config.HIGH_RISK_TAGS),
+            RuleCategory(name="宏观", keywords=list(config.KEYWORDS_MACRO), high_risk="宏观" in config.HIGH_RISK_TAGS),
+        ],
+        ignore_words=list(config.IGNORE_WORDS),
+    )
+
+def parse_keywords(text: str) -> List[str]:
+    """解析表单中的关键词: 按换行/逗号/顿号分隔，去除空白与重复项 (保持顺序)"""
+    words = [word.strip() for word in re.split(r"[\n,，、]+", text or "")]
+    return list(dict.fromkeys(word for word in words if word))
+
+def _create_version(session: Session, rules: Rules, note: str) -> RuleSet:
+    """在当前事务中写入新版本并设为生效版本"""
+    latest = session.exec(select(func.max(RuleSet.version))).one() or 0
+    for active in session.exec(select(RuleSet).where(RuleSet.is_active == True)).all():
+        active.is_active = False
+        session.add(active)
+    now = datetime.datetime.now()
+    rule_set = RuleSet(
+        version=latest + 1,
+        rules_json=rules.model_dump_json(),
+        note=note,
+        is_active=True,
+        created_at=now,
+        activated_at=now,
+    )
+    session.add(rule_set)
+    return rule_set
+
+def _active_rule_set(session: Session) -> Optional[RuleSet]:
+    return session.exec(select(RuleSet).where(RuleSet.is_active == True).order_by(desc(RuleSet.version))).first()
+
+def load_active_rules() -> Tuple[int, Rules]:
+    """读取当前生效的规则集 (定期轮询，走只读连接)；数据库中还没有规则集时，以内置默认规则写入 v1"""
+    with Session(read_engine) as session:
+        rule_set = _active_rule_set(session)
+    if rule_set is None:
+        with Session(engine) as session:
+            # 写事务中再确认一次，避免多个进程同时写入 v1
+            rule_set = _active_rule_set(session)
+            if rule_set is None:
+                rule_set = _create_version(session, default_rules(), "内置默认规则")
+                session.commit()
+                session.refresh(rule_set)
+                logger.info(f"已写入内置默认规则集 v{rule_set.version}")
+    return rule_set.version, Rules.model_validate_json(rule_set.rules_json)
+
+def publish_rules(rules: Rules, note: str = "") -> RuleSet:
+    """发布新版本规则 (立即成为生效版本)"""
+    with Session(engine) as session:
+        rule_set = _create_version(session, rules, note)
+        session.commit()
+        session.refresh(rule_set)
+    logger.info(f"已发布规则集 v{rule_set.version} (关键词 {rules.keyword_count()} 个): {note}")
+    return rule_set
+
+def activate_rule_set(version: int) -> Optional[RuleSet]:
+    """将历史版本重新设为生效版本 (回滚)"""
+    with Session(engine) as session:
+        rule_set = session.exec(select(RuleSet).where(RuleSet.version == version)).first()
+        if rule_set is None:
+            return None
+        for active in session.exec(select(RuleSet).where(RuleSet.is_active == True)).all():
+            active.is_active = False
+            session.add(active)
+        rule_set.is_active = True
+        rule_set.activated_at = datetime.datetime.now()
+        session.add(rule_set)
+        session.commit()
+        session.refresh(rule_set)
+    logger.info(f"规则集已切换到 v{version}")
+    return rule_set
+
+def list_rule_sets(limit: int = 20) -> List[RuleSet]:
+    with Session(read_engine) as session:
+        return list(session.exec(select(RuleSet).order_by(desc(RuleSet.version)).limit(limit)).all())
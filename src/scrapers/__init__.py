@@ -0,0 +1,2 @@
+# 导入各爬虫模块以完成插件注册 (见 registry.register_scraper)
+from src.scrapers import aicoin, blockbeats  # noqa: F401
@@ -1,14 +1,52 @@
 import hashlib
 import datetime
-from typing import List, Any
-from playwright.async_api import async_playwright
-from src.config import SOURCE_URL, HEADLESS, AICOIN_URL_PREFIX
-from src.scrapers.base import BaseScraper, RawNews
+from typing import List, Any, Optional
+from src.config import SOURCE_URL, AICOIN_URL_PREFIX
+from src.scrapers.base import BaseScraper, FieldSpec, RawNews, find_feed_items, feed_field, parse_feed_time, strip_html
+from src.scrapers.registry import register_scraper
 from src.logger import setup_logger
 
 logger = setup_logger("AICoin")
 
+# 批量点击指定下标快讯卡片内可见的"展开"按钮，返回点击次数
+_EXPAND_JS = """
+(spec) => {
+    let clicked = 0;
+    const all = Array.from(document.querySelectorAll(spec.item));
+    const items = spec.indexes.map(i => all[i]).filter(Boolean);
+    for (const item of items) {
+        const card = item.querySelector('div.flash-card');
+        if (!card) continue;
+        for (const el of card.querySelectorAll('*')) {
+            if (el.childElementCount === 0 && el.textContent.trim() === '展开' && el.offsetParent !== null) {
+                el.click();
+                clicked++;
+                break;
+            }
+        }
+    }
+    return clicked;
+}
+"""
+
+@register_scraper
 class AICoinScraper(BaseScraper):
+    SOURCE = "aicoin"
+
+    # 声明式提取配置: 一次 page.evaluate 返回全部条目
+    ITEM_SELECTOR = "div.relative.flex.gap-4"
+    MAX_ITEMS = 20  # 限制只抓取前 20 条
+    FEED_URL_PATTERN = r"aicoin\.com/api/.*(flash|news)"
+    PAGE_FIELDS = {
+        "date": FieldSpec(selector="p.whitespace-nowrap.text-lg.font-medium.text-1"),
+    }
+    ITEM_FIELDS = {
+        "time": FieldSpec(selector="div.text-right"),
+        "title": FieldSpec(selector="div.flash-card a"),
+        "href": FieldSpec(selector="div.flash-card a", attr="href"),
+        "body": FieldSpec(selector="div.flash-card p[class*='text-2']"),
+    }
+
     def _generate_id(self, title: str, pub_time: datetime.datetime) -> str:
         """生成唯一指纹: MD5(title + pub_time)"""
         raw = f"{title}{pub_time.isoformat()}"
@@ -45,86 +83,124 @@ class AICoinScraper(BaseScraper):
         final_dt = datetime.datetime.combine(date_obj, t_obj)
         return final_dt
 
-    async def run(self) -> List[RawNews]:
+    def _parse_item(self, row: dict, date_text: str) -> Optional[RawNews]:
+        """将页面内提取到的单条 JSON 转换为 RawNews，缺少标题时返回 None"""
+        title_text = row["title"]
+        if not title_text:
+            return None
+
+        # 时间单元格可能包含多行，第一行为 HH:MM
+        time_text = row["time"].split('\n')[0].strip()
+        href = row["href"]
+
+        # 标准化处理
+        pub_time = self._parse_time(date_text, time_text)
+        full_url = AICOIN_URL_PREFIX + href if not href.startswith("http") else href
+
+        return RawNews(
+            source="aicoin",
+            source_id=self._generate_id(title_text, pub_time),
+            title=title_text,
+            content=row["body"],
+            url=full_url,
+            pub_time=pub_time
+        )
+
+    def parse_feed(self, payload: Any) -> List[RawNews]:
+        """网络拦截模式: 将快讯列表接口 JSON 转换为 RawNews"""
         results = []
+        for item in find_feed_items(payload)[:self.MAX_ITEMS]:
+            title_text = feed_field(item, "title")
+            pub_time = parse_feed_time(feed_field(item, "createtime", "create_time", "show_time", "time"))
+            if not title_text or not pub_time:
+                continue
+            href = feed_field(item, "url", "link") or ""
+            if not href and feed_field(item, "id"):
+                href = f"/news-flash/{item['id']}"
+            results.append(RawNews(
+                source="aicoin",
+                source_id=self._generate_id(title_text, pub_time),
+                title=title_text,
+                content=strip_html(feed_field(item, "content", "body") or ""),
+                url=AICOIN_URL_PREFIX + href if not href.startswith("http") else href,
+                pub_time=pub_time
+            ))
+        return results
+
+    async def _scrape_dom(self, page) -> Optional[List[RawNews]]:
+        """DOM 模式: 等待页面渲染后提取快讯条目"""
+        results = []
+        await page.goto(SOURCE_URL, timeout=60000, wait_until="domcontentloaded")
+        if not await self.wait_for_items(page):
+            logger.warning(f"[AICoin] 等待快讯条目渲染超时 ({self.RENDER_TIMEOUT_MS} ms)")
+            return None
+        
+        # 页面指纹与上一轮一致时直接结束
+        if await self.dom_unchanged(page):
+            return results
+
+        # 1. 单次往返提取日期 (Sticky Header) 与全部快讯条目 (正文此时可能处于折叠状态)
+        extracted = await self.extract(page)
+        if not extracted:
+            logger.warning("[AICoin] 未找到快讯列表")
+            return None
+
+        date_text = extracted["page"]["date"] or datetime.datetime.now().strftime("%Y-%m-%d")
+
+        parsed = {}  # source_id -> 条目下标
+        for index, row in enumerate(extracted["items"]):
+            try:
+                news_item = self._parse_item(row, date_text)
+                if news_item:
+                    if self.watermark and news_item.source_id == self.watermark.source_id:
+                        break  # 已到达高水位，后续均为旧快讯
+                    results.append(news_item)
+                    parsed.setdefault(news_item.source_id, index)
+            except Exception as e_item:
+                logger.error(f"[AICoin] 解析单条数据出错: {e_item}")
+                continue
+
+        # 2. 按高水位截断，只保留新快讯
+        results = self.apply_watermark(results)
+        if not results:
+            return results
+
+        # 3. 仅对新快讯一次性点开"展开"按钮，再提取一次拿到完整正文
+        indexes = [parsed[item.source_id] for item in results]
+        try:
+            expanded = await page.evaluate(_EXPAND_JS, {"item": self.ITEM_SELECTOR, "indexes": indexes})
+            if expanded:
+                await page.wait_for_timeout(300)
+                rows = (await self.extract(page) or {}).get("items", [])
+                for index, news_item in zip(indexes, results):
+                    if index < len(rows) and rows[index]["body"]:
+                        news_item.content = rows[index]["body"]
+        except Exception as e:
+            logger.warning(f"[AICoin] 展开正文时出错: {e}")
+        return results
+
+    async def run(self) -> Optional[List[RawNews]]:
+        results: Optional[List[RawNews]] = None
         logger.info(f"[AICoin] 开始抓取: {SOURCE_URL}")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=HEADLESS)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            page = await context.new_page()
-            
+        async with self.lease_page() as page:
             try:
-                await page.goto(SOURCE_URL, timeout=60000, wait_until="domcontentloaded")
-                await page.wait_for_timeout(5000)
-                
-                # 1. 获取当前显示的日期 (Sticky Header)
-                date_el = await page.query_selector("p.whitespace-nowrap.text-lg.font-medium.text-1")
-                date_text = await date_el.inner_text() if date_el else datetime.datetime.now().strftime("%Y-%m-%d")
-                
-                # 2. 获取快讯条目
-                items = await page.query_selector_all("div.relative.flex.gap-4")
-                
-                # 限制只抓取前 20 条
-                for item in items[:20]:
-                    try:
-                        # 时间
-                        time_el = await item.query_selector("div.text-right")
-                        time_text = await time_el.inner_text() if time_el else ""
-                        time_text = time_text.split('\n')[0].strip()
-                        
-                        content_card = await item.query_selector("div.flash-card")
-                        if not content_card:
-                            continue
-
-                        # 标题与链接
-                        title_el = await content_card.query_selector("a")
-                        title_text = await title_el.inner_text() if title_el else ""
-                        href = await title_el.get_attribute("href") if title_el else ""
-                        
-                        # 展开按钮处理
-                        try:
-                            expand_btn = await content_card.query_selector("text='展开'")
-                            if expand_btn and await expand_btn.is_visible():
-                                await expand_btn.click()
-                                await page.wait_for_timeout(300)
-                        except Exception:
-                            pass
-
-                        # 正文
-                        body_el = await content_card.query_selector("p[class*='text-2']")
-                        body_text = await body_el.inner_text() if body_el else ""
-                        
-                        if title_text:
-                            # 标准化处理
-                            pub_time = self._parse_time(date_text, time_text)
-                            full_url = AICOIN_URL_PREFIX + href if not href.startswith("http") else href
-                            
-                            news_item = RawNews(
-                                source="aicoin",
-                                source_id=self._generate_id(title_text, pub_time),
-                                title=title_text,
-                                content=body_text,
-                                url=full_url,
-                                pub_time=pub_time
-                            )
-                            logger.info(f"[AICoin] 抓取到新闻: {title_text} ({pub_time})")
-                            results.append(news_item)
-                            
-                    except Exception as e_item:
-                        logger.error(f"[AICoin] 解析单条数据出错: {e_item}")
-                        continue
-            
+                # 优先使用网络拦截模式 (如已启用)，失败时回退到 DOM 解析
+                results = await self.try_feed(page, SOURCE_URL)
+                if results is None:
+                    results = await self._scrape_dom(page)
+                else:
+                    results = self.apply_watermark(results)
             except Exception as e:
+                results = None
                 logger.error(f"[AICoin] 抓取过程发生全局错误: {e}")
-            finally:
-                if 'context' in locals():
-                    await context.close()
-                if 'browser' in locals():
-                    await browser.close()
-                
+
+        if results is None:
+            # 本轮失败，不保存指纹，避免下一轮被误判为"未变化"
+            self.fingerprint = None
+            return None
+
+        for news_item in results:
+            logger.info(f"[AICoin] 抓取到新闻: {news_item.title} ({news_item.pub_time})")
         logger.info(f"[AICoin] 抓取结束，共获取 {len(results)} 条数据。")
         return results
-
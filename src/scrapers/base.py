@@ -1,7 +1,29 @@
+import re
+import json
+import asyncio
+import hashlib
 from abc import ABC, abstractmethod
-from typing import List
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel
+import httpx
+from playwright.async_api import Page, Route, TimeoutError as PlaywrightTimeoutError
+
+from src.scrapers.browser_pool import BrowserPool
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.scrapers.base")
+
+# 网络拦截模式下直接丢弃的资源类型与统计/广告域名
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+BLOCKED_URL_KEYWORDS = (
+    "google-analytics", "googletagmanager", "doubleclick", "hm.baidu.com",
+    "cnzz.com", "umeng.com", "sentry", "hotjar", "clarity.ms",
+)
+
+# 接口 JSON 中常见的列表字段名 (按优先级)
+_FEED_LIST_KEYS = ("list", "data", "items", "rows", "records", "result")
 
 # RawNews 表示“原始新闻”对象，用于标准化爬虫抓取到的单条新闻快讯的结构
 class RawNews(BaseModel):
@@ -12,12 +34,323 @@ class RawNews(BaseModel):
     url: str
     pub_time: datetime
 
+class Watermark(BaseModel):
+    """
+    来源高水位: 上一轮已入库的最新快讯。
+    页面列表按时间倒序排列，遇到高水位对应的条目即可停止提取。
+    """
+    source_id: str
+    pub_time: datetime
+
+class FieldSpec(BaseModel):
+    """
+    声明式字段提取规则 (在页面内执行，见 _EXTRACT_JS)
+    - selector: 相对条目元素的 CSS 选择器，None 表示条目元素本身
+    - attr: 'text' (innerText) / 'text_node' (第一个非空文本节点) / 'exists' (元素是否存在) / 其他属性名 (如 'href')
+    - all: 为 True 时匹配全部元素，返回非空值列表
+    """
+    selector: Optional[str] = None
+    attr: str = "text"
+    all: bool = False
+
+# 单次往返批量提取: 按声明的选择器在页面内一次性提取全部条目，返回结构化 JSON
+_EXTRACT_JS = """
+(spec) => {
+    const read = (el, attr) => {
+        if (attr === 'text') return (el.innerText || '').trim();
+        if (attr === 'exists') return true;
+        if (attr === 'text_node') {
+            for (const node of el.childNodes) {
+                if (node.nodeType === Node.TEXT_NODE && node.textContent.trim()) {
+                    return node.textContent.trim();
+                }
+            }
+            return '';
+        }
+        return el.getAttribute(attr) || '';
+    };
+    const pick = (root, field) => {
+        if (field.all) {
+            const els = field.selector ? Array.from(root.querySelectorAll(field.selector)) : [root];
+            return els.map(el => read(el, field.attr)).filter(v => v);
+        }
+        const el = field.selector ? root.querySelector(field.selector) : root;
+        if (!el) return field.attr === 'exists' ? false : '';
+        return read(el, field.attr);
+    };
+    const pickAll = (root, fields) => {
+        const row = {};
+        for (const [name, field] of Object.entries(fields)) row[name] = pick(root, field);
+        return row;
+    };
+
+    const root = spec.root ? document.querySelector(spec.root) : document;
+    if (!root) return null;
+    let items = Array.from(root.querySelectorAll(spec.item));
+    if (spec.limit) items = items.slice(0, spec.limit);
+    return {
+        page: pickAll(document, spec.page_fields),
+        items: items.map(item => pickAll(item, spec.item_fields)),
+    };
+}
+"""
+
+# 页面指纹: 列表前 N 条的文本 (截断)，用于判断页面相对上一轮是否变化
+_FINGERPRINT_JS = """
+(spec) => {
+    const root = spec.root ? document.querySelector(spec.root) : document;
+    if (!root) return [];
+    return Array.from(root.querySelectorAll(spec.item))
+        .slice(0, spec.limit)
+        .map(el => (el.textContent || '').trim().slice(0, 200));
+}
+"""
+
 # ABC 代表 "Abstract Base Class"，即抽象基类，用于定义接口和强制派生类实现必须的方法
 class BaseScraper(ABC):
+    SOURCE: str = ""  # 来源标识，与 RawNews.source 一致
+
+    # 声明式提取配置，由子类覆盖
+    LIST_SELECTOR: Optional[str] = None  # 列表容器，None 表示整个文档
+    ITEM_SELECTOR: str = ""  # 条目选择器 (相对列表容器)
+    ITEM_FIELDS: Dict[str, FieldSpec] = {}  # 条目字段
+    PAGE_FIELDS: Dict[str, FieldSpec] = {}  # 页面级字段 (相对 document)
+    MAX_ITEMS: Optional[int] = None  # 最多提取条目数
+    RENDER_TIMEOUT_MS = 15000  # DOM 模式等待首个条目渲染的超时时间
+
+    # 网络拦截模式配置，由子类覆盖
+    FEED_URL_PATTERN: Optional[str] = None  # 列表接口 URL 正则，None 表示不支持拦截模式
+    FEED_TIMEOUT_MS = 15000  # 等待列表接口响应的超时时间
+
+    # 页面指纹: 取列表前 N 条计算，与上一轮一致时直接结束本轮
+    FINGERPRINT_SIZE = 10
+
+    # 历史回填: 按发布时间倒序的分页列表接口 ({page} 从 1 开始，{size} 为每页条数)
+    # None 表示该来源不支持回填；接口 JSON 由 parse_feed 解析
+    BACKFILL_URL: Optional[str] = None
+    BACKFILL_PAGE_SIZE = 50
+
+    def __init__(self, pool: Optional[BrowserPool] = None, intercept: bool = False, max_pages: int = 1) -> None:
+        # 由调度器注入的常驻浏览器池；未注入时 (如单独运行测试脚本) 每次 run 临时启动一个
+        self.pool = pool
+        # 该来源同时占用的页面数上限 (全局上限由浏览器池控制)
+        self._page_limit = asyncio.Semaphore(max_pages)
+        # 是否启用网络拦截模式 (opt-in)，失败时自动回退到 DOM 解析
+        self.intercept = intercept
+        # 由调度器在每轮抓取前注入的高水位，None 表示全量抓取
+        self.watermark: Optional[Watermark] = None
+        # 页面指纹: previous_fingerprint 由调度器注入，fingerprint 为本轮计算结果
+        self.previous_fingerprint: Optional[str] = None
+        self.fingerprint: Optional[str] = None
+        self.short_circuited = False
+
+    def unchanged(self, mode: str, keys: List[str]) -> bool:
+        """
+        计算本轮页面指纹并与上一轮比较。
+        mode 区分指纹来源 ('dom' / 'feed' / 'http')，切换抓取模式时不会误判为未变化。
+        """
+        digest = hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()
+        self.fingerprint = f"{mode}:{digest}"
+        self.short_circuited = self.fingerprint == self.previous_fingerprint
+        if self.short_circuited:
+            logger.info(f"[{type(self).__name__}] 页面指纹未变化，跳过本轮处理")
+        return self.short_circuited
+
+    def items_unchanged(self, mode: str, items: List[RawNews]) -> bool:
+        """
+        按解析后的条目 (source_id, 标题) 计算指纹，而不是原始响应体:
+        响应中的服务器时间戳、请求 ID 等每次都会变化的字段不影响判断。
+        """
+        return self.unchanged(mode, sorted(f"{item.source_id}\t{item.title}" for item in items))
+
+    def apply_watermark(self, items: List[RawNews]) -> List[RawNews]:
+        """
+        按高水位截断列表: 遇到高水位条目即停止，早于高水位的条目跳过
+        (不因单条旧时间直接停止，避免置顶快讯导致整页被截断)
+        """
+        if self.watermark is None:
+            return items
+        new_items = []
+        for item in items:
+            if item.source_id == self.watermark.source_id:
+                break
+            if item.pub_time < self.watermark.pub_time:
+                continue
+            new_items.append(item)
+        return new_items
+
+    @asynccontextmanager
+    async def lease_page(self) -> AsyncIterator[Page]:
+        """从浏览器池租用一个页面 (受来源并发上限约束)"""
+        async with self._page_limit:
+            if self.pool is not None:
+                async with self.pool.page() as page:
+                    yield page
+                return
+
+            pool = BrowserPool()
+            try:
+                async with pool.page() as page:
+                    yield page
+            finally:
+                await pool.close()
+
+    async def wait_for_items(self, page: Page) -> bool:
+        """DOM 模式: 等待列表中首个条目渲染 (条目出现即返回，最多等待 RENDER_TIMEOUT_MS)，超时返回 False"""
+        selector = f"{self.LIST_SELECTOR} {self.ITEM_SELECTOR}" if self.LIST_SELECTOR else self.ITEM_SELECTOR
+        try:
+            await page.wait_for_selector(selector, state="attached", timeout=self.RENDER_TIMEOUT_MS)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def dom_unchanged(self, page: Page) -> bool:
+        """取列表前 FINGERPRINT_SIZE 条的文本计算指纹 (一次 page.evaluate)，判断页面是否变化"""
+        keys = await page.evaluate(_FINGERPRINT_JS, {
+            "root": self.LIST_SELECTOR,
+            "item": self.ITEM_SELECTOR,
+            "limit": self.FINGERPRINT_SIZE,
+        })
+        # 未找到列表时不做判断，交由完整提取流程处理
+        if not keys:
+            return False
+        return self.unchanged("dom", keys)
+
+    async def extract(self, page: Page) -> Optional[Dict[str, Any]]:
+        """
+        一次 page.evaluate 提取全部条目
+
+        Returns:
+            {'page': {...}, 'items': [{...}, ...]}；未找到列表容器时返回 None
+        """
+        spec = {
+            "root": self.LIST_SELECTOR,
+            "item": self.ITEM_SELECTOR,
+            "limit": self.MAX_ITEMS,
+            "item_fields": {name: f.model_dump() for name, f in self.ITEM_FIELDS.items()},
+            "page_fields": {name: f.model_dump() for name, f in self.PAGE_FIELDS.items()},
+        }
+        return await page.evaluate(_EXTRACT_JS, spec)
+
+    async def _block_heavy_requests(self, route: Route) -> None:
+        """拦截模式下丢弃图片/字体/CSS/统计脚本，只放行文档、脚本和接口请求"""
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or any(k in request.url for k in BLOCKED_URL_KEYWORDS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def capture_feed(self, page: Page, url: str) -> bytes:
+        """
+        打开页面并等待首个匹配 FEED_URL_PATTERN 的接口响应，返回响应体。
+        接口响应到达即返回，不等待页面渲染。
+        """
+        pattern = re.compile(self.FEED_URL_PATTERN)
+        await page.route("**/*", self._block_heavy_requests)
+        try:
+            async with page.expect_response(
+                lambda r: r.ok
+                and r.request.resource_type in ("xhr", "fetch")
+                and pattern.search(r.url) is not None,
+                timeout=self.FEED_TIMEOUT_MS,
+            ) as response_info:
+                await page.goto(url, timeout=60000, wait_until="commit")
+            response = await response_info.value
+            return await response.body()
+        finally:
+            await page.unroute("**/*", self._block_heavy_requests)
+
+    def parse_feed(self, payload: Any) -> List[RawNews]:
+        """将列表接口 JSON 转换为 RawNews，支持拦截模式的子类需覆盖"""
+        raise NotImplementedError
+
+    async def fetch_page(self, client: httpx.AsyncClient, page_no: int) -> Optional[List[RawNews]]:
+        """
+        历史回填: 请求分页列表接口的第 page_no 页。
+        接口已无更多条目时返回 None；返回空列表表示该页条目均被 parse_feed 过滤。
+        """
+        if not self.BACKFILL_URL:
+            raise NotImplementedError(f"{type(self).__name__} 不支持历史回填")
+        response = await client.get(self.BACKFILL_URL.format(page=page_no, size=self.BACKFILL_PAGE_SIZE))
+        response.raise_for_status()
+        payload = response.json()
+        if not find_feed_items(payload):
+            return None
+        return self.parse_feed(payload)
+
+    async def try_feed(self, page: Page, url: str) -> Optional[List[RawNews]]:
+        """
+        尝试以网络拦截模式抓取。
+        未启用、不支持或失败时返回 None，由调用方回退到 DOM 解析。
+        """
+        if not self.intercept or not self.FEED_URL_PATTERN:
+            return None
+        try:
+            body = await self.capture_feed(page, url)
+            results = self.parse_feed(json.loads(body))
+        except Exception as e:
+            logger.warning(f"[{type(self).__name__}] 网络拦截模式失败，回退到 DOM 解析: {e}")
+            return None
+        if not results:
+            logger.warning(f"[{type(self).__name__}] 列表接口未返回有效条目，回退到 DOM 解析")
+            return None
+        # 接口条目与上一轮一致时直接结束本轮
+        if self.items_unchanged("feed", results):
+            return []
+        return results
+
     @abstractmethod
-    async def run(self) -> List[RawNews]:
+    async def run(self) -> Optional[List[RawNews]]:
         """
-        运行抓取逻辑，返回标准化的原始新闻列表
+        运行抓取逻辑，返回标准化的原始新闻列表。
+        本轮失败 (页面异常、未找到列表等) 时返回 None，与"抓取成功但没有新条目"的空列表区分。
         """
         pass
 
+def find_feed_items(payload: Any) -> List[dict]:
+    """在接口 JSON 中查找条目列表: 优先按常见字段名逐层下钻，返回第一个由对象组成的列表"""
+    if isinstance(payload, list):
+        return [item for item in payload if isinstance(item, dict)]
+    if not isinstance(payload, dict):
+        return []
+    for key in _FEED_LIST_KEYS:
+        if key in payload:
+            items = find_feed_items(payload[key])
+            if items:
+                return items
+    return []
+
+def feed_field(item: dict, *keys: str) -> Any:
+    """按候选字段名依次取值，返回第一个非空值"""
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+def parse_feed_time(value: Any) -> Optional[datetime]:
+    """
+    解析接口中的时间字段 (Unix 秒/毫秒时间戳或 ISO 字符串)。
+    精度截断到分钟，与 DOM 模式 (只显示 HH:MM) 生成的 source_id 保持一致。
+    """
+    if value in (None, ""):
+        return None
+    try:
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value.strip())
+        if isinstance(value, (int, float)):
+            ts = value / 1000 if value > 1e12 else value
+            dt = datetime.fromtimestamp(ts)
+        else:
+            dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+            if dt.tzinfo is not None:
+                dt = dt.astimezone().replace(tzinfo=None)
+    except (ValueError, OverflowError, OSError):
+        return None
+    return dt.replace(second=0, microsecond=0)
+
+def strip_html(text: str) -> str:
+    """去除接口正文中的 HTML 标签"""
+    text = re.sub(r"<br\s*/?>|</p>", "\n", text or "")
+    text = re.sub(r"<[^>]+>", "", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
@@ -1,9 +1,9 @@
 import hashlib
 import datetime
-from typing import List
-from playwright.async_api import async_playwright
-from src.config import HEADLESS
-from src.scrapers.base import BaseScraper, RawNews
+from typing import Any, List, Optional
+from src.scrapers.base import BaseScraper, FieldSpec, RawNews, find_feed_items, feed_field, parse_feed_time, strip_html
+from src.scrapers.http_scraper import HttpScraper
+from src.scrapers.registry import register_scraper
 from src.logger import setup_logger
 
 logger = setup_logger("sentinel.scrapers.blockbeats")
@@ -11,8 +11,29 @@ logger = setup_logger("sentinel.scrapers.blockbeats")
 class BlockBeatsScraper(BaseScraper):
     """BlockBeats 快讯爬虫 - 只爬取重要快讯"""
     
+    SOURCE = "blockbeats"
     BLOCKBEATS_URL = "https://www.theblockbeats.info/newsflash"
     BLOCKBEATS_URL_PREFIX = "https://www.theblockbeats.info"
+
+    # 网络拦截模式: 快讯列表接口
+    FEED_URL_PATTERN = r"blockbeats\.\w+/.*(newsflash|flash)/(list|select)"
+
+    # 历史回填: 开放接口的重要快讯分页列表 (type=push 即"重要快讯")
+    BACKFILL_URL = "https://api.theblockbeats.news/v1/open-api/open-flash?page={page}&size={size}&type=push&lang=cn"
+
+    # 声明式提取配置: 一次 page.evaluate 返回全部条目
+    LIST_SELECTOR = "div.flash-list"
+    ITEM_SELECTOR = "div.news-flash-wrapper"
+    ITEM_FIELDS = {
+        "has_title_link": FieldSpec(selector="h2 a.news-flash-title", attr="exists"),
+        "time": FieldSpec(selector="h2 a.news-flash-title", attr="text_node"),
+        "title_link_text": FieldSpec(selector="h2 a.news-flash-title"),
+        "title_href": FieldSpec(selector="h2 a.news-flash-title", attr="href"),
+        "title": FieldSpec(selector="div.news-flash-title-text"),
+        "has_content": FieldSpec(selector="div.news-flash-item-content", attr="exists"),
+        "paragraphs": FieldSpec(selector="div.news-flash-item-content p", all=True),
+        "original_href": FieldSpec(selector='div.news-flash-item-content a[style*="color: #4065F6"]', attr="href"),
+    }
     
     def _generate_id(self, title: str, pub_time: datetime.datetime) -> str:
         """生成唯一指纹: MD5(title + pub_time)"""
@@ -37,156 +58,160 @@ class BlockBeatsScraper(BaseScraper):
             # 如果解析失败，使用当前时间
             return now
 
-    async def run(self) -> List[RawNews]:
+    def _absolute_url(self, href: str) -> str:
+        """处理相对路径和绝对路径"""
+        if not href:
+            return ""
+        if href.startswith('http'):
+            return href
+        return self.BLOCKBEATS_URL_PREFIX + href
+
+    def _parse_item(self, row: dict) -> Optional[RawNews]:
+        """将页面内提取到的单条 JSON 转换为 RawNews，关键字段缺失时返回 None"""
+        if not row["has_title_link"] or not row["has_content"]:
+            return None
+
+        # 时间优先取标题链接的第一个文本节点 (在 img 之前)，
+        # 取不到时从链接文本中提取，时间通常在开头，格式如 "10:46"
+        time_text = row["time"]
+        if not time_text:
+            time_text = row["title_link_text"].split('\n')[0].strip()
+        if not time_text:
+            return None
+
+        title_text = row["title"]
+        if not title_text:
+            return None
+
+        content_text = '\n\n'.join(p.strip() for p in row["paragraphs"] if p.strip())
+
+        # 原文链接，找不到时使用标题链接
+        url = self._absolute_url(row["original_href"]) or self._absolute_url(row["title_href"])
+
+        # 解析发布时间
+        pub_time = self._parse_time(time_text)
+
+        return RawNews(
+            source="blockbeats",
+            source_id=self._generate_id(title_text, pub_time),
+            title=title_text,
+            content=content_text,
+            url=url if url else None,
+            pub_time=pub_time
+        )
+
+    def parse_feed(self, payload: Any) -> List[RawNews]:
+        """网络拦截模式: 将快讯列表接口 JSON 转换为 RawNews (只保留重要快讯)"""
         results = []
+        for item in find_feed_items(payload):
+            # 接口若带有重要性标记，与 DOM 模式勾选"重要快讯"保持一致
+            important = feed_field(item, "is_important", "important", "is_top")
+            if important in (0, "0", False, "false"):
+                continue
+            title_text = feed_field(item, "title")
+            pub_time = parse_feed_time(feed_field(item, "add_time", "create_time", "published_at", "time"))
+            if not title_text or not pub_time:
+                continue
+            url = self._absolute_url(feed_field(item, "link", "url") or "")
+            if not url and feed_field(item, "id"):
+                url = f"{self.BLOCKBEATS_URL_PREFIX}/flash/{item['id']}"
+            results.append(RawNews(
+                source="blockbeats",
+                source_id=self._generate_id(title_text, pub_time),
+                title=title_text,
+                content=strip_html(feed_field(item, "content", "abstract") or ""),
+                url=url,
+                pub_time=pub_time
+            ))
+        return results
+
+    async def _scrape_dom(self, page) -> Optional[List[RawNews]]:
+        """DOM 模式: 等待页面渲染并勾选"重要快讯"后提取快讯条目"""
+        results = []
+        await page.goto(self.BLOCKBEATS_URL, timeout=60000, wait_until="domcontentloaded")
+        if not await self.wait_for_items(page):
+            logger.warning(f"[BlockBeats] 等待快讯条目渲染超时 ({self.RENDER_TIMEOUT_MS} ms)")
+            return None
+        
+        # 确保"重要快讯"复选框被选中
+        try:
+            # 先找到包含文本的 label
+            checkbox_label = await page.wait_for_selector('label.el-checkbox:has-text("重要快讯")', timeout=5000)
+            if checkbox_label:
+                # 获取实际的 input 元素来检查状态
+                input_el = await checkbox_label.query_selector('input.el-checkbox__original')
+                if input_el:
+                    is_checked = await input_el.is_checked()
+                    if not is_checked:
+                        # 点击可视化的 checkbox 元素 (span.el-checkbox__inner)
+                        # input 元素通常是隐藏的或覆盖的，不能直接点击
+                        visual_checkbox = await checkbox_label.query_selector('.el-checkbox__inner')
+                        if visual_checkbox:
+                            await visual_checkbox.click()
+                        else:
+                            # 如果找不到 visual element，尝试点击 label
+                            await checkbox_label.click()
+                        await page.wait_for_timeout(2000)  # 等待页面更新
+        except Exception as e:
+            logger.error(f"[BlockBeats] 设置重要快讯复选框时出错: {e}")
+        
+        # 页面指纹与上一轮一致时直接结束
+        if await self.dom_unchanged(page):
+            return results
+
+        # 单次往返提取全部快讯条目
+        extracted = await self.extract(page)
+        if not extracted:
+            logger.warning("[BlockBeats] 未找到快讯列表容器")
+            return None
+        
+        for row in extracted["items"]:
+            try:
+                news_item = self._parse_item(row)
+                if news_item:
+                    if self.watermark and news_item.source_id == self.watermark.source_id:
+                        break  # 已到达高水位，后续均为旧快讯
+                    results.append(news_item)
+            except Exception as e_item:
+                logger.error(f"[BlockBeats] 解析单条数据出错: {e_item}")
+                continue
+        return results
+
+    async def run(self) -> Optional[List[RawNews]]:
+        results: Optional[List[RawNews]] = None
         logger.info(f"[BlockBeats] 开始抓取: {self.BLOCKBEATS_URL}")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=HEADLESS)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            page = await context.new_page()
-            
+        async with self.lease_page() as page:
             try:
-                await page.goto(self.BLOCKBEATS_URL, timeout=60000, wait_until="domcontentloaded")
-                await page.wait_for_timeout(5000)
-                
-                # 确保"重要快讯"复选框被选中
-                try:
-                    # 先找到包含文本的 label
-                    checkbox_label = await page.wait_for_selector('label.el-checkbox:has-text("重要快讯")', timeout=5000)
-                    if checkbox_label:
-                        # 获取实际的 input 元素来检查状态
-                        input_el = await checkbox_label.query_selector('input.el-checkbox__original')
-                        if input_el:
-                            is_checked = await input_el.is_checked()
-                            if not is_checked:
-                                # 点击可视化的 checkbox 元素 (span.el-checkbox__inner)
-                                # input 元素通常是隐藏的或覆盖的，不能直接点击
-                                visual_checkbox = await checkbox_label.query_selector('.el-checkbox__inner')
-                                if visual_checkbox:
-                                    await visual_checkbox.click()
-                                else:
-                                    # 如果找不到 visual element，尝试点击 label
-                                    await checkbox_label.click()
-                                await page.wait_for_timeout(2000)  # 等待页面更新
-                except Exception as e:
-                    logger.error(f"[BlockBeats] 设置重要快讯复选框时出错: {e}")
-                
-                # 获取快讯列表容器
-                flash_list = await page.query_selector('div.flash-list')
-                if not flash_list:
-                    logger.warning("[BlockBeats] 未找到快讯列表容器")
-                    return results
-                
-                # 获取所有快讯条目
-                items = await flash_list.query_selector_all('div.news-flash-wrapper')
-                
-                for item in items:
-                    try:      
-                        # 获取时间（在 h2 > a 的第一个文本节点）
-                        title_link = await item.query_selector('h2 a.news-flash-title')
-                        if not title_link:
-                            continue
-                        
-                        # 获取时间文本（第一个文本节点，在 img 之前）
-                        time_text = ""
-                        try:
-                            # 使用 evaluate 获取第一个文本节点
-                            time_text = await title_link.evaluate("""
-                                (el) => {
-                                    for (let node of el.childNodes) {
-                                        if (node.nodeType === Node.TEXT_NODE && node.textContent.trim()) {
-                                            return node.textContent.trim();
-                                        }
-                                    }
-                                    return '';
-                                }
-                            """)
-                            # 如果上面没获取到，尝试从 inner_text 中提取
-                            if not time_text:
-                                link_text = await title_link.inner_text()
-                                # 时间通常在开头，格式如 "10:46"
-                                parts = link_text.split('\n')
-                                if parts:
-                                    time_text = parts[0].strip()
-                        except Exception as e:
-                            logger.warning(f"[BlockBeats] 提取时间时出错: {e}")
-                            pass
-                        
-                        if not time_text:
-                            continue
-                        
-                        # 获取标题
-                        title_el = await item.query_selector('div.news-flash-title-text')
-                        title_text = await title_el.inner_text() if title_el else ""
-                        if not title_text:
-                            continue
-                        
-                        # 获取内容
-                        content_el = await item.query_selector('div.news-flash-item-content')
-                        if not content_el:
-                            continue
-                        
-                        # 获取所有段落文本
-                        paragraphs = await content_el.query_selector_all('p')
-                        content_parts = []
-                        for p in paragraphs:
-                            p_text = await p.inner_text()
-                            if p_text.strip():
-                                content_parts.append(p_text.strip())
-                        
-                        # 移除原文链接文本（如果有）
-                        content_text = '\n\n'.join(content_parts)
-                        
-                        # 获取原文链接
-                        original_link = await content_el.query_selector('a[style*="color: #4065F6"]')
-                        url = ""
-                        if original_link:
-                            href = await original_link.get_attribute('href')
-                            if href:
-                                # 处理相对路径和绝对路径
-                                if href.startswith('http'):
-                                    url = href
-                                else:
-                                    url = self.BLOCKBEATS_URL_PREFIX + href
-                        
-                        # 如果没有找到原文链接，尝试从标题链接获取
-                        if not url:
-                            href = await title_link.get_attribute('href')
-                            if href:
-                                if href.startswith('http'):
-                                    url = href
-                                else:
-                                    url = self.BLOCKBEATS_URL_PREFIX + href
-                        
-                        # 解析发布时间
-                        pub_time = self._parse_time(time_text)
-                        
-                        news_item = RawNews(
-                            source="blockbeats",
-                            source_id=self._generate_id(title_text, pub_time),
-                            title=title_text,
-                            content=content_text,
-                            url=url if url else None,
-                            pub_time=pub_time
-                        )
-                        logger.info(f"[BlockBeats] 抓取到快讯: {title_text} ({pub_time})")
-                        results.append(news_item)
-                        
-                    except Exception as e_item:
-                        logger.error(f"[BlockBeats] 解析单条数据出错: {e_item}")
-                        continue
-            
+                # 优先使用网络拦截模式 (如已启用)，失败时回退到 DOM 解析
+                results = await self.try_feed(page, self.BLOCKBEATS_URL)
+                if results is None:
+                    results = await self._scrape_dom(page)
+                # 按高水位截断，只保留新快讯
+                if results is not None:
+                    results = self.apply_watermark(results)
             except Exception as e:
+                results = None
                 logger.error(f"[BlockBeats] 抓取过程发生全局错误: {e}")
-            finally:
-                if 'context' in locals():
-                    await context.close()
-                if 'browser' in locals():
-                    await browser.close()
-                
+
+        if results is None:
+            # 本轮失败，不保存指纹，避免下一轮被误判为"未变化"
+            self.fingerprint = None
+            return None
+
+        for news_item in results:
+            logger.info(f"[BlockBeats] 抓取到快讯: {news_item.title} ({news_item.pub_time})")
         logger.info(f"[BlockBeats] 抓取结束，共获取 {len(results)} 条重要快讯。")
         return results
 
+@register_scraper
+class BlockBeatsHttpScraper(HttpScraper, BlockBeatsScraper):
+    """
+    BlockBeats 快讯 HTTP 快速路径: 直接请求重要快讯接口 (与历史回填同一接口的第一页)，无需启动浏览器。
+    接口解析、source_id 生成与回填配置继承自 BlockBeatsScraper；请求失败或校验未通过时回退到 Playwright 爬虫。
+    """
+
+    SOURCE_NAME = "BlockBeats"
+    URL = BlockBeatsScraper.BACKFILL_URL.format(page=1, size=BlockBeatsScraper.BACKFILL_PAGE_SIZE)
+    RESPONSE_TYPE = "json"
+    FALLBACK = BlockBeatsScraper
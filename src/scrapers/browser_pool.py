@@ -0,0 +1,175 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Set
+
+import psutil
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext, Page
+
+from src.config import HEADLESS, USER_AGENT, BROWSER_MAX_USES, BROWSER_MAX_MEMORY_MB, MAX_BROWSER_PAGES
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.scrapers.pool")
+
+class BrowserPool:
+    """
+    常驻 Chromium 浏览器池
+
+    由调度进程持有，整个生命周期内只启动一次浏览器，爬虫通过 page() 租用页面。
+    - 并发上限: 全局信号量限制同时打开的页面数 (max_pages)，超出时租用方排队等待
+    - 健康检查: 每次租用前确认浏览器连接正常，断开/崩溃时自动重启
+    - 回收策略: 累计租用次数达到 max_uses，或浏览器进程树内存超过 max_memory_mb 时，
+      在没有页面被占用的时刻重启浏览器
+    - 关闭: 由 FastAPI lifespan 在退出时调用 close()
+
+    注意: Playwright 对象绑定在创建它的事件循环上，池必须始终在同一个事件循环中使用。
+    """
+
+    def __init__(
+        self,
+        headless: bool = HEADLESS,
+        max_uses: int = BROWSER_MAX_USES,
+        max_memory_mb: int = BROWSER_MAX_MEMORY_MB,
+        user_agent: str = USER_AGENT,
+        max_pages: int = MAX_BROWSER_PAGES,
+    ) -> None:
+        self.headless = headless
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.user_agent = user_agent
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._lock = asyncio.Lock()
+        self._pages = asyncio.Semaphore(max_pages)
+        self._uses = 0          # 当前浏览器实例已租出的页面数
+        self._active = 0        # 正在使用中的页面数
+        self._launches = 0      # 浏览器累计启动次数
+        self._driver_pids: Set[int] = set()  # Playwright driver 进程 (Chromium 由 driver 启动，是它的子进程)
+
+    def is_healthy(self) -> bool:
+        """浏览器已启动且连接正常"""
+        return self._browser is not None and self._browser.is_connected() and self._context is not None
+
+    def memory_mb(self) -> float:
+        """
+        估算浏览器占用内存 (MB): Playwright driver 及其全部子进程 (Chromium) 的 RSS 之和。
+        只统计本池启动的进程树，不含同一进程下的批量过滤进程池等其他子进程。
+        """
+        total = 0
+        for pid in self._driver_pids:
+            try:
+                driver = psutil.Process(pid)
+                processes = [driver] + driver.children(recursive=True)
+            except psutil.Error:
+                continue
+            for process in processes:
+                try:
+                    total += process.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        return total / (1024 * 1024)
+
+    @staticmethod
+    def _child_pids() -> Set[int]:
+        try:
+            return {child.pid for child in psutil.Process().children()}
+        except psutil.Error:
+            return set()
+
+    def stats(self) -> dict:
+        return {
+            "healthy": self.is_healthy(),
+            "uses": self._uses,
+            "active": self._active,
+            "launches": self._launches,
+            "memory_mb": round(self.memory_mb(), 1),
+        }
+
+    async def _close_browser(self) -> None:
+        if self._context is not None:
+            try:
+                await self._context.close()
+            except Exception as e:
+                logger.warning(f"[BrowserPool] 关闭 context 失败: {e}")
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.warning(f"[BrowserPool] 关闭浏览器失败: {e}")
+        self._context = None
+        self._browser = None
+
+    async def _launch(self, reason: str) -> None:
+        await self._close_browser()
+        if self._playwright is None:
+            # 启动前后的直接子进程之差即为 driver 进程
+            before = self._child_pids()
+            self._playwright = await async_playwright().start()
+            self._driver_pids = self._child_pids() - before
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._context = await self._browser.new_context(user_agent=self.user_agent)
+        self._uses = 0
+        self._launches += 1
+        logger.info(f"[BrowserPool] 浏览器已启动 (第 {self._launches} 次, 原因: {reason})")
+
+    async def _ensure_browser(self) -> None:
+        """健康检查 + 回收，需在 self._lock 内调用"""
+        if not self.is_healthy():
+            reason = "首次启动" if self._launches == 0 else "健康检查失败"
+            await self._launch(reason)
+            return
+
+        # 仍有页面在使用时不回收，推迟到下一次租用再判断
+        if self._active > 0:
+            return
+
+        if self.max_uses and self._uses >= self.max_uses:
+            await self._launch(f"已使用 {self._uses} 次")
+            return
+
+        if self.max_memory_mb:
+            memory = self.memory_mb()
+            if memory > self.max_memory_mb:
+                await self._launch(f"内存 {memory:.0f}MB 超过上限 {self.max_memory_mb}MB")
+
+    async def warm_up(self) -> None:
+        """预先启动浏览器，使首次租用页面无需等待"""
+        async with self._lock:
+            await self._ensure_browser()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """租用一个页面，退出时自动关闭页面 (浏览器与 context 保留复用)"""
+        async with self._pages:
+            async with self._lock:
+                await self._ensure_browser()
+                context = self._context
+                self._uses += 1
+                self._active += 1
+
+            page = None
+            try:
+                page = await context.new_page()
+                yield page
+            finally:
+                self._active -= 1
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        # 浏览器已崩溃时关闭页面会失败，下一次租用时健康检查会重启浏览器
+                        pass
+
+    async def close(self) -> None:
+        """关闭浏览器与 Playwright driver"""
+        async with self._lock:
+            await self._close_browser()
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception as e:
+                    logger.warning(f"[BrowserPool] 停止 Playwright 失败: {e}")
+                self._playwright = None
+                self._driver_pids = set()
+        logger.info("[BrowserPool] 浏览器池已关闭")
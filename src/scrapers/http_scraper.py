@@ -0,0 +1,196 @@
+from typing import Any, Dict, List, Optional, Type
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+from src.config import USER_AGENT, HTTP_TIMEOUT_SECONDS, HTTP_MAX_CONNECTIONS
+from src.scrapers.base import BaseScraper, FieldSpec, RawNews
+from src.scrapers.browser_pool import BrowserPool
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.scrapers.http")
+
+# 进程内共享的 HTTP 客户端 (keep-alive 连接池 + HTTP/2)，需在常驻事件循环中使用
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """获取共享 HTTP 客户端，首次调用时创建"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=HTTP_TIMEOUT_SECONDS,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=120,
+            ),
+        )
+    return _client
+
+async def close_http_client() -> None:
+    """关闭共享 HTTP 客户端"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _read_node(node: LexborNode, attr: str) -> Any:
+    """与 _EXTRACT_JS 中 read() 语义一致的 selectolax 实现"""
+    if attr == "text":
+        return node.text(deep=True).strip()
+    if attr == "exists":
+        return True
+    if attr == "text_node":
+        for child in node.iter(include_text=True):
+            if child.tag == "-text" and (child.text_content or "").strip():
+                return child.text_content.strip()
+        return ""
+    return node.attributes.get(attr) or ""
+
+def _pick(root: LexborNode, field: FieldSpec) -> Any:
+    if field.all:
+        nodes = root.css(field.selector) if field.selector else [root]
+        return [v for v in (_read_node(n, field.attr) for n in nodes) if v]
+    node = root.css_first(field.selector) if field.selector else root
+    if node is None:
+        return False if field.attr == "exists" else ""
+    return _read_node(node, field.attr)
+
+def extract_html(
+    html: str,
+    item_selector: str,
+    item_fields: Dict[str, FieldSpec],
+    page_fields: Optional[Dict[str, FieldSpec]] = None,
+    list_selector: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    按 FieldSpec 声明从静态 HTML 中提取条目，返回结构与 BaseScraper.extract 相同:
+    {'page': {...}, 'items': [{...}, ...]}；未找到列表容器时返回 None
+    """
+    tree = LexborHTMLParser(html)
+    document = tree.root
+    if document is None:
+        return None
+    root = tree.css_first(list_selector) if list_selector else document
+    if root is None:
+        return None
+    items = root.css(item_selector)
+    if limit:
+        items = items[:limit]
+    return {
+        "page": {name: _pick(document, f) for name, f in (page_fields or {}).items()},
+        "items": [{name: _pick(item, f) for name, f in item_fields.items()} for item in items],
+    }
+
+class HttpScraper(BaseScraper):
+    """
+    轻量 HTTP 爬虫基类: 适用于无需 JavaScript 即可获得 HTML/JSON 的数据源
+
+    - 使用共享的 httpx 连接池 (keep-alive + HTTP/2) 获取页面，selectolax (lexbor) 解析 HTML
+    - HTML 源复用 BaseScraper 的声明式提取配置 (ITEM_SELECTOR/ITEM_FIELDS/...)，子类实现 parse_row
+    - JSON 源 (RESPONSE_TYPE = "json") 由子类实现 parse_feed
+    - 快速路径请求失败或 validate() 不通过时，自动回退到 FALLBACK 指定的 Playwright 爬虫；
+      回退爬虫随实例创建一次并跨周期复用，与快速路径共用来源级页面并发上限
+    """
+
+    SOURCE_NAME: str = ""  # 日志中显示的来源名称
+    URL: str = ""
+    RESPONSE_TYPE: str = "html"  # 'html' 或 'json'
+    MIN_ITEMS: int = 1  # 校验: 至少解析出的条目数
+    FALLBACK: Optional[Type[BaseScraper]] = None  # 回退使用的 Playwright 爬虫
+
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        intercept: bool = False,
+        max_pages: int = 1,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        super().__init__(pool=pool, intercept=intercept, max_pages=max_pages)
+        self.client = client
+        self.fallback: Optional[BaseScraper] = None
+        if self.FALLBACK is not None:
+            self.fallback = self.FALLBACK(pool=pool, intercept=intercept, max_pages=max_pages)
+            self.fallback._page_limit = self._page_limit
+
+    @property
+    def name(self) -> str:
+        return self.SOURCE_NAME or type(self).__name__
+
+    def parse_row(self, row: dict, page_data: dict) -> Optional[RawNews]:
+        """HTML 源: 将单条提取结果转换为 RawNews，缺少关键字段时返回 None (HTML 源的子类需覆盖)"""
+        raise NotImplementedError(f"{type(self).__name__} 未实现 parse_row")
+
+    def parse_html(self, html: str) -> List[RawNews]:
+        extracted = extract_html(
+            html,
+            self.ITEM_SELECTOR,
+            self.ITEM_FIELDS,
+            page_fields=self.PAGE_FIELDS,
+            list_selector=self.LIST_SELECTOR,
+            limit=self.MAX_ITEMS,
+        )
+        if not extracted:
+            return []
+        results = []
+        for row in extracted["items"]:
+            try:
+                news_item = self.parse_row(row, extracted["page"])
+                if news_item:
+                    results.append(news_item)
+            except Exception as e_item:
+                logger.error(f"[{self.name}] 解析单条数据出错: {e_item}")
+        return results
+
+    def validate(self, items: List[RawNews]) -> bool:
+        """快速路径结果校验: 条目数达到下限且标题非空 (页面改版/反爬页会在这里被拦下)"""
+        return len(items) >= self.MIN_ITEMS and all(item.title.strip() for item in items)
+
+    async def fetch(self) -> httpx.Response:
+        client = self.client or get_http_client()
+        response = await client.get(self.URL)
+        response.raise_for_status()
+        return response
+
+    async def run_fast(self) -> List[RawNews]:
+        """快速路径: HTTP 请求 + 解析"""
+        response = await self.fetch()
+        if self.RESPONSE_TYPE == "json":
+            return self.parse_feed(response.json())
+        return self.parse_html(response.text)
+
+    async def run(self) -> Optional[List[RawNews]]:
+        logger.info(f"[{self.name}] 开始抓取 (HTTP): {self.URL}")
+        try:
+            results = await self.run_fast()
+            if self.validate(results):
+                # 条目与上一轮一致时直接结束本轮 (校验未通过的结果不计算指纹，交由回退爬虫处理)
+                if self.items_unchanged("http", results):
+                    return []
+                # 先校验整页解析结果，再按高水位截断 (稳态下新条目为 0 属于正常情况)
+                results = self.apply_watermark(results)
+                logger.info(f"[{self.name}] 抓取结束，共获取 {len(results)} 条新数据。")
+                return results
+            logger.warning(f"[{self.name}] HTTP 快速路径校验未通过 (解析到 {len(results)} 条)")
+        except Exception as e:
+            logger.warning(f"[{self.name}] HTTP 快速路径失败: {e}")
+
+        fallback = self.fallback
+        if fallback is None:
+            self.fingerprint = None
+            return None
+        logger.info(f"[{self.name}] 回退到 Playwright 爬虫: {type(fallback).__name__}")
+        # 调度器注入的高水位与上一轮指纹同步给回退爬虫
+        fallback.watermark = self.watermark
+        fallback.previous_fingerprint = self.previous_fingerprint
+        fallback.fingerprint = None
+        fallback.short_circuited = False
+        results = await fallback.run()
+        # 以回退爬虫的指纹为准，避免快速路径的失败响应被当作"未变化"
+        self.fingerprint = fallback.fingerprint
+        self.short_circuited = fallback.short_circuited
+        return results
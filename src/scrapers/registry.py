@@ -0,0 +1,31 @@
+from typing import Dict, List, Type
+from pydantic import BaseModel
+
+from src.config import SCRAPER_SETTINGS, CRAWL_INTERVAL_MINUTES
+from src.scrapers.base import BaseScraper
+
+class ScraperSettings(BaseModel):
+    """单个数据源的调度配置 (来自 config.SCRAPER_SETTINGS，未配置项使用默认值)"""
+    enabled: bool = True
+    interval_minutes: float = CRAWL_INTERVAL_MINUTES  # 初始抓取间隔
+    min_interval_minutes: float = 1  # 自适应调度间隔下限
+    max_interval_minutes: float = 15  # 自适应调度间隔上限
+    timeout_seconds: float = 120  # 单轮抓取超时
+    max_pages: int = 1  # 该来源最多同时占用的浏览器页面数
+
+# 来源标识 -> 爬虫类
+SCRAPER_REGISTRY: Dict[str, Type[BaseScraper]] = {}
+
+def register_scraper(cls: Type[BaseScraper]) -> Type[BaseScraper]:
+    """类装饰器: 以 SOURCE 为键注册爬虫插件"""
+    if not cls.SOURCE:
+        raise ValueError(f"{cls.__name__} 未定义 SOURCE，无法注册")
+    SCRAPER_REGISTRY[cls.SOURCE] = cls
+    return cls
+
+def get_scraper_settings(source: str) -> ScraperSettings:
+    return ScraperSettings(**SCRAPER_SETTINGS.get(source, {}))
+
+def enabled_sources() -> List[str]:
+    """已注册且启用的来源"""
+    return [source for source in SCRAPER_REGISTRY if get_scraper_settings(source).enabled]
@@ -0,0 +1,122 @@
+import html
+import re
+from typing import Dict, List, Optional, Tuple
+from markupsafe import Markup
+from sqlalchemy import bindparam, column, func, literal_column, or_, table, text
+from sqlmodel import Session
+
+from src.models import NewsFlash
+
+# 快讯全文索引: FTS5 外部内容表 (不重复存储正文)，trigram 分词 (中文无需分词，任意 3 个字符以上的子串均可检索)
+FTS_TABLE = "newsflash_fts"
+# trigram 至少需要 3 个字符，更短的词 (如 "黑客") 走单字/双字索引
+MIN_FTS_TERM_LENGTH = 3
+# 短词索引: FTS5 无内容表 (只存倒排索引)，写入 newsflash_bigrams() 切出的单字与相邻双字
+BIGRAM_TABLE = "newsflash_bigram"
+# 由写连接注册的 SQL 函数名，供短词索引的触发器调用
+BIGRAM_FUNCTION = "newsflash_bigrams"
+
+# 字母/数字/汉字的连续段 (标点、空白与下划线作为分隔)
+_WORD_RUN = re.compile(r"[^\W_]+")
+
+# 高亮标记使用私用区字符，转义 HTML 后再替换为 <mark>
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+_fts = table(FTS_TABLE, column("rowid"))
+_fts_match = literal_column(FTS_TABLE).op("MATCH")
+_bm25 = literal_column(f"bm25({FTS_TABLE})")
+_bigram = table(BIGRAM_TABLE, column("rowid"))
+_bigram_match = literal_column(BIGRAM_TABLE).op("MATCH")
+_bigram_bm25 = literal_column(f"bm25({BIGRAM_TABLE})")
+
+def bigram_terms(text: Optional[str]) -> str:
+    """
+    短词索引的分词结果: 按字母/数字/汉字的连续段切分，输出每个字符与相邻两个字符，以空格分隔。
+    例如 "遭黑客攻击" -> "遭 黑 客 攻 击 遭黑 黑客 客攻 攻击"，1~2 个字符的词按整词命中。
+    """
+    tokens: List[str] = []
+    for run in _WORD_RUN.findall((text or "").lower()):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return " ".join(tokens)
+
+def split_terms(keyword: Optional[str]) -> List[str]:
+    """按空白拆分关键词 (多个词之间为 AND)，去重并保持顺序"""
+    return list(dict.fromkeys((keyword or "").split()))
+
+def fts_match_query(terms: List[str]) -> Optional[str]:
+    """长度足够的词拼成 FTS5 查询 (每个词作为短语，避免用户输入被解析为 FTS 语法)"""
+    phrases = ['"' + term.replace('"', '""') + '"' for term in terms if len(term) >= MIN_FTS_TERM_LENGTH]
+    return " AND ".join(phrases) or None
+
+def _is_bigram_term(term: str) -> bool:
+    return len(term) < MIN_FTS_TERM_LENGTH and _WORD_RUN.fullmatch(term.lower()) is not None
+
+def bigram_match_query(terms: List[str]) -> Optional[str]:
+    """1~2 个字符的词 (只含字母/数字/汉字) 拼成短词索引的 FTS5 查询"""
+    phrases = ['"' + term.lower() + '"' for term in terms if _is_bigram_term(term)]
+    return " AND ".join(phrases) or None
+
+def has_indexed_terms(terms: List[str]) -> bool:
+    """是否有走全文索引的词 (可按相关度排序)"""
+    return fts_match_query(terms) is not None or bigram_match_query(terms) is not None
+
+def apply_keyword_filter(query, keyword: Optional[str], rank: bool = False):
+    """
+    为快讯查询加上关键词条件 (标题或正文命中)。
+    3 个字符以上的词走 trigram 索引，1~2 个字符的词走短词索引；
+    rank=True 时按 BM25 相关度排序 (相关度相同再按发布时间倒序)。
+    """
+    terms = split_terms(keyword)
+    if not terms:
+        return query
+    match = fts_match_query(terms)
+    if match:
+        query = query.join(_fts, _fts.c.rowid == NewsFlash.id).where(_fts_match(bindparam("fts_match", match)))
+    short_match = bigram_match_query(terms)
+    if short_match:
+        query = query.join(_bigram, _bigram.c.rowid == NewsFlash.id).where(_bigram_match(bindparam("bigram_match", short_match)))
+    if rank and (match or short_match):
+        query = order_by_relevance(query, terms)
+    for term in terms:
+        # 含标点等字符的短词无法走索引，退化为 LIKE
+        if len(term) < MIN_FTS_TERM_LENGTH and not _is_bigram_term(term):
+            pattern = f"%{term.lower()}%"
+            query = query.where(or_(func.lower(NewsFlash.title).like(pattern), func.lower(NewsFlash.content).like(pattern)))
+    return query
+
+def order_by_relevance(query, terms: List[str]):
+    """
+    按 BM25 相关度排序 (相关度相同再按发布时间倒序)，查询需已经过 apply_keyword_filter 的全文索引条件。
+    有 3 个字符以上的词时按 trigram 索引计算相关度，否则按短词索引。
+    """
+    bm25 = _bm25 if fts_match_query(terms) else _bigram_bm25
+    return query.order_by(None).order_by(bm25, NewsFlash.pub_time.desc())
+
+def _to_markup(marked: str) -> Markup:
+    escaped = html.escape(marked, quote=False)
+    return Markup(escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>"))
+
+def highlights_statement(news_ids: List[int], keyword: Optional[str]):
+    """当前页快讯的高亮标题与正文摘要查询 (结果交给 to_highlights)；没有走 FTS 索引的词时返回 None"""
+    match = fts_match_query(split_terms(keyword))
+    if not match or not news_ids:
+        return None
+    return text(
+        f"SELECT rowid, highlight({FTS_TABLE}, 0, :start, :end), snippet({FTS_TABLE}, 1, :start, :end, '…', 32) "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match AND rowid IN :ids"
+    ).bindparams(
+        bindparam("ids", list(news_ids), expanding=True),
+        start=_MARK_START, end=_MARK_END, match=match,
+    )
+
+def to_highlights(rows) -> Dict[int, Tuple[Markup, Markup]]:
+    return {row[0]: (_to_markup(row[1]), _to_markup(row[2])) for row in rows}
+
+def get_highlights(session: Session, news_ids: List[int], keyword: Optional[str]) -> Dict[int, Tuple[Markup, Markup]]:
+    """为当前页的快讯生成高亮标题与正文摘要: {news_id: (标题, 摘要)}，只对走 FTS 索引的词生效"""
+    statement = highlights_statement(news_ids, keyword)
+    if statement is None:
+        return {}
+    return to_highlights(session.connection().execute(statement))
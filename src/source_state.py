@@ -0,0 +1,70 @@
+from typing import Dict, List
+from sqlmodel import Session, select
+
+from src.database import engine, read_engine
+from src.models import SourceState
+from src.scrapers.base import BaseScraper, RawNews, Watermark
+from src.logger import setup_logger
+
+logger = setup_logger("sentinel.source_state")
+
+def load_source_states(sources: List[str]) -> Dict[str, SourceState]:
+    """批量读取各来源的抓取状态，尚无记录的来源不在结果中 (只读连接)"""
+    with Session(read_engine) as session:
+        states = session.exec(select(SourceState).where(SourceState.source.in_(sources))).all()
+    return {state.source: state for state in states}
+
+def apply_source_states(scrapers: List[BaseScraper]) -> None:
+    """在每轮抓取前为爬虫注入高水位与上一轮页面指纹"""
+    states = load_source_states([scraper.SOURCE for scraper in scrapers])
+    for scraper in scrapers:
+        state = states.get(scraper.SOURCE)
+        scraper.watermark = None
+        scraper.previous_fingerprint = None
+        scraper.fingerprint = None
+        scraper.short_circuited = False
+        if state is None:
+            continue
+        if state.last_source_id and state.last_pub_time:
+            scraper.watermark = Watermark(source_id=state.last_source_id, pub_time=state.last_pub_time)
+        scraper.previous_fingerprint = state.fingerprint
+
+def get_or_create_state(session: Session, source: str) -> SourceState:
+    state = session.exec(select(SourceState).where(SourceState.source == source)).first()
+    if not state:
+        state = SourceState(source=source, run_count=0, short_circuit_count=0)
+        session.add(state)
+    return state
+
+def record_crawl_outcomes(scrapers: List[BaseScraper], raw_news_list: List[RawNews]) -> None:
+    """
+    记录本轮抓取结果 (需在本批数据入库提交后调用，保证下一轮不会漏掉未落库的数据):
+    - 将各来源的高水位推进到本次抓取中最新的一条 (同一分钟内以列表中靠前的为准)
+    - 保存页面指纹，累计抓取轮数与短路轮数
+    """
+    newest: Dict[str, RawNews] = {}
+    for item in raw_news_list:
+        current = newest.get(item.source)
+        if current is None or item.pub_time > current.pub_time:
+            newest[item.source] = item
+
+    short_circuited = 0
+    with Session(engine) as session:
+        for scraper in scrapers:
+            state = get_or_create_state(session, scraper.SOURCE)
+            state.run_count += 1
+            if scraper.short_circuited:
+                state.short_circuit_count += 1
+                short_circuited += 1
+            if scraper.fingerprint:
+                state.fingerprint = scraper.fingerprint
+
+            item = newest.get(scraper.SOURCE)
+            if item and (not state.last_pub_time or item.pub_time >= state.last_pub_time):
+                state.last_source_id = item.source_id
+                state.last_pub_time = item.pub_time
+            session.add(state)
+        session.commit()
+
+    if short_circuited:
+        logger.info(f"本轮 {short_circuited}/{len(scrapers)} 个来源页面未变化，已提前结束")
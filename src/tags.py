@@ -0,0 +1,31 @@
+import datetime
+from typing import Iterable, List, Optional
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+
+from src.models import NewsFlash, NewsTag
+
+# 快讯标签索引: NewsFlash.tags 是逗号拼接的展示字段，按标签筛选走 news_tag 关联表 (仪表盘的标签计数读统计汇总，见 rollup.py)。
+# 写入 NewsFlash 的地方 (入库、重新打标签) 同时写入 news_tag；删除快讯时由触发器清理 (见迁移 v5)。
+
+# 每批写入的行数
+TAG_INSERT_ROWS = 5000
+
+def split_tags(tags: Optional[str]) -> List[str]:
+    """解析逗号拼接的标签字段 (去空白、去重并保持顺序)"""
+    return list(dict.fromkeys(tag.strip() for tag in (tags or "").split(",") if tag.strip()))
+
+def tag_rows(news_id: int, tags: Iterable[str], pub_time: datetime.datetime) -> List[dict]:
+    return [{"news_id": news_id, "tag": tag, "pub_time": pub_time} for tag in tags]
+
+def insert_news_tags(connection: Connection, rows: List[dict]) -> None:
+    """批量写入标签行 (已存在的跳过，标签不区分大小写)"""
+    if not rows:
+        return
+    stmt = insert(NewsTag.__table__).on_conflict_do_nothing()
+    for start in range(0, len(rows), TAG_INSERT_ROWS):
+        connection.execute(stmt, rows[start:start + TAG_INSERT_ROWS])
+
+def apply_tag_filter(query, tag: str):
+    """只保留带有该标签的快讯 (精确匹配，不区分大小写)；排序和时间范围应使用 NewsTag.pub_time 以命中 (tag, pub_time) 索引"""
+    return query.join(NewsTag, NewsTag.news_id == NewsFlash.id).where(NewsTag.tag == tag)
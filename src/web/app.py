@@ -3,8 +3,10 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
-from src.database import init_db
+from src.database import init_db, async_read_engine
 from src.web.routes import router
+from src.web.blocking import shutdown_blocking
+from src.filter import shutdown_filter_pool
 from src.logger import setup_logger
 
 _WEB_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -19,6 +21,15 @@ async def lifespan(app: FastAPI):
 
     if not IS_VERCEL:
         from src.scheduler_service import init_scheduler
+        from src.crawl_service import crawl_service
+        from src.neardup import near_dup_index
+        from src.dedup import scan_cache
+        logger.info("Loading dedup cache...")
+        scan_cache.rebuild()
+        logger.info("Rebuilding near-duplicate index...")
+        near_dup_index.rebuild()
+        logger.info("Starting Crawl Service...")
+        crawl_service.start()
         logger.info("Starting Scheduler...")
         scheduler = init_scheduler()
         scheduler.start()
@@ -32,6 +43,18 @@ async def lifespan(app: FastAPI):
             app.state.scheduler.shutdown()
         except Exception as e:
             logger.warning(f"Scheduler shutdown skipped/failed: {e}")
+
+        from src.crawl_service import crawl_service
+        logger.info("Stopping Crawl Service...")
+        try:
+            crawl_service.stop()
+        except Exception as e:
+            logger.warning(f"Crawl service shutdown failed: {e}")
+
+    shutdown_blocking()
+    # 批量过滤进程池的 worker 进程 (热重载/退出时不回收会残留)
+    shutdown_filter_pool()
+    await async_read_engine.dispose()
     logger.info("Goodbye.")
 
 def create_app() -> FastAPI:
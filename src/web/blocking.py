@@ -0,0 +1,33 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.config import WEB_BLOCKING_WORKERS
+
+# Web 路由中只有同步实现的操作 (规则发布/切换走写引擎、日志文件读取等) 在有界线程池中执行:
+# 不阻塞事件循环，同时限制这类操作同时占用的线程数 (超出时排队)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WEB_BLOCKING_WORKERS, thread_name_prefix="sentinel-web")
+        return _executor
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """在线程池中执行同步函数并等待结果"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_blocking() -> None:
+    """关闭线程池 (应用退出时调用；之后再调用 run_blocking 会新建线程池)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
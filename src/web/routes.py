@@ -4,15 +4,26 @@ import asyncio
 from collections import deque
 from pathlib import Path
 from fastapi import APIRouter, Request, Depends, Query
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select, desc
-from sqlalchemy import func, or_
-from datetime import datetime
-
-from src.database import engine
-from src.models import NewsFlash, Report, DailyStats, ScanRecord
-from src.config import NOTIFICATION_MODE
+from sqlmodel import select, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func
+from datetime import datetime, timedelta
+from urllib.parse import quote, urlencode
+
+from src.database import async_read_engine
+from src.models import NewsFlash, NewsTag, Report, SourceState
+from src.scrapers.registry import enabled_sources, get_scraper_settings
+from src.config import NOTIFICATION_MODE, DASHBOARD_TREND_DAYS
+from src.rules import Rules, RuleCategory, parse_keywords, load_active_rules, publish_rules, activate_rule_set, list_rule_sets
+from src.filter import get_compiled, reload_rules
+from src.search import apply_keyword_filter, has_indexed_terms, highlights_statement, order_by_relevance, split_terms, to_highlights
+from src.tags import apply_tag_filter
+from src.counters import NEWSFLASH_COUNTER, SCAN_RECORD_COUNTER, counter_statement
+from src.rollup import daily_trend_statement, tag_counts_statement, to_totals, totals_statement
+from src.pagination import apply_cursor, count_statement, decode_cursor, encode_cursor, news_count_cache
+from src.web.blocking import run_blocking
 from src.logger import setup_logger
 
 logger = setup_logger("sentinel.web.routes")
@@ -26,8 +37,18 @@ _LOG_FILE = _PROJECT_ROOT / "logs" / "sentinel.log"
 _LEGACY_LOG_FILE = _PROJECT_ROOT / "logs" / "startup.log"
 _ERROR_LOG_PATTERN = re.compile(r"\[(ERROR|WARNING|CRITICAL)\]")
 
-def get_session():
-    with Session(engine) as session:
+# 快讯列表页只读取展示需要的列 (正文只取前 200 个字符，不加载全文)
+NEWS_LIST_COLUMNS = (
+    NewsFlash.id, NewsFlash.source, NewsFlash.title, NewsFlash.url, NewsFlash.pub_time, NewsFlash.tags,
+    NewsFlash.is_pushed, func.substr(NewsFlash.content, 1, 200).label("content"),
+)
+
+async def get_session():
+    """
+    页面查询使用异步只读连接池 (写操作通过 rules 等模块走写引擎)。
+    查询在 aiosqlite 的连接线程中执行，等待结果时事件循环继续处理其他请求与日志流。
+    """
+    async with AsyncSession(async_read_engine) as session:
         yield session
 
 def _resolve_log_file() -> Path | None:
@@ -48,60 +69,91 @@ def _to_sse(line: str) -> str:
     chunks = line.rstrip("\n").splitlines() or [""]
     return "".join(f"data: {chunk}\n" for chunk in chunks) + "\n"
 
+def recent_risks_statement(limit: int = 10):
+    """最新高危快讯 (按 ix_newsflash_duplicate_of_pub_time 倒序扫描，取满 limit 条即停止)"""
+    return (
+        select(NewsFlash)
+        .where(NewsFlash.tags != "", NewsFlash.duplicate_of == None)
+        .order_by(desc(NewsFlash.pub_time))
+        .limit(limit)
+    )
+
 @router.get("/")
-async def dashboard(request: Request, session: Session = Depends(get_session)):
+async def dashboard(request: Request, session: AsyncSession = Depends(get_session)):
     """
     仪表盘首页: 显示今日统计和最新快讯
     """
     now = datetime.now()
     today_start = datetime(now.year, now.month, now.day)
     
-    # 统计今日数据
-    # 1. 获取今日抓取总量 (Scanned Count) - 包含噪音
-    daily_stats = session.exec(
-        select(DailyStats).where(DailyStats.date == today_start.date())
-    ).first()
-    today_scanned_count = daily_stats.scanned_count if daily_stats else 0
-
-    # 2. 获取今日高危数量 (Risk Count) - 实际入库数量
-    # 既然现在 NewsFlash 里存的都是高危，直接 count 即可
-    # (为了兼容旧数据或防御性编程，依然保留 tags != "" 的条件)
-    today_risks_count = session.exec(
-        select(func.count(NewsFlash.id))
-        .where(NewsFlash.created_at >= today_start)
-        .where(NewsFlash.tags != "")
-    ).one()
-
-    # 3. 获取累计抓取与匹配 (系统启动至今)
-    total_scanned_count = session.exec(
-        select(func.count(ScanRecord.id))
-    ).one()
-    total_matched_count = session.exec(
-        select(func.count(NewsFlash.id))
-    ).one()
+    # 统计今日数据: 读取按小时的统计汇总 (今日最多 24 × 来源数 行)，不扫描历史表
+    # 抓取数含噪音；匹配数为今日入库的快讯数；推送数为今日入库且已推送的快讯数
+    today = to_totals((await session.exec(totals_statement(today_start))).one())
+
+    # 累计抓取与匹配 (系统启动至今) 读计数器 (scan_record 只保留近期记录)
+    total_scanned_count = (await session.exec(counter_statement(SCAN_RECORD_COUNTER))).first() or 0
+    total_matched_count = (await session.exec(counter_statement(NEWSFLASH_COUNTER))).first() or 0
     
+    # 今日各标签快讯数 (当前规则的标签)
+    # 规则自动机定期从数据库检查生效版本 (同步)，在线程池中获取
+    rule_tags = list((await run_blocking(get_compiled)).weights)
+    tag_counts = dict((await session.exec(tag_counts_statement(rule_tags, today_start))).all()) if rule_tags else {}
+    today_tags = [{"tag": tag, "count": tag_counts[tag]} for tag in rule_tags if tag_counts.get(tag)]
+
+    # 近 N 天趋势 (按天汇总，没有数据的日期补 0)
+    trend_start = today_start - timedelta(days=DASHBOARD_TREND_DAYS - 1)
+    by_day = {row[0]: row for row in (await session.exec(daily_trend_statement(trend_start))).all()}
+    trend = []
+    for offset in range(DASHBOARD_TREND_DAYS):
+        day = trend_start + timedelta(days=offset)
+        row = by_day.get(day.strftime("%Y-%m-%d"))
+        trend.append({
+            "date": day.strftime("%m-%d"),
+            "scanned": row[1] if row else 0,
+            "matched": row[2] if row else 0,
+            "pushed": row[3] if row else 0,
+        })
+
     # 获取最新 10 条高危快讯 (有标签的)
-    recent_risks = session.exec(
-        select(NewsFlash)
-        .where(NewsFlash.tags != "")
-        .order_by(desc(NewsFlash.pub_time))
-        .limit(10)
-    ).all()
+    recent_risks = (await session.exec(recent_risks_statement())).all()
     
     # 获取系统状态
     scheduler = getattr(request.app.state, "scheduler", None)
     # APScheduler running 属性
     system_status = scheduler.running if scheduler else False
+
+    # 数据源调度: 自适应调度当前选定的间隔、到达速率与下次抓取时间
+    sources = enabled_sources()
+    states = {
+        state.source: state
+        for state in (await session.exec(select(SourceState).where(SourceState.source.in_(sources)))).all()
+    }
+    source_schedules = []
+    for source in sources:
+        state = states.get(source)
+        job = scheduler.get_job(f"monitor_{source}") if scheduler else None
+        next_run = getattr(job, "next_run_time", None)
+        interval_seconds = state.interval_seconds if state and state.interval_seconds else None
+        source_schedules.append({
+            "source": source,
+            "interval_minutes": round(interval_seconds / 60, 1) if interval_seconds else get_scraper_settings(source).interval_minutes,
+            "arrival_rate": state.arrival_rate if state and state.arrival_rate is not None else None,
+            "next_run": next_run.strftime("%H:%M:%S") if next_run else "-",
+        })
     
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request,
-        "today_count": today_scanned_count,
-        "today_risks": today_risks_count,
+    return templates.TemplateResponse(request, "dashboard.html", {
+        "today_count": today.scanned_count,
+        "today_risks": today.matched_count,
+        "today_pushed": today.pushed_count,
+        "trend": trend,
+        "today_tags": today_tags,
+        "today_date": today_start.strftime("%Y-%m-%d"),
         "total_scanned": total_scanned_count,
         "total_matched": total_matched_count,
         "recent_risks": recent_risks,
         "last_update": now.strftime("%Y-%m-%d %H:%M:%S"),
-        "system_status": system_status
+        "system_status": system_status,
+        "source_schedules": source_schedules
     })
 
 @router.get("/news")
@@ -113,10 +165,15 @@ async def news_list(
     keyword: str = Query(None),
     start_date: str = Query(None),
     end_date: str = Query(None),
-    session: Session = Depends(get_session)
+    sort: str = Query(None),
+    after: str = Query(None),
+    before: str = Query(None),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     快讯列表页: 支持分页和筛选
+    关键词检索走 FTS5 全文索引，sort=relevance 时按相关度 (BM25) 排序
+    按时间排序时使用游标分页: after=下一页 (上一页最后一条之后)，before=上一页；page 只用于显示页码
     """
     PAGE_SIZE = 20
     offset = (page - 1) * PAGE_SIZE
@@ -146,31 +203,29 @@ async def news_list(
         except ValueError:
             return None
     
-    query = select(NewsFlash).order_by(desc(NewsFlash.pub_time))
+    # 列表只读取展示需要的列 (正文只取摘要)
+    query = select(*NEWS_LIST_COLUMNS)
+    # 按标签筛选时走 news_tag 的 (tag, pub_time) 索引: 排序、游标与时间范围都使用关联表上的 pub_time / news_id
+    pub_time, news_id = NewsFlash.pub_time, NewsFlash.id
+    tag_clean = tag.strip() if tag and tag.strip() else None
+    start_dt = end_dt = None
     
     if source:
         query = query.where(NewsFlash.source == source)
-    if tag and tag.strip():
-        # 使用 SQLAlchemy 的 like 函数确保在 SQLite 中正常工作（不区分大小写）
-        tag_clean = tag.strip()
-        query = query.where(func.lower(NewsFlash.tags).like(f"%{tag_clean.lower()}%"))
+    if tag_clean:
+        # 标签精确匹配（不区分大小写）
+        query = apply_tag_filter(query, tag_clean)
+        pub_time, news_id = NewsTag.pub_time, NewsTag.news_id
     if keyword and keyword.strip():
-        # 关键词：更符合直觉的行为是 “标题或正文” 命中即可
-        keyword_clean = keyword.strip()
-        kw = f"%{keyword_clean.lower()}%"
-        query = query.where(
-            or_(
-                func.lower(NewsFlash.title).like(kw),
-                func.lower(NewsFlash.content).like(kw),
-            )
-        )
+        # 关键词：更符合直觉的行为是 “标题或正文” 命中即可 (多个词以空格分隔，需同时命中)
+        query = apply_keyword_filter(query, keyword)
     
     if start_date:
         start_dt = _parse_date_like(start_date)
         if start_dt is None:
             logger.warning(f"Invalid start_date ignored: {start_date!r}, url={request.url}")
         else:
-            query = query.where(NewsFlash.pub_time >= start_dt)
+            query = query.where(pub_time >= start_dt)
 
     if end_date:
         end_dt = _parse_date_like(end_date)
@@ -180,31 +235,73 @@ async def news_list(
             # Set to end of day（如果只传了日期，兜底到当天结束）
             if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0 and end_dt.microsecond == 0:
                 end_dt = end_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
-            query = query.where(NewsFlash.pub_time <= end_dt)
+            query = query.where(pub_time <= end_dt)
 
     # 关键诊断日志：确认参数是否传到后端，以及 SQL 条件是否拼上
     try:
-        compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+        compiled = query.compile(dialect=async_read_engine.dialect, compile_kwargs={"literal_binds": True})
         sql_preview = str(compiled)
     except Exception:
         sql_preview = str(query)
     logger.info(
         "news_list filters: "
-        f"page={page}, source={source!r}, tag={tag!r}, keyword={keyword!r}, "
+        f"page={page}, source={source!r}, tag={tag!r}, keyword={keyword!r}, sort={sort!r}, after={after!r}, before={before!r}, "
         f"start_date={start_date!r}, end_date={end_date!r}, url={request.url}, sql={sql_preview}"
     )
-        
-    # 计算总数 (用于分页)
-    # 注意: SQLModel/SQLAlchemy 计算 count 比较繁琐，这里简化处理，或者暂不显示总页数
-    # 为了性能，生产环境应该单独 count，这里简单查所有可能比较慢
-    # total = len(session.exec(query).all()) 
-    
-    results = session.exec(query.offset(offset).limit(PAGE_SIZE)).all()
+
+    # 总数 (用于显示总条数与页数): 按筛选条件缓存，入库后失效
+    count_key = (source or None, tag_clean.lower() if tag_clean else None, tuple(term.lower() for term in split_terms(keyword)), start_dt, end_dt)
+    total = news_count_cache.get(count_key)
+    if total is None:
+        generation = news_count_cache.generation
+        total = (await session.exec(count_statement(query))).one()
+        news_count_cache.set(count_key, total, generation)
+    total_pages = max(1, -(-total // PAGE_SIZE))
+
+    # 分页: 按 (pub_time, id) 游标翻页；相关度排序没有稳定的游标键，仍按页码 OFFSET 分页
+    # 多取一条用于判断是否还有下一页 (向前翻页时为上一页)
+    after_key, before_key = decode_cursor(after), decode_cursor(before)
+    if sort == "relevance" and has_indexed_terms(split_terms(keyword)):
+        rows = (await session.exec(order_by_relevance(query, split_terms(keyword)).offset(offset).limit(PAGE_SIZE + 1))).all()
+        results, has_next, has_prev = rows[:PAGE_SIZE], len(rows) > PAGE_SIZE, page > 1
+        next_params, prev_params = {"page": page + 1}, {"page": page - 1}
+    else:
+        if before_key:
+            rows = (await session.exec(apply_cursor(query, pub_time, news_id, before=before_key).limit(PAGE_SIZE + 1))).all()
+            results, has_next, has_prev = rows[:PAGE_SIZE][::-1], True, len(rows) > PAGE_SIZE
+            if not has_prev:
+                page = 1
+        else:
+            paged = apply_cursor(query, pub_time, news_id, after=after_key)
+            if after_key is None and page > 1:
+                # 没有游标的旧链接 / 直接跳页
+                paged = paged.offset(offset)
+            rows = (await session.exec(paged.limit(PAGE_SIZE + 1))).all()
+            results, has_next, has_prev = rows[:PAGE_SIZE], len(rows) > PAGE_SIZE, page > 1
+        next_params = {"page": page + 1, "after": encode_cursor(results[-1].pub_time, results[-1].id)} if results else {}
+        # 返回第 1 页时不带游标
+        prev_params = {"page": page - 1, "before": encode_cursor(results[0].pub_time, results[0].id)} if results and page > 2 else {"page": 1}
+
+    filter_params = {
+        "source": source or "", "tag": tag or "", "keyword": keyword or "",
+        "start_date": start_date or "", "end_date": end_date or "", "sort": sort or "",
+    }
+    # 当前页的高亮标题与正文摘要
+    highlights = {}
+    statement = highlights_statement([news.id for news in results], keyword)
+    if statement is not None:
+        connection = await session.connection()
+        highlights = to_highlights(await connection.execute(statement))
     
-    return templates.TemplateResponse("news_list.html", {
-        "request": request,
+    return templates.TemplateResponse(request, "news_list.html", {
         "news_list": results,
+        "highlights": highlights,
         "page": page,
+        "total": total,
+        "total_pages": total_pages,
+        "next_url": f"/news?{urlencode({**filter_params, **next_params})}" if has_next else None,
+        "prev_url": f"/news?{urlencode({**filter_params, **prev_params})}" if has_prev else None,
+        "sort": sort,
         "source": source,
         "tag": tag,
         "keyword": keyword,
@@ -213,30 +310,28 @@ async def news_list(
     })
 
 @router.get("/news/{news_id}")
-async def news_detail(request: Request, news_id: int, session: Session = Depends(get_session)):
-    news = session.get(NewsFlash, news_id)
-    return templates.TemplateResponse("news_detail.html", {
-        "request": request,
+async def news_detail(request: Request, news_id: int, session: AsyncSession = Depends(get_session)):
+    news = await session.get(NewsFlash, news_id)
+    return templates.TemplateResponse(request, "news_detail.html", {
         "news": news
     })
 
 @router.get("/reports")
-async def report_list(request: Request, session: Session = Depends(get_session)):
+async def report_list(request: Request, session: AsyncSession = Depends(get_session)):
     """
     历史报表归档列表
     """
-    reports = session.exec(select(Report).order_by(desc(Report.created_at)).limit(50)).all()
-    return templates.TemplateResponse("report_list.html", {
-        "request": request,
+    reports = (await session.exec(select(Report).order_by(desc(Report.created_at)).limit(50))).all()
+    return templates.TemplateResponse(request, "report_list.html", {
         "reports": reports
     })
 
 @router.get("/reports/{report_id}")
-async def report_detail(report_id: int, session: Session = Depends(get_session)):
+async def report_detail(report_id: int, session: AsyncSession = Depends(get_session)):
     """
     渲染具体的报表 HTML
     """
-    report = session.get(Report, report_id)
+    report = await session.get(Report, report_id)
     if not report:
         return "Report not found"
     # 直接返回 HTML 内容
@@ -245,8 +340,7 @@ async def report_detail(report_id: int, session: Session = Depends(get_session))
 @router.get("/logs")
 async def logs_page(request: Request, tab: str = Query("all")):
     active_tab = "error" if tab == "error" else "all"
-    return templates.TemplateResponse("logs.html", {
-        "request": request,
+    return templates.TemplateResponse(request, "logs.html", {
         "tab": active_tab,
     })
 
@@ -273,7 +367,7 @@ async def logs_stream(
                 return
 
         emitted = 0
-        for line in _read_last_lines(current_log, lines):
+        for line in await run_blocking(_read_last_lines, current_log, lines):
             if active_tab == "error" and not _is_error_line(line):
                 continue
             yield _to_sse(line)
@@ -300,12 +394,14 @@ async def logs_stream(
                     last_position = log_fp.tell()
                     yield _to_sse(f"[system] 日志文件已切换: {current_log.name}")
 
-                line = log_fp.readline()
-                if line:
+                # 文件读取在线程池中进行，一次取出所有新增行
+                new_lines = await run_blocking(log_fp.readlines)
+                if new_lines:
                     last_position = log_fp.tell()
-                    if active_tab == "error" and not _is_error_line(line):
-                        continue
-                    yield _to_sse(line)
+                    for line in new_lines:
+                        if active_tab == "error" and not _is_error_line(line):
+                            continue
+                        yield _to_sse(line)
                     continue
 
                 try:
@@ -332,6 +428,74 @@ async def logs_stream(
         },
     )
 
+@router.get("/rules")
+async def rules_page(request: Request, published: int = Query(None), error: str = Query(None)):
+    """
+    关键词规则管理: 查看/编辑当前规则，发布新版本或切换到历史版本
+    """
+    active_version, rules = await run_blocking(load_active_rules)
+    rule_sets = await run_blocking(list_rule_sets)
+    history = [
+        {
+            "version": item.version,
+            "note": item.note,
+            "is_active": item.is_active,
+            "created_at": item.created_at,
+            "keyword_count": Rules.model_validate_json(item.rules_json).keyword_count(),
+        }
+        for item in rule_sets
+    ]
+    return templates.TemplateResponse(request, "rules.html", {
+        "active_version": active_version,
+        "rules": rules,
+        "history": history,
+        "published": published,
+        "error": error,
+    })
+
+@router.post("/rules")
+async def rules_publish(request: Request):
+    """
+    发布新版本规则: 写入数据库后立即切换过滤器使用的自动机
+    """
+    form = await request.form()
+    categories = []
+    for name, weight, high_risk, keywords in zip(
+        form.getlist("category_name"), form.getlist("category_weight"),
+        form.getlist("category_high_risk"), form.getlist("category_keywords"),
+    ):
+        name, words = name.strip(), parse_keywords(keywords)
+        if not name and not words:
+            continue
+        if not name:
+            return RedirectResponse(f"/rules?error={quote('类别名称不能为空')}", status_code=303)
+        if any(category.name == name for category in categories):
+            return RedirectResponse(f"/rules?error={quote(f'类别重复: {name}')}", status_code=303)
+        try:
+            weight_value = float(weight or 1.0)
+        except ValueError:
+            return RedirectResponse(f"/rules?error={quote(f'权重格式错误: {weight}')}", status_code=303)
+        categories.append(RuleCategory(name=name, keywords=words, weight=weight_value, high_risk=high_risk == "1"))
+
+    if not any(category.keywords for category in categories):
+        return RedirectResponse(f"/rules?error={quote('至少需要一个包含关键词的类别')}", status_code=303)
+
+    rules = Rules(categories=categories, ignore_words=parse_keywords(form.get("ignore_words", "")))
+    rule_set = await run_blocking(publish_rules, rules, note=form.get("note", "").strip())
+    await run_blocking(reload_rules)
+    return RedirectResponse(f"/rules?published={rule_set.version}", status_code=303)
+
+@router.post("/rules/{version}/activate")
+async def rules_activate(version: int):
+    """
+    切换到历史版本 (回滚)
+    """
+    rule_set = await run_blocking(activate_rule_set, version)
+    if not rule_set:
+        return RedirectResponse(f"/rules?error={quote(f'规则版本不存在: v{version}')}", status_code=303)
+    await run_blocking(reload_rules)
+    return RedirectResponse(f"/rules?published={version}", status_code=303)
+
 @router.get("/health/check")
 async def health_check():
     """
@@ -0,0 +1,91 @@
+"""
+关键词过滤基准测试: 对比逐词 in 扫描 (原实现)、单条 get_risk_tags 与批量 get_risk_tags_batch 的吞吐
+
+用法:
+    python tests/bench_filter.py                      # 默认 10 万条，当前配置的关键词
+    python tests/bench_filter.py --items 200000 --extra-keywords 3000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+from src import config
+import src.rules as rules
+from src.filter import get_risk_tags, get_risk_tags_batch, reload_rules, shutdown_filter_pool
+
+def naive_risk_tags(active: rules.Rules, title: str, content: str):
+    """原实现: 对每个关键词执行一次 in 扫描"""
+    full_text = f"{title} {content}".lower()
+    for word in active.ignore_words:
+        if word.lower() in full_text:
+            return []
+    tags = []
+    for category in active.categories:
+        for word in category.keywords:
+            if word.lower() in full_text:
+                tags.append(category.name)
+                break
+    return tags
+
+def make_corpus(count: int, seed: int = 42):
+    """生成与真实快讯长度相近的语料 (标题约 30 字，正文约 200 字)"""
+    rng = random.Random(seed)
+    filler = list("的了在是和有对将据称市场交易所代币项目用户资金链上数据显示今日美元比特币以太坊")
+    keywords = config.ALL_KEYWORDS + config.IGNORE_WORDS
+    def sentence(length: int) -> str:
+        chars = [rng.choice(filler) for _ in range(length)]
+        if rng.random() < 0.3:
+            chars.insert(rng.randrange(len(chars)), rng.choice(keywords))
+        return "".join(chars)
+    return [(sentence(30), sentence(200)) for _ in range(count)]
+
+def bench(name: str, count: int, func) -> list:
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed:8.2f}s  {count / elapsed:>10,.0f} 条/秒  {elapsed / count * 1e6:8.1f} µs/条")
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--extra-keywords", type=int, default=0, help="额外追加的随机关键词数 (模拟规模增长)")
+    args = parser.parse_args()
+
+    # 规则集使用内存数据库，不影响真实数据
+    rules.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(rules.engine)
+    rules.read_engine = rules.engine
+    _, active = rules.load_active_rules()
+    if args.extra_keywords:
+        rng = random.Random(0)
+        alphabet = "abcdefghijklmnopqrstuvwxyz"
+        active.categories[0].keywords.extend(
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(5, 10))) for _ in range(args.extra_keywords)
+        )
+        rules.publish_rules(active, note="benchmark")
+    reload_rules()
+
+    corpus = make_corpus(args.items)
+    keyword_count = active.keyword_count() + len(active.ignore_words)
+    print(f"条目数: {args.items:,}  关键词数: {keyword_count:,}  并行阈值: {config.FILTER_PARALLEL_THRESHOLD:,}")
+
+    expected = bench("逐词 in 扫描 (原实现)", args.items, lambda: [naive_risk_tags(active, t, c) for t, c in corpus])
+    single = bench("get_risk_tags (自动机)", args.items, lambda: [get_risk_tags(t, c) for t, c in corpus])
+    batch = bench("get_risk_tags_batch (进程池)", args.items, lambda: get_risk_tags_batch(corpus))
+    shutdown_filter_pool()
+
+    assert single == expected and batch == expected, "结果不一致"
+    print("✅ 三种实现结果一致")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+入库基准测试: 逐条 ORM 写入 (原实现) 与 bulk_ingest 多行 INSERT 的耗时对比
+
+每个批量大小使用一个全新的临时数据库文件 (与生产一致，含磁盘同步)。
+
+用法:
+    python tests/bench_ingest.py                         # 默认 20 / 1k / 100k
+    python tests/bench_ingest.py --sizes 20 1000 --no-legacy
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import src.dedup as dedup
+import src.ingest as ingest
+from src.models import DailyStats, NewsFlash, ScanRecord
+from src.scrapers.base import RawNews
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+def make_batch(count: int, seed: int = 42):
+    """生成 (条目, 标签)，约 30% 命中关键词"""
+    rng = random.Random(seed)
+    batch = []
+    for i in range(count):
+        item = RawNews(
+            source="bench",
+            source_id=f"bench-{seed}-{i}",
+            title=f"快讯 {i} {rng.getrandbits(48):x}",
+            content="".join(rng.choice("的了在是和有对将据称市场交易所代币项目用户资金链上数据") for _ in range(200)),
+            url=f"https://example.com/{i}",
+            pub_time=NOW - datetime.timedelta(seconds=i),
+        )
+        batch.append((item, ["安全"] if rng.random() < 0.3 else []))
+    return batch
+
+def legacy_ingest(engine, batch) -> None:
+    """原实现: 每条一次 SELECT 查重，逐个 add ORM 对象，每条都标记 DailyStats 为 dirty"""
+    with Session(engine) as session:
+        today = datetime.datetime.now().date()
+        daily_stats = session.exec(select(DailyStats).where(DailyStats.date == today)).first()
+        if not daily_stats:
+            daily_stats = DailyStats(date=today, scanned_count=0)
+            session.add(daily_stats)
+            session.commit()
+            session.refresh(daily_stats)
+        for item, tags in batch:
+            if session.exec(select(ScanRecord).where(ScanRecord.source_id == item.source_id)).first():
+                continue
+            session.add(ScanRecord(source_id=item.source_id))
+            daily_stats.scanned_count += 1
+            session.add(daily_stats)
+            if tags:
+                session.add(NewsFlash(
+                    source=item.source, source_id=item.source_id, title=item.title, content=item.content,
+                    url=item.url, pub_time=item.pub_time, tags=",".join(tags), is_pushed=True,
+                ))
+        session.commit()
+
+def bulk(engine, batch) -> None:
+    ingest.engine = engine
+    ingest.bulk_ingest(batch, rule_version=1, notify=False)
+
+def run(name: str, func, size: int) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        batch = make_batch(size)
+        start = time.perf_counter()
+        func(engine, batch)
+        elapsed = time.perf_counter() - start
+        with Session(engine) as session:
+            assert session.exec(select(DailyStats)).one().scanned_count == size
+        engine.dispose()
+    print(f"  {name:<22} {elapsed * 1000:10.1f} ms  {size / elapsed:>10,.0f} 条/秒")
+    return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 1_000, 100_000])
+    parser.add_argument("--no-legacy", action="store_true", help="不运行原实现 (大批量时较慢)")
+    args = parser.parse_args()
+
+    # 只测数据库写入: 关闭近似重复检测与去重缓存
+    ingest.NEAR_DUP_ENABLED = False
+    ingest.DEDUP_CACHE_ENABLED = False
+    ingest.scan_cache = dedup.ScanCache()
+
+    for size in args.sizes:
+        print(f"批量 {size:,} 条:")
+        bulk_elapsed = run("bulk_ingest", bulk, size)
+        if not args.no_legacy:
+            legacy_elapsed = run("逐条 ORM (原实现)", legacy_ingest, size)
+            print(f"  加速比 {legacy_elapsed / bulk_elapsed:.1f}x")
+
+if __name__ == "__main__":
+    main()
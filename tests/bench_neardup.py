@@ -0,0 +1,69 @@
+"""
+近似重复索引基准测试: 窗口内条目数增长时的单次查询耗时 (LSH 分段索引 vs 线性扫描)
+
+用法:
+    python tests/bench_neardup.py                          # 默认窗口 1k / 10k / 100k
+    python tests/bench_neardup.py --sizes 1000 200000 --queries 5000
+"""
+import argparse
+import datetime
+import random
+import sys
+import time
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src import config
+from src.neardup import NearDupIndex, hamming_distance
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+def flip_bits(rng: random.Random, value: int, count: int) -> int:
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+def bench(size: int, queries: int, rng: random.Random) -> None:
+    index = NearDupIndex(from_db=False)
+    fingerprints = [rng.getrandbits(64) for _ in range(size)]
+    for news_id, fingerprint in enumerate(fingerprints):
+        index.add(news_id, fingerprint, NOW)
+
+    # 一半查询是已有条目的近似重复，一半是全新指纹
+    probes = []
+    for i in range(queries):
+        if i % 2 == 0:
+            target = rng.randrange(size)
+            probes.append((flip_bits(rng, fingerprints[target], rng.randint(0, config.NEAR_DUP_MAX_DISTANCE)), target))
+        else:
+            probes.append((rng.getrandbits(64), None))
+
+    start = time.perf_counter()
+    found = [index.find(fingerprint, NOW) for fingerprint, _ in probes]
+    lsh_us = (time.perf_counter() - start) / queries * 1e6
+    assert found == [target for _, target in probes], "LSH 查询结果不正确"
+
+    linear_queries = probes[: max(1, min(queries, 200_000 // size))]
+    start = time.perf_counter()
+    for fingerprint, _ in linear_queries:
+        min(fingerprints, key=lambda other: hamming_distance(fingerprint, other))
+    linear_us = (time.perf_counter() - start) / len(linear_queries) * 1e6
+
+    print(f"窗口 {size:>9,} 条   LSH {lsh_us:8.1f} µs/次   线性扫描 {linear_us:10.1f} µs/次")
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"最大汉明距离: {config.NEAR_DUP_MAX_DISTANCE}  查询数: {args.queries:,}")
+    for size in args.sizes:
+        bench(size, args.queries, rng)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+快讯列表分页基准测试: OFFSET 分页 (原实现) 与 (pub_time, id) 游标分页在不同页深度的单页耗时对比
+
+用法:
+    python tests/bench_pagination.py                     # 默认 20 万条，第 1 / 100 / 1000 / 5000 页
+    python tests/bench_pagination.py --rows 1000000 --pages 1 10000 49000
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import func, insert
+from sqlmodel import Session, SQLModel, desc, select
+
+from src.database import create_write_engine
+from src.models import NewsFlash
+from src.pagination import apply_cursor
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+PAGE_SIZE = 20
+LIST_COLUMNS = (NewsFlash.id, NewsFlash.title, NewsFlash.pub_time, func.substr(NewsFlash.content, 1, 200).label("content"))
+
+def populate(engine, rows: int) -> None:
+    content = "正文" * 300
+    with engine.begin() as conn:
+        for start in range(0, rows, 5000):
+            conn.execute(insert(NewsFlash.__table__), [{
+                "source": "bench", "source_id": f"bench-{i}", "title": f"快讯 {i}", "content": content,
+                "pub_time": NOW - datetime.timedelta(seconds=i // 2), "created_at": NOW, "updated_at": NOW,
+                "tags": "安全", "is_pushed": True, "in_daily_report": False, "in_weekly_report": False,
+            } for i in range(start, min(rows, start + 5000))])
+
+def timed(session: Session, query, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = session.exec(query).all()
+    return (time.perf_counter() - start) / repeat * 1000, rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1_000, 5_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_write_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        populate(engine, args.rows)
+
+        with Session(engine) as session:
+            ordered = select(NewsFlash.pub_time, NewsFlash.id).order_by(desc(NewsFlash.pub_time), desc(NewsFlash.id))
+            for page in args.pages:
+                offset = (page - 1) * PAGE_SIZE
+                if offset >= args.rows:
+                    continue
+                # 游标 = 上一页最后一条
+                cursor = session.exec(ordered.offset(offset - 1).limit(1)).one() if page > 1 else None
+                offset_ms, offset_rows = timed(
+                    session, select(NewsFlash).order_by(desc(NewsFlash.pub_time)).offset(offset).limit(PAGE_SIZE), args.repeat
+                )
+                cursor_ms, cursor_rows = timed(
+                    session, apply_cursor(select(*LIST_COLUMNS), NewsFlash.pub_time, NewsFlash.id, after=tuple(cursor) if cursor else None).limit(PAGE_SIZE), args.repeat
+                )
+                assert [news.pub_time for news in offset_rows] == [news.pub_time for news in cursor_rows]
+                print(f"第 {page:>6,} 页:  OFFSET 全列 {offset_ms:8.2f} ms   游标 + 摘要列 {cursor_ms:6.2f} ms")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+关键词检索基准测试: LIKE '%词%' 全表扫描 (原实现) 与 FTS5 索引 (3 个字符以上走 trigram，更短的词走单字/双字索引) 的单次查询耗时对比
+
+使用临时数据库文件，按快讯列表页的查询方式 (按发布时间倒序取第一页 20 条)。
+
+用法:
+    python tests/bench_search.py                      # 默认 20 万条
+    python tests/bench_search.py --rows 1000000
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import func, insert, or_
+from sqlmodel import Session, SQLModel, desc, select
+
+from src.database import create_write_engine
+from src.migrations import run_migrations
+from src.models import NewsFlash
+from src.search import apply_keyword_filter, get_highlights
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+WORDS = "的了在是和有对将据称市场交易所代币项目用户资金链上数据美联储利率比特币以太坊监管"
+# (关键词, 说明): 常见词 / 罕见词 / 不存在的词 / 2 个字符的短词
+KEYWORDS = [("交易所", "常见"), ("黑客攻击", "罕见"), ("不存在的词", "无结果"), ("利率", "短词常见"), ("黑客", "短词罕见")]
+
+def populate(engine, rows: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            content = "".join(rng.choice(WORDS) for _ in range(120))
+            if i % 1000 == 0:
+                content += "，疑似遭黑客攻击"
+            batch.append({
+                "source": "bench", "source_id": f"bench-{i}", "title": f"快讯 {i}", "content": content,
+                "pub_time": NOW - datetime.timedelta(seconds=i), "created_at": NOW, "updated_at": NOW,
+                "tags": "", "is_pushed": True, "in_daily_report": False, "in_weekly_report": False,
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(NewsFlash.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(NewsFlash.__table__), batch)
+
+def like_query(keyword: str):
+    pattern = f"%{keyword.lower()}%"
+    return select(NewsFlash).where(
+        or_(func.lower(NewsFlash.title).like(pattern), func.lower(NewsFlash.content).like(pattern))
+    )
+
+def timed(session: Session, query, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        session.exec(query.order_by(desc(NewsFlash.pub_time)).limit(20)).all()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_write_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        run_migrations(engine)
+        start = time.perf_counter()
+        populate(engine, args.rows)
+        print(f"写入 {args.rows:,} 条 (含 FTS 触发器): {time.perf_counter() - start:.1f} 秒")
+
+        with Session(engine) as session:
+            for keyword, label in KEYWORDS:
+                like_ms = timed(session, like_query(keyword), args.repeat)
+                fts_ms = timed(session, apply_keyword_filter(select(NewsFlash), keyword), args.repeat)
+                start = time.perf_counter()
+                results = session.exec(
+                    apply_keyword_filter(select(NewsFlash), keyword, rank=True).limit(20)
+                ).all()
+                get_highlights(session, [news.id for news in results], keyword)
+                ranked_ms = (time.perf_counter() - start) * 1000
+                print(
+                    f"{keyword} ({label}):  LIKE {like_ms:9.1f} ms   FTS {fts_ms:8.1f} ms   "
+                    f"FTS+相关度+高亮 {ranked_ms:8.1f} ms"
+                )
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Web 并发基准测试: 多个客户端同时请求仪表盘 / 快讯列表，少数客户端反复执行短词检索 (LIKE 全表扫描的慢查询)，
+同时保持若干 SSE 日志流，统计各类请求的 p50 / p99 延迟与日志推送延迟。
+
+对比两种数据库访问方式:
+    sync   改造前的方式: 查询在事件循环线程中同步执行 (慢查询期间其他请求与日志流全部停顿)
+    async  aiosqlite 异步会话: 查询在连接线程中执行，事件循环继续处理其他请求
+
+服务以 uvicorn 在后台线程中运行 (临时数据库，不启动调度器)。
+
+用法:
+    python tests/bench_web.py                             # 默认 20 万条，8 + 2 个客户端，4 个日志流，每种方式 10 秒
+    python tests/bench_web.py --mode async --clients 32 --slow-clients 4 --think-ms 200 --duration 30
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+import uvicorn
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import src.web.routes as routes
+from src.database import create_async_read_engine, create_read_engine, create_write_engine
+from src.migrations import run_migrations
+from src.models import NewsFlash
+from src.pagination import news_count_cache
+from src.web.app import create_app
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+WORDS = "的了在是和有对将据称市场交易所代币项目用户资金链上数据美联储利率比特币以太坊监管"
+# (名称, 路径)
+REQUESTS = [("dashboard", "/"), ("news", "/news")]
+# 短词 "黑客" 不足 3 个字符，走 LIKE 全表扫描
+SLOW_REQUESTS = [("news?keyword=黑客", "/news?keyword=黑客")]
+
+def populate(engine, rows: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            content = "".join(rng.choice(WORDS) for _ in range(120))
+            if i % 20000 == 0:
+                content += "，疑似遭黑客攻击"
+            batch.append({
+                "source": "bench", "source_id": f"bench-{i}", "title": f"快讯 {i}", "content": content,
+                "pub_time": NOW - datetime.timedelta(seconds=i), "created_at": NOW, "updated_at": NOW,
+                "tags": "安全" if i % 10 == 0 else "", "is_pushed": True,
+                "in_daily_report": False, "in_weekly_report": False,
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(NewsFlash.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(NewsFlash.__table__), batch)
+
+class _BlockingConnection:
+    def __init__(self, connection) -> None:
+        self._connection = connection
+
+    async def execute(self, statement):
+        return self._connection.execute(statement)
+
+class BlockingSession:
+    """改造前的访问方式: 同步 Session 直接在事件循环线程中执行查询 (接口与 AsyncSession 一致)"""
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    async def exec(self, statement):
+        return self._session.exec(statement)
+
+    async def get(self, model, ident):
+        return self._session.get(model, ident)
+
+    async def connection(self):
+        return _BlockingConnection(self._session.connection())
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+async def client_loop(client: httpx.AsyncClient, requests, deadline: float, think: float, latencies, seed: int) -> None:
+    """每个客户端请求完成后随机等待 0 ~ 2 * think 秒再发下一个请求 (模拟用户浏览，避免压满服务)"""
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        name, path = rng.choice(requests)
+        start = time.perf_counter()
+        response = await client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+        latencies[name].append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(rng.uniform(0, 2 * think))
+
+async def sse_loop(client: httpx.AsyncClient, deadline: float, latencies) -> None:
+    """日志流: 记录每行日志从写入到客户端收到的延迟 (行内容为写入时间)"""
+    async with client.stream("GET", "/api/logs/stream", params={"lines": 20}) as response:
+        async for line in response.aiter_lines():
+            if time.perf_counter() >= deadline:
+                break
+            if line.startswith("data: bench "):
+                latencies["sse"].append((time.perf_counter() - float(line.split()[2])) * 1000)
+
+def log_writer(log_file: Path, stop: threading.Event) -> None:
+    with log_file.open("a", encoding="utf-8") as f:
+        while not stop.is_set():
+            f.write(f"bench {time.perf_counter()} [INFO] tick\n")
+            f.flush()
+            time.sleep(0.05)
+
+async def run_load(port: int, clients: int, slow_clients: int, streams: int, duration: float, think: float):
+    latencies = defaultdict(list)
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=clients + slow_clients + streams)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+        await asyncio.gather(
+            *(client_loop(client, REQUESTS, deadline, think, latencies, seed) for seed in range(clients)),
+            *(client_loop(client, SLOW_REQUESTS, deadline, think, latencies, seed) for seed in range(slow_clients)),
+            *(sse_loop(client, deadline, latencies) for _ in range(streams)),
+        )
+    return latencies
+
+def bench_mode(mode: str, db_url, log_file: Path, args) -> None:
+    news_count_cache.invalidate()
+    app = create_app()
+    if mode == "async":
+        engine = create_async_read_engine(db_url)
+
+        async def _session():
+            async with AsyncSession(engine) as session:
+                yield session
+    else:
+        engine = create_read_engine(db_url)
+
+        async def _session():
+            with Session(engine) as session:
+                yield BlockingSession(session)
+
+    app.dependency_overrides[routes.get_session] = _session
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    stop = threading.Event()
+    writer = threading.Thread(target=log_writer, args=(log_file, stop), daemon=True)
+    writer.start()
+    try:
+        latencies = asyncio.run(run_load(args.port, args.clients, args.slow_clients, args.sse, args.duration, args.think_ms / 1000))
+    finally:
+        stop.set()
+        writer.join()
+        server.should_exit = True
+        thread.join()
+        if mode == "async":
+            asyncio.run(engine.dispose())
+        else:
+            engine.dispose()
+
+    print(f"\n[{mode}] {args.clients} 个客户端 + {args.slow_clients} 个慢查询客户端 + {args.sse} 个日志流，{args.duration:.0f} 秒")
+    for name in [name for name, _ in REQUESTS + SLOW_REQUESTS] + ["sse"]:
+        values = latencies[name]
+        print(
+            f"  {name:<20} {len(values):>6} 次   p50 {statistics.median(values) if values else 0:8.1f} ms"
+            f"   p99 {percentile(values, 0.99):8.1f} ms"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--slow-clients", type=int, default=2)
+    parser.add_argument("--sse", type=int, default=4)
+    parser.add_argument("--think-ms", type=float, default=500, help="客户端两次请求之间的平均间隔")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    # 每次列表查询的诊断日志会淹没结果
+    routes.logger.setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_write_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        populate(engine, args.rows)
+        # 迁移建立全文索引并回填标签表
+        run_migrations(engine)
+
+        log_file = Path(directory) / "sentinel.log"
+        log_file.touch()
+        routes._LOG_FILE = log_file
+        for mode in (["sync", "async"] if args.mode == "both" else [args.mode]):
+            bench_mode(mode, engine.url, log_file, args)
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
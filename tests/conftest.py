@@ -0,0 +1,62 @@
+"""
+测试共用夹具。
+
+db: 每个测试一个临时目录中的全新数据库 (与线上相同的写引擎，读写共用)，
+并替换各模块引用的引擎、去重缓存、扫描记录分段、近似重复索引与规则快照。
+全部通过 monkeypatch 设置，测试结束后自动恢复，测试结果与执行顺序无关。
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlmodel import SQLModel
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.adaptive as adaptive
+import src.backfill as backfill
+import src.dedup as dedup
+import src.filter as filter_module
+import src.ingest as ingest
+import src.neardup as neardup
+import src.report as report
+import src.retag as retag
+import src.retention as retention
+import src.rules as rules
+import src.scheduler_service as scheduler_service
+import src.source_state as source_state
+from src import config
+from src.database import create_write_engine
+
+# 引用写引擎 / 只读引擎的模块
+ENGINE_MODULES = (adaptive, backfill, ingest, report, retag, retention, rules, scheduler_service, source_state)
+READ_ENGINE_MODULES = (dedup, neardup, report, retag, retention, rules, scheduler_service, source_state)
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    engine = create_write_engine(f"sqlite:///{tmp_path / 'sentinel.db'}")
+    SQLModel.metadata.create_all(engine)
+    for module in ENGINE_MODULES:
+        monkeypatch.setattr(module, "engine", engine)
+    for module in READ_ENGINE_MODULES:
+        monkeypatch.setattr(module, "read_engine", engine)
+
+    # 内存状态随数据库一起重建
+    scan_cache = dedup.ScanCache()
+    for module in (dedup, ingest, retention):
+        monkeypatch.setattr(module, "scan_cache", scan_cache)
+    monkeypatch.setattr(config, "SCAN_SEGMENT_DIR", str(tmp_path / "scan_segments"))
+    scan_segments = retention.ScanSegments()
+    for module in (ingest, retention):
+        monkeypatch.setattr(module, "scan_segments", scan_segments)
+    monkeypatch.setattr(ingest, "near_dup_index", neardup.NearDupIndex(from_db=False))
+    # 下次使用规则时从本测试的数据库加载 (首次加载写入内置默认规则 v1)
+    monkeypatch.setattr(filter_module, "_compiled", None)
+
+    # 不写归档、不发送通知 (需要时由测试自行替换)
+    monkeypatch.setattr(ingest, "ARCHIVE_ENABLED", False)
+    monkeypatch.setattr(ingest, "send_feishu_card", lambda *args: True)
+    yield engine
+    engine.dispose()
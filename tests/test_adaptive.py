@@ -0,0 +1,100 @@
+import asyncio
+import datetime
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.scheduler_service as scheduler_service
+from src import config
+from src.adaptive import AdaptiveScheduler, RateState, compute_interval
+from src.crawl_service import CrawlService
+from src.ingest import IngestResult
+from src.scrapers.base import BaseScraper, RawNews
+
+NOW = datetime.datetime(2026, 1, 1, 12, 0)
+
+def test_fast_source_tightens_to_floor():
+    state = RateState(interval_minutes=2, rate=10.0)
+    assert compute_interval(state, 1, 15, NOW) == 1
+
+def test_quiet_source_backs_off_gradually():
+    state = RateState(interval_minutes=2, rate=0.0)
+    # 每轮最多放大 ADAPTIVE_MAX_GROWTH 倍，最终不超过上限
+    intervals = []
+    for _ in range(10):
+        state.interval_minutes = compute_interval(state, 1, 15, NOW)
+        intervals.append(state.interval_minutes)
+    assert intervals[0] == 3
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == 15
+
+def test_burst_holds_minimum_interval():
+    state = RateState(interval_minutes=10, rate=0.0, burst_until=NOW + datetime.timedelta(minutes=5))
+    assert compute_interval(state, 1, 15, NOW) == 1
+    assert compute_interval(state, 1, 15, NOW + datetime.timedelta(minutes=10)) == 15
+
+class StubScraper(BaseScraper):
+    """按设定返回结果或挂起 (模拟超时) 的爬虫"""
+    SOURCE = "stub"
+    delay = 0.0
+    items: List[RawNews] = []
+
+    async def run(self) -> Optional[List[RawNews]]:
+        await asyncio.sleep(self.delay)
+        return list(self.items)
+
+def _item(source_id: str) -> RawNews:
+    return RawNews(source="stub", source_id=source_id, title="交易所遭黑客攻击", content="", url="", pub_time=NOW)
+
+def test_failed_crawl_keeps_interval(monkeypatch):
+    service = CrawlService(warm_up=False)
+    scraper = StubScraper()
+    service._scrapers["stub"] = scraper
+    adaptive = AdaptiveScheduler()
+    adaptive._persist = lambda *args: None
+    last_observed = datetime.datetime.now() - datetime.timedelta(minutes=5)
+    adaptive._states["stub"] = RateState(interval_minutes=5, rate=0.5, last_observed=last_observed)
+    recorded, ingested = [], []
+
+    def _ingest(items):
+        ingested.append(items)
+        # 3 条中 2 条已扫描过 (如高水位重置后重新抓到的旧条目)，只有 1 条新写入 ScanRecord
+        return IngestResult(scanned_count=1, skip_count=2)
+
+    monkeypatch.setitem(config.SCRAPER_SETTINGS, "stub", {"interval_minutes": 5, "min_interval_minutes": 1, "max_interval_minutes": 15, "timeout_seconds": 0.2})
+    monkeypatch.setattr(scheduler_service, "crawl_service", service)
+    monkeypatch.setattr(scheduler_service, "adaptive_scheduler", adaptive)
+    monkeypatch.setattr(scheduler_service, "apply_source_states", lambda scrapers: None)
+    monkeypatch.setattr(scheduler_service, "record_crawl_outcomes", lambda scrapers, items: recorded.append(items))
+    monkeypatch.setattr(scheduler_service, "ingest_news", _ingest)
+    try:
+        # 超时: 不记录本轮结果，速率与间隔保持不变
+        scraper.delay = 5
+        assert service.crawl("stub") is None
+        scheduler_service.run_sentinel("stub")
+        state = adaptive._states["stub"]
+        assert (state.interval_minutes, state.rate, state.last_observed) == (5, 0.5, last_observed)
+        assert recorded == [] and ingested == []
+
+        # 抓取成功但没有新条目: 计为零到达
+        scraper.delay = 0
+        scheduler_service.run_sentinel("stub")
+        assert recorded == [[]] and adaptive._states["stub"].rate < 0.5
+
+        # 按新写入的 ScanRecord 数计算速率，已扫描过的条目不计
+        scraper.items = [_item("a"), _item("b"), _item("c")]
+        observed = []
+        adaptive.observe = lambda source, count, high_risk=False: observed.append(count)
+        scheduler_service.run_sentinel("stub")
+        assert observed == [1] and len(recorded) == 2
+    finally:
+        service.stop()
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
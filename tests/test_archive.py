@@ -0,0 +1,109 @@
+import datetime
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.retag as retag
+from src.archive import archive_items, iter_archive
+from src.filter import reload_rules
+from src.models import NewsFlash
+from src.rules import RuleCategory, Rules, publish_rules
+from src.scrapers.base import RawNews
+
+DAY = datetime.datetime(2026, 10, 16)
+
+def _items():
+    """两天的快讯，每 6 小时一条；偶数条包含 "黑客"，第 6 条同时包含黑名单词"""
+    items = []
+    for i in range(8):
+        title = f"快讯 {i} 黑客事件" if i % 2 == 0 else f"快讯 {i} 市场动态"
+        if i == 6:
+            title += " 直播"
+        items.append(RawNews(
+            source="test",
+            source_id=f"archive-{i}",
+            title=title,
+            content="正文",
+            url=f"https://example.com/{i}",
+            pub_time=DAY + datetime.timedelta(hours=6 * i),
+        ))
+    return items
+
+def test_archive_range_query():
+    with tempfile.TemporaryDirectory() as directory:
+        items = _items()
+        # 分两次追加，同一天的分段中会有多个独立帧
+        archive_items(items[:3], directory)
+        archive_items(items[3:], directory)
+        assert sorted(Path(directory).glob("*.zst")) == [
+            Path(directory) / "2026-10-16.zst",
+            Path(directory) / "2026-10-17.zst",
+        ]
+
+        start = DAY + datetime.timedelta(hours=12)
+        end = DAY + datetime.timedelta(hours=36)
+        found = [item.source_id for item in iter_archive(start, end, directory)]
+        assert found == ["archive-2", "archive-3", "archive-4", "archive-5"]
+        assert len(list(iter_archive(DAY, DAY + datetime.timedelta(days=3), directory))) == len(items)
+
+def test_retag_inserts_new_matches_once(db, tmp_path, monkeypatch):
+    directory = str(tmp_path / "archive")
+    archive_items(_items(), directory)
+    start, end = DAY, DAY + datetime.timedelta(days=2)
+
+    # 默认规则: 命中 "黑客" 的 0/2/4 (6 命中黑名单)
+    result = retag.retag_archive(start, end, directory=directory)
+    assert (result.scanned_count, result.matched_count, result.inserted_count) == (8, 3, 3)
+
+    # 新规则增加 "市场" 关键词后重跑，只补录新命中的条目
+    publish_rules(Rules(
+        categories=[RuleCategory(name="安全", keywords=["黑客"]), RuleCategory(name="行情", keywords=["市场"])],
+        ignore_words=["直播"],
+    ), "测试")
+    reload_rules()
+    result = retag.retag_archive(start, end, directory=directory)
+    assert (result.matched_count, result.inserted_count) == (7, 4)
+    assert retag.retag_archive(start, end, directory=directory).inserted_count == 0
+
+    # 只读快照之后被并发入库的条目: 写入时由 ON CONFLICT 跳过，不中断本批
+    monkeypatch.setattr(retag, "select_existing", lambda *args: set())
+    assert retag.retag_archive(start, end, directory=directory).inserted_count == 0
+
+    with Session(db) as session:
+        rows = session.exec(select(NewsFlash)).all()
+        assert len(rows) == 7
+        assert all(row.is_pushed for row in rows)
+        assert {row.rule_version for row in rows} == {1, 2}
+
+def test_retag_links_near_duplicates(db, tmp_path):
+    text = "某项目跨链桥遭黑客攻击，损失约 3000 万美元"
+    with Session(db) as session:
+        session.add(NewsFlash(source="aicoin", source_id="live-1", title=text, content="", pub_time=DAY, tags="安全", is_pushed=True))
+        session.commit()
+        canonical_id = session.exec(select(NewsFlash.id)).one()
+    items = [
+        # 与已入库快讯近似重复 (按归档时间范围从数据库比对，不依赖近期索引)
+        RawNews(source="blockbeats", source_id="archive-dup", title=text, content="", url="", pub_time=DAY + datetime.timedelta(hours=1)),
+        # 同一批内的首条与近似重复
+        RawNews(source="aicoin", source_id="archive-new", title="某交易所热钱包被黑客盗取", content="", url="", pub_time=DAY + datetime.timedelta(hours=30)),
+        RawNews(source="blockbeats", source_id="archive-new-dup", title="某交易所热钱包被黑客盗取", content="", url="", pub_time=DAY + datetime.timedelta(hours=31)),
+    ]
+    directory = str(tmp_path / "archive")
+    archive_items(items, directory)
+    result = retag.retag_archive(DAY, DAY + datetime.timedelta(days=2), directory=directory)
+    assert result.inserted_count == 3
+    with Session(db) as session:
+        links = {row.source_id: row.duplicate_of for row in session.exec(select(NewsFlash)).all()}
+    assert links["archive-dup"] == canonical_id
+    assert links["archive-new"] is None
+    assert links["archive-new-dup"] is not None and links["archive-new-dup"] != canonical_id
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
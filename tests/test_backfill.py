@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from sqlmodel import Session, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.backfill as backfill
+from src.models import BackfillCheckpoint, ScanRecord
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+PAGE_SIZE = 5
+TOTAL_ITEMS = 30  # 每 30 分钟一条，共 15 小时
+
+def _client(fail_pages=()):
+    """模拟 BlockBeats 分页接口: 按发布时间倒序，每页 PAGE_SIZE 条"""
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        requested.append(page)
+        if page in fail_pages:
+            return httpx.Response(503)
+        start = (page - 1) * PAGE_SIZE
+        items = [
+            {
+                "id": 400000 + i,
+                "title": f"历史快讯 {i}",
+                "content": "<p>正文</p>",
+                "create_time": int((NOW - datetime.timedelta(minutes=30 * i)).timestamp()),
+            }
+            for i in range(start, min(start + PAGE_SIZE, TOTAL_ITEMS))
+        ]
+        return httpx.Response(200, json={"status": 0, "data": {"page": page, "data": items}})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), requested
+
+@pytest.fixture(autouse=True)
+def _page_size(monkeypatch):
+    from src.scrapers.blockbeats import BlockBeatsScraper
+    monkeypatch.setattr(BlockBeatsScraper, "BACKFILL_PAGE_SIZE", PAGE_SIZE)
+
+def _run(since, client, restart=False):
+    return asyncio.run(backfill.backfill_source(
+        "blockbeats", since, asyncio.Semaphore(2), concurrency=2, restart=restart, client=client
+    ))
+
+def test_backfill_stops_at_target_date(db):
+    engine = db
+    since = NOW - datetime.timedelta(hours=6)  # 第 0~12 条
+    client, requested = _client()
+    checkpoint = _run(since, client)
+
+    assert checkpoint.completed
+    assert max(requested) <= 4
+    with Session(engine) as session:
+        assert len(session.exec(select(ScanRecord)).all()) == 13
+
+def test_backfill_resumes_from_checkpoint(db):
+    engine = db
+    since = NOW - datetime.timedelta(days=1)
+    client, _ = _client(fail_pages={4})
+    checkpoint = _run(since, client)
+    assert not checkpoint.completed
+    assert checkpoint.next_page == 4
+
+    client, requested = _client()
+    checkpoint = _run(since, client)
+    assert checkpoint.completed
+    assert min(requested) == 4
+    with Session(engine) as session:
+        assert len(session.exec(select(ScanRecord)).all()) == TOTAL_ITEMS
+        assert session.exec(select(BackfillCheckpoint)).one().scanned_count == TOTAL_ITEMS
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,66 @@
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import psutil
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.crawl_service import CrawlService
+from src.scrapers.browser_pool import BrowserPool
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+def test_loop_survives_across_cycles():
+    service = CrawlService(warm_up=False)
+    try:
+        first = service.submit(_current_loop())
+        second = service.submit(_current_loop())
+        assert first is second
+        assert service.is_running()
+    finally:
+        service.stop()
+    assert not service.is_running()
+
+def test_restart_after_stop():
+    service = CrawlService(warm_up=False)
+    first = service.submit(_current_loop())
+    service.stop()
+    try:
+        second = service.submit(_current_loop())
+        assert first is not second
+    finally:
+        service.stop()
+
+def test_browser_memory_counts_driver_tree_only():
+    # driver (带一个子进程) 与同一进程下的另一个大内存子进程 (如批量过滤进程池)
+    driver = subprocess.Popen([sys.executable, "-c", "import subprocess, sys; subprocess.run([sys.executable, '-c', 'import time; time.sleep(30)'])"])
+    other = subprocess.Popen([sys.executable, "-c", "import time; data = bytearray(200 * 1024 * 1024); time.sleep(30)"])
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline and (not psutil.Process(driver.pid).children() or psutil.Process(other.pid).memory_info().rss < 200 * 1024 * 1024):
+            time.sleep(0.05)
+        pool = BrowserPool()
+        assert pool.memory_mb() == 0
+        pool._driver_pids = {driver.pid}
+        tree = psutil.Process(driver.pid)
+        expected = sum(p.memory_info().rss for p in [tree] + tree.children(recursive=True)) / (1024 * 1024)
+        assert abs(pool.memory_mb() - expected) < 20
+        assert pool.memory_mb() < 150
+    finally:
+        for process in (driver, other):
+            for child in psutil.Process(process.pid).children(recursive=True):
+                child.kill()
+            process.kill()
+            process.wait()
+
+if __name__ == "__main__":
+    test_loop_survives_across_cycles()
+    test_restart_after_stop()
+    test_browser_memory_counts_driver_tree_only()
+    print("✅ 常驻抓取服务测试通过")
@@ -0,0 +1,127 @@
+import datetime
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.ingest as ingest
+import src.scheduler_service as scheduler_service
+from src.database import create_read_engine
+from src.models import DailyStats, NewsFlash, ScanRecord
+from src.scrapers.base import RawNews
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+@pytest.fixture
+def read_engine(db):
+    """同一数据库文件上的只读引擎 (与 Web 进程相同)"""
+    engine = create_read_engine(db.url, pool_size=4)
+    yield engine
+    engine.dispose()
+
+def test_pragmas_and_read_only(db, read_engine):
+    with db.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+    with Session(read_engine) as session:
+        session.add(ScanRecord(source_id="read-only"))
+        with pytest.raises(OperationalError):
+            session.commit()
+        session.rollback()
+
+def test_dashboard_reads_during_ingest(db, read_engine, monkeypatch):
+    """负载测试: 两个写线程 (定时抓取 + 历史回填) 持续批量入库的同时，多个线程并发执行仪表盘查询，不应出现锁错误"""
+    monkeypatch.setattr(ingest, "NEAR_DUP_ENABLED", False)
+
+    errors = []
+    reads = []
+    stop = threading.Event()
+    running = [2]
+    lock = threading.Lock()
+
+    def writer(prefix):
+        try:
+            for batch in range(10):
+                items = [
+                    (RawNews(
+                        source="load",
+                        source_id=f"{prefix}-{batch}-{i}",
+                        title=f"快讯 {batch}-{i}",
+                        content="正文" * 50,
+                        url="https://example.com",
+                        pub_time=NOW + datetime.timedelta(seconds=i),
+                    ), ["安全"] if i % 3 == 0 else [])
+                    for i in range(500)
+                ]
+                ingest.bulk_ingest(items, rule_version=1, notify=False)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            with lock:
+                running[0] -= 1
+                if not running[0]:
+                    stop.set()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                with Session(read_engine) as session:
+                    session.exec(select(func.count(ScanRecord.id))).one()
+                    session.exec(select(func.count(NewsFlash.id)).where(NewsFlash.tags != "")).one()
+                    session.exec(select(NewsFlash).order_by(NewsFlash.pub_time.desc()).limit(10)).all()
+                    session.exec(select(DailyStats)).all()
+                reads.append(time.perf_counter())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(prefix,)) for prefix in ("crawl", "backfill")] + [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert errors == []
+    assert len(reads) > 20
+    with Session(read_engine) as session:
+        assert session.exec(select(func.count(ScanRecord.id))).one() == 10000
+
+def test_interval_summary_releases_write_lock(db, read_engine, monkeypatch, tmp_path):
+    """定时汇总: 查询走只读连接，Webhook 请求期间不持有写锁，其他进程可以立即写入"""
+    with Session(db) as session:
+        session.add(NewsFlash(source="load", source_id="pending-1", title="待推送", content="", pub_time=NOW, tags="安全"))
+        session.commit()
+    errors = []
+
+    def _send(news_items, title_prefix):
+        try:
+            # 另一个进程的写入 (锁被占用时 0.5 秒即失败)
+            conn = sqlite3.connect(tmp_path / "sentinel.db", timeout=0.5, isolation_level=None)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT INTO scan_record (source_id, created_at) VALUES ('concurrent', '2026-10-17 12:00:00')")
+            conn.execute("COMMIT")
+            conn.close()
+        except sqlite3.OperationalError as e:
+            errors.append(e)
+        return True
+
+    monkeypatch.setattr(scheduler_service, "read_engine", read_engine)
+    monkeypatch.setattr(scheduler_service, "send_feishu_summary", _send)
+    scheduler_service.run_interval_summary()
+
+    assert errors == []
+    with Session(read_engine) as session:
+        assert session.exec(select(NewsFlash.is_pushed)).one() is True
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,78 @@
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.ingest as ingest
+from src.models import ScanRecord
+from src.scrapers.base import RawNews
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+def _item(i):
+    return RawNews(
+        source="test",
+        source_id=f"dedup-{i}",
+        title=f"普通快讯 {i}",
+        content="正文",
+        url=f"https://example.com/{i}",
+        pub_time=NOW + datetime.timedelta(minutes=i),
+    )
+
+def _record_scan_statements(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if "scan_record" in statement:
+            statements.append(statement)
+
+    return statements
+
+def test_cache_preload_and_batched_lookup(db):
+    engine, statements = db, _record_scan_statements(db)
+    # 其他进程 (如历史回填) 已写入的记录
+    with Session(engine) as session:
+        session.add(ScanRecord(source_id="dedup-0"))
+        session.commit()
+    cache = ingest.scan_cache
+    cache.rebuild()
+    assert "dedup-0" in cache and len(cache) == 1
+    statements.clear()
+
+    # 首轮: 缓存未命中的条目由一条批量 INSERT ... ON CONFLICT 在数据库中确认 (批内重复也只计一次)
+    items = [_item(i) for i in range(5)] + [_item(3)]
+    result = ingest.ingest_news(items)
+    assert (result.scanned_count, result.skip_count) == (4, 2)
+    assert len(statements) == 1 and "ON CONFLICT DO NOTHING" in statements[0]
+    assert len(cache) == 5
+
+    # 次轮: 全部命中缓存，不再访问 scan_record
+    statements.clear()
+    result = ingest.ingest_news([_item(i) for i in range(5)])
+    assert (result.scanned_count, result.skip_count) == (0, 5)
+    assert statements == []
+
+def test_cache_misses_fall_back_to_database(db):
+    engine = db
+    cache = ingest.scan_cache
+    cache.rebuild()
+    # 缓存加载之后由其他进程写入的记录，由数据库确认并补进缓存
+    with Session(engine) as session:
+        session.add(ScanRecord(source_id="dedup-1"))
+        session.commit()
+    result = ingest.ingest_news([_item(1), _item(2)])
+    assert (result.scanned_count, result.skip_count) == (1, 1)
+    assert "dedup-1" in cache and "dedup-2" in cache
+    with Session(engine) as session:
+        assert len(session.exec(select(ScanRecord)).all()) == 2
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
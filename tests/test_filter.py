@@ -0,0 +1,123 @@
+import random
+import sys
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from src import config
+import src.filter as filter_module
+import src.rules as rules
+from src.filter import get_risk_tags, get_risk_tags_batch, match_risk, get_compiled, reload_rules, shutdown_filter_pool
+from src.matcher import AhoCorasick
+
+# 规则集存放在每个测试的临时数据库中 (见 conftest.py)，首次加载时写入内置默认规则 v1
+pytestmark = pytest.mark.usefixtures("db")
+
+def _reference_tags(title: str, content: str):
+    """逐词 in 扫描的原始实现，作为对照"""
+    full_text = f"{title} {content}".lower()
+    if any(word.lower() in full_text for word in config.IGNORE_WORDS):
+        return []
+    groups = [("安全", config.KEYWORDS_SECURITY), ("合规", config.KEYWORDS_COMPLIANCE), ("宏观", config.KEYWORDS_MACRO)]
+    return [tag for tag, words in groups if any(word.lower() in full_text for word in words)]
+
+def test_overlapping_matches():
+    matcher = AhoCorasick([("he", "a"), ("she", "a"), ("his", "b"), ("hers", "b")])
+    found = sorted((start, end, matcher.patterns[i][0]) for start, end, i in matcher.iter_matches("ushers"))
+    assert found == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+def test_matches_reference_implementation():
+    rng = random.Random(7)
+    vocabulary = config.ALL_KEYWORDS + config.IGNORE_WORDS + ["比特币", "以太坊", "价格", " ", "sec", "rug"]
+    for _ in range(500):
+        title = "".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 4)))
+        content = "".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 8)))
+        assert get_risk_tags(title, content) == _reference_tags(title, content)
+
+def test_offsets_and_case_insensitive():
+    title = "美国SEC起诉某交易所"
+    content = "该交易所被指涉嫌洗钱，sec 称将冻结资产。"
+    result = match_risk(title, content)
+    assert result.tags == ["合规"]
+    for m in result.matches:
+        text = title if m.field == "title" else content
+        assert text[m.start:m.end].lower() == m.keyword.lower()
+    keywords = {(m.field, m.keyword) for m in result.matches}
+    assert ("title", "SEC") in keywords and ("content", "SEC") in keywords
+    assert ("content", "洗钱") in keywords
+
+def test_ignore_words_win():
+    result = match_risk("某交易所遭黑客攻击", "空投活动同步进行")
+    assert result.ignored and result.tags == []
+
+def test_publish_swaps_rules_atomically():
+    before = get_compiled()
+    assert get_compiled() is before
+    active_version, current = rules.load_active_rules()
+    assert before.version == active_version
+
+    updated = current.model_copy(deep=True)
+    updated.categories[2].keywords.append("非农")
+    rules.publish_rules(updated, note="新增非农")
+    # 检查间隔内沿用旧版本，reload 后切换
+    assert get_risk_tags("美国非农数据公布", "") == []
+    reload_rules()
+    assert get_risk_tags("美国非农数据公布", "") == ["宏观"]
+    assert match_risk("美国非农数据公布", "").rule_version == active_version + 1
+    assert before.matcher is not get_compiled().matcher
+
+def test_high_risk_follows_rule_set(monkeypatch):
+    active_version, current = rules.load_active_rules()
+    assert get_compiled().high_risk == {"安全"}
+    # 未设置高危标记的旧版本规则集按 HIGH_RISK_TAGS 判断
+    legacy = rules.Rules.model_validate_json('{"categories": [{"name": "安全", "keywords": ["黑客"]}], "ignore_words": []}')
+    assert legacy.categories[0].high_risk is None and legacy.high_risk_tags() == ["安全"]
+
+    # 类别改名后高危标记随类别保留
+    renamed = current.model_copy(deep=True)
+    renamed.categories[0].name = "安全事件"
+    rules.publish_rules(renamed, note="安全类改名")
+    warnings = []
+    monkeypatch.setattr(filter_module.logger, "warning", warnings.append)
+    reload_rules()
+    assert get_compiled().high_risk == {"安全事件"}
+    assert get_compiled().is_high_risk(get_risk_tags("某交易所遭黑客攻击", ""))
+    assert warnings == []
+
+    # 规则集没有高危类别时告警
+    unflagged = renamed.model_copy(deep=True)
+    unflagged.categories[0].high_risk = False
+    rules.publish_rules(unflagged, note="取消高危")
+    reload_rules()
+    assert not get_compiled().is_high_risk(get_risk_tags("某交易所遭黑客攻击", ""))
+    assert len(warnings) == 1 and "没有高危类别" in warnings[0]
+
+    # 回滚到原版本
+    rules.activate_rule_set(active_version)
+    reload_rules()
+    assert get_compiled().high_risk == {"安全"}
+
+def test_batch_matches_single_item(monkeypatch):
+    rng = random.Random(11)
+    vocabulary = config.ALL_KEYWORDS + config.IGNORE_WORDS + ["比特币", "价格", " "]
+    items = [
+        ("".join(rng.choice(vocabulary) for _ in range(3)), "".join(rng.choice(vocabulary) for _ in range(6)))
+        for _ in range(300)
+    ]
+    expected = [get_risk_tags(title, content) for title, content in items]
+    assert get_risk_tags_batch(items) == expected
+
+    # 降低阈值，走进程池分片路径
+    monkeypatch.setattr(config, "FILTER_PARALLEL_THRESHOLD", 100)
+    monkeypatch.setattr(config, "FILTER_CHUNK_SIZE", 64)
+    try:
+        assert get_risk_tags_batch(items) == expected
+    finally:
+        shutdown_filter_pool()
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,182 @@
+import asyncio
+import datetime
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.scrapers.base import BaseScraper, RawNews
+from src.scrapers.base import Watermark
+from src.scrapers.blockbeats import BlockBeatsHttpScraper, BlockBeatsScraper
+from src.scrapers.http_scraper import HttpScraper, extract_html
+from src.scrapers.registry import SCRAPER_REGISTRY
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+class FallbackScraper(BaseScraper):
+    """记录是否被调用的回退爬虫 (代替 Playwright)"""
+    calls = 0
+    instances = set()
+
+    async def run(self) -> List[RawNews]:
+        FallbackScraper.calls += 1
+        FallbackScraper.instances.add(id(self))
+        self.seen = (self.watermark, self.previous_fingerprint)
+        return []
+
+class BlockBeatsHtmlScraper(HttpScraper):
+    """复用 BlockBeats 声明式配置的 HTML 快速路径"""
+    SOURCE_NAME = "BlockBeats-HTTP"
+    URL = "https://www.theblockbeats.info/newsflash"
+    LIST_SELECTOR = BlockBeatsScraper.LIST_SELECTOR
+    ITEM_SELECTOR = BlockBeatsScraper.ITEM_SELECTOR
+    ITEM_FIELDS = BlockBeatsScraper.ITEM_FIELDS
+    FALLBACK = FallbackScraper
+
+    def parse_row(self, row: dict, page_data: dict) -> Optional[RawNews]:
+        return BlockBeatsScraper()._parse_item(row)
+
+class BlockBeatsJsonScraper(HttpScraper):
+    SOURCE_NAME = "BlockBeats-JSON"
+    URL = "https://api.theblockbeats.info/v1/newsflash/list"
+    RESPONSE_TYPE = "json"
+    FALLBACK = FallbackScraper
+
+    def parse_feed(self, payload) -> List[RawNews]:
+        return BlockBeatsScraper().parse_feed(payload)
+
+def _client(body: str, status_code: int = 200, content_type: str = "text/html") -> httpx.AsyncClient:
+    """使用录制的 fixture 响应代替真实网络"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, text=body, headers={"Content-Type": content_type})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+def test_extract_html_matches_field_spec():
+    html = (FIXTURES / "blockbeats_newsflash.html").read_text(encoding="utf-8")
+    extracted = extract_html(
+        html,
+        BlockBeatsScraper.ITEM_SELECTOR,
+        BlockBeatsScraper.ITEM_FIELDS,
+        list_selector=BlockBeatsScraper.LIST_SELECTOR,
+    )
+    first = extracted["items"][0]
+    assert first["time"] == "10:46"
+    assert first["has_content"] is True
+    assert first["paragraphs"] == ["据链上安全机构监测，某交易所热钱包出现异常转出。", "目前该交易所已暂停充提。"]
+    assert first["original_href"] == "https://example.com/original/1"
+    assert extracted["items"][1]["original_href"] == ""
+
+def test_html_fast_path():
+    FallbackScraper.calls = 0
+    html = (FIXTURES / "blockbeats_newsflash.html").read_text(encoding="utf-8")
+    results = asyncio.run(BlockBeatsHtmlScraper(client=_client(html)).run())
+
+    assert [item.title for item in results] == [
+        "某交易所热钱包疑似被盗，损失约 2000 万美元",
+        "美 SEC 就现货 ETF 申请征求公众意见",
+    ]
+    assert results[0].url == "https://example.com/original/1"
+    assert results[1].url == "https://www.theblockbeats.info/flash/300002"
+    assert results[0].content.count("\n\n") == 1
+    assert FallbackScraper.calls == 0
+
+def test_json_fast_path_keeps_important_only():
+    FallbackScraper.calls = 0
+    body = (FIXTURES / "blockbeats_feed.json").read_text(encoding="utf-8")
+    results = asyncio.run(BlockBeatsJsonScraper(client=_client(body, content_type="application/json")).run())
+
+    assert len(results) == 1
+    assert results[0].content == "据链上安全机构监测，某交易所热钱包出现异常转出。\n目前该交易所已暂停充提。"
+    assert results[0].pub_time.second == 0
+    assert FallbackScraper.calls == 0
+
+def test_fallback_on_validation_failure():
+    FallbackScraper.calls = 0
+    asyncio.run(BlockBeatsHtmlScraper(client=_client("<html><body>Just a moment...</body></html>")).run())
+    assert FallbackScraper.calls == 1
+
+def test_fallback_on_http_error():
+    FallbackScraper.calls = 0
+    asyncio.run(BlockBeatsJsonScraper(client=_client(json.dumps({}), status_code=503)).run())
+    assert FallbackScraper.calls == 1
+
+def test_fallback_instance_is_reused():
+    FallbackScraper.calls = 0
+    FallbackScraper.instances = set()
+    scraper = BlockBeatsJsonScraper(client=_client(json.dumps({}), status_code=503), max_pages=2)
+    # 回退爬虫与快速路径共用来源级页面并发上限
+    assert scraper.fallback._page_limit is scraper._page_limit
+    watermark = Watermark(source_id="bb-1", pub_time=datetime.datetime(2026, 10, 17, 10, 0))
+    for fingerprint in ("http:a", "http:b"):
+        scraper.watermark, scraper.previous_fingerprint = watermark, fingerprint
+        asyncio.run(scraper.run())
+        # 每轮注入的高水位与指纹同步给回退爬虫
+        assert scraper.fallback.seen == (watermark, fingerprint)
+    assert FallbackScraper.calls == 2 and len(FallbackScraper.instances) == 1
+
+def _feed_body(server_time: int, request_id: str) -> str:
+    """同一批条目，仅服务器时间戳与请求 ID 不同的接口响应"""
+    payload = json.loads((FIXTURES / "blockbeats_feed.json").read_text(encoding="utf-8"))
+    payload.update(server_time=server_time, request_id=request_id)
+    return json.dumps(payload, ensure_ascii=False)
+
+class InterceptScraper(BlockBeatsScraper):
+    """以固定响应体代替页面拦截"""
+    body = b""
+
+    async def capture_feed(self, page, url: str) -> bytes:
+        return self.body
+
+def test_fingerprint_ignores_volatile_fields():
+    first, second = _feed_body(1760064400, "req-a"), _feed_body(1760064460, "req-b")
+    assert first != second
+
+    # HTTP 快速路径
+    scraper = BlockBeatsJsonScraper(client=_client(first, content_type="application/json"))
+    assert len(asyncio.run(scraper.run())) == 1
+    scraper.previous_fingerprint = scraper.fingerprint
+    scraper.client = _client(second, content_type="application/json")
+    assert asyncio.run(scraper.run()) == [] and scraper.short_circuited
+    # 条目变化时照常处理
+    scraper.client = _client(second.replace("热钱包疑似被盗", "冷钱包疑似被盗"), content_type="application/json")
+    assert len(asyncio.run(scraper.run())) == 1 and not scraper.short_circuited
+
+    # 网络拦截模式
+    scraper = InterceptScraper(intercept=True)
+    scraper.body = first.encode("utf-8")
+    assert len(asyncio.run(scraper.try_feed(None, scraper.FEED_URL_PATTERN))) == 1
+    scraper.previous_fingerprint = scraper.fingerprint
+    scraper.body = second.encode("utf-8")
+    assert asyncio.run(scraper.try_feed(None, scraper.FEED_URL_PATTERN)) == [] and scraper.short_circuited
+
+def test_blockbeats_registered_with_http_fast_path():
+    assert SCRAPER_REGISTRY["blockbeats"] is BlockBeatsHttpScraper
+    assert isinstance(BlockBeatsHttpScraper().fallback, BlockBeatsScraper)
+    body = (FIXTURES / "blockbeats_feed.json").read_text(encoding="utf-8")
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(200, text=body, headers={"Content-Type": "application/json"})
+
+    scraper = BlockBeatsHttpScraper(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    results = asyncio.run(scraper.run())
+    assert [item.source for item in results] == ["blockbeats"]
+    assert "type=push" in requested[0] and "page=1" in requested[0]
+
+if __name__ == "__main__":
+    test_extract_html_matches_field_spec()
+    test_html_fast_path()
+    test_json_fast_path_keeps_important_only()
+    test_fallback_on_validation_failure()
+    test_fallback_on_http_error()
+    test_fallback_instance_is_reused()
+    test_fingerprint_ignores_volatile_fields()
+    test_blockbeats_registered_with_http_fast_path()
+    print("✅ HTTP 爬虫离线测试通过")
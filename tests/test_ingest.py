@@ -0,0 +1,101 @@
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.ingest as ingest
+import src.scheduler_service as scheduler_service
+from src.filter import get_compiled
+from src.models import DailyStats, NewsFlash, ScanRecord
+from src.scrapers.base import RawNews
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+def _item(i, title=None):
+    return RawNews(
+        source="test",
+        source_id=f"bulk-{i}",
+        title=title or f"快讯 {i} 交易所遭黑客攻击 编号{i:05d}",
+        content=f"第 {i} 条正文，涉及金额 {i * 7919} 美元，链上地址 0x{i:040x}。",
+        url=f"https://example.com/{i}",
+        pub_time=NOW + datetime.timedelta(seconds=i),
+    )
+
+@pytest.fixture(autouse=True)
+def _realtime(db, monkeypatch):
+    monkeypatch.setattr(ingest, "NOTIFICATION_MODE", "realtime")
+    # 测试条目使用同一模板，关闭近似重复检测 (见 test_neardup.py)
+    monkeypatch.setattr(ingest, "NEAR_DUP_ENABLED", False)
+
+def test_bulk_ingest_single_transaction(db):
+    engine = db
+    # 其他进程已写入的扫描记录，以及重新打标签补录过的快讯
+    with Session(engine) as session:
+        session.add(ScanRecord(source_id="bulk-0"))
+        session.add(NewsFlash(source="test", source_id="bulk-1", title="补录", content="", pub_time=NOW, tags="安全"))
+        session.commit()
+
+    get_compiled()  # 首次加载规则会写入默认规则集，不计入入库事务
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    items = [_item(i) for i in range(1000)] + [_item(i, title=f"普通快讯 {i}") for i in range(1000, 1200)]
+    result = ingest.ingest_news(items)
+    assert (result.scanned_count, result.skip_count) == (1199, 1)
+    assert result.new_count == 998  # bulk-0 已扫描，bulk-1 已存在于 NewsFlash
+    assert result.push_count == 998
+    assert len(commits) == 2  # 入库一个事务，推送后标记一个事务
+
+    with Session(engine) as session:
+        assert session.exec(select(DailyStats)).one().scanned_count == 1199
+        assert len(session.exec(select(NewsFlash).where(NewsFlash.is_pushed == False)).all()) == 1
+        # 再次入库同一批: 缓存命中，计数不变
+        assert ingest.ingest_news(items).skip_count == len(items)
+        session.expire_all()
+        assert session.exec(select(DailyStats)).one().scanned_count == 1199
+
+def test_bulk_ingest_without_notify_marks_pushed(db, monkeypatch):
+    pushed = []
+    monkeypatch.setattr(ingest, "send_feishu_card", lambda *args: pushed.append(args) or True)
+    result = ingest.ingest_news([_item(i) for i in range(20)], notify=False)
+    assert (result.new_count, result.push_count) == (20, 0)
+    assert pushed == []
+    with Session(db) as session:
+        assert all(news.is_pushed for news in session.exec(select(NewsFlash)).all())
+
+def test_realtime_retry_resends_unmarked_pushes(db, monkeypatch):
+    sent = []
+    monkeypatch.setattr(ingest, "send_feishu_card", lambda title, *args: sent.append(title) or True)
+    monkeypatch.setattr(scheduler_service, "send_feishu_card", lambda title, *args: sent.append(title) or True)
+
+    # 推送后、标记前进程退出: 快讯已提交但保持未推送
+    def _crash(news_ids):
+        raise SystemExit
+    with monkeypatch.context() as patch:
+        patch.setattr(ingest, "_mark_pushed", _crash)
+        with pytest.raises(SystemExit):
+            ingest.ingest_news([_item(i) for i in range(3)])
+    assert len(sent) == 3
+
+    # 刚入库的快讯留给入库流程推送，不补发
+    scheduler_service.run_realtime_retry()
+    assert len(sent) == 3
+
+    # 重启后补发 (至少一次)，按发布时间先后推送并标记，之后不再重复
+    sent.clear()
+    monkeypatch.setattr(scheduler_service, "REALTIME_RETRY_DELAY_MINUTES", 0)
+    scheduler_service.run_realtime_retry()
+    assert sent == [_item(i).title for i in range(3)]
+    with Session(db) as session:
+        assert all(news.is_pushed for news in session.exec(select(NewsFlash)).all())
+    scheduler_service.run_realtime_retry()
+    assert len(sent) == 3
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
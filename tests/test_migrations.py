@@ -0,0 +1,119 @@
+import datetime
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, SQLModel, desc, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.database as database
+from src.database import create_write_engine
+from src.migrations import MIGRATIONS, applied_versions, run_migrations
+from src.models import NewsFlash, SourceState
+from src.report import news_in_range_statement
+from src.scheduler_service import pending_news_statement
+from src.rollup import daily_trend_statement
+from src.web.routes import recent_risks_statement
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+# 早期版本的表结构 (没有后来新增的列和索引)
+LEGACY_SCHEMA = [
+    """CREATE TABLE newsflash (
+        id INTEGER NOT NULL PRIMARY KEY, source VARCHAR NOT NULL, source_id VARCHAR NOT NULL,
+        title VARCHAR NOT NULL, content VARCHAR NOT NULL, url VARCHAR, pub_time DATETIME NOT NULL,
+        created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, tags VARCHAR NOT NULL,
+        is_pushed BOOLEAN NOT NULL, in_daily_report BOOLEAN NOT NULL, in_weekly_report BOOLEAN NOT NULL)""",
+    "CREATE UNIQUE INDEX ix_newsflash_source_id ON newsflash (source_id)",
+    "CREATE INDEX ix_newsflash_title ON newsflash (title)",
+    "CREATE INDEX ix_newsflash_pub_time ON newsflash (pub_time)",
+    """CREATE TABLE source_state (
+        id INTEGER NOT NULL PRIMARY KEY, source VARCHAR NOT NULL, last_source_id VARCHAR,
+        last_pub_time DATETIME, updated_at DATETIME NOT NULL)""",
+    "CREATE UNIQUE INDEX ix_source_state_source ON source_state (source)",
+]
+
+def _plan(engine, statement) -> str:
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return "\n".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+def test_legacy_database_is_migrated(monkeypatch):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_write_engine(f"sqlite:///{os.path.join(directory, 'legacy.db')}")
+        with engine.begin() as conn:
+            for ddl in LEGACY_SCHEMA:
+                conn.exec_driver_sql(ddl)
+            conn.exec_driver_sql(
+                "INSERT INTO newsflash VALUES (1, 'aicoin', 'old-1', '旧快讯', '正文', NULL, '2026-01-01 00:00:00',"
+                " '2026-01-01 00:00:00', '2026-01-01 00:00:00', '安全', 1, 0, 0)"
+            )
+            conn.exec_driver_sql("INSERT INTO source_state VALUES (1, 'aicoin', 'old-1', NULL, '2026-01-01 00:00:00')")
+            # v3 ~ v7 版本建立过的覆盖索引，由 v8 删除
+            conn.exec_driver_sql("CREATE INDEX ix_newsflash_created_tags ON newsflash (created_at, tags)")
+
+        monkeypatch.setattr(database, "engine", engine)
+        database.init_db()
+        assert applied_versions(engine) == [item.version for item in MIGRATIONS]
+        # 再次启动不会重复执行
+        assert run_migrations(engine) == []
+
+        with Session(engine) as session:
+            news = session.get(NewsFlash, 1)
+            assert news.title == "旧快讯" and news.rule_version is None and news.duplicate_of is None
+            state = session.exec(select(SourceState)).one()
+            assert state.run_count == 0 and state.interval_seconds is None
+        with engine.connect() as conn:
+            indexes = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(newsflash)")}
+        assert {index.name for index in NewsFlash.__table__.indexes} <= indexes
+        assert "ix_newsflash_created_tags" not in indexes
+        engine.dispose()
+
+def test_hot_queries_use_indexes():
+    """EXPLAIN QUERY PLAN 回归测试: 热点查询必须命中对应的索引，且排序无需临时 B 树"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_write_engine(f"sqlite:///{os.path.join(directory, 'sentinel.db')}")
+        SQLModel.metadata.create_all(engine)
+        run_migrations(engine)
+        with Session(engine) as session:
+            for i in range(200):
+                session.add(NewsFlash(
+                    source="aicoin" if i % 2 else "blockbeats", source_id=f"plan-{i}", title=f"快讯 {i}", content="正文",
+                    pub_time=NOW - datetime.timedelta(minutes=i), created_at=NOW - datetime.timedelta(minutes=i),
+                    tags="安全" if i % 3 else "", is_pushed=i % 5 != 0,
+                ))
+            session.commit()
+
+        start = NOW - datetime.timedelta(hours=1)
+        plan = _plan(engine, pending_news_statement(start, NOW))
+        assert "USING INDEX ix_newsflash_pushed_created (is_pushed=? AND created_at>? AND created_at<?)" in plan
+
+        plan = _plan(engine, daily_trend_statement(NOW - datetime.timedelta(days=7)))
+        assert "ix_stats_rollup_tag_bucket (tag=? AND bucket>?)" in plan
+
+        plan = _plan(engine, news_in_range_statement(start, NOW))
+        assert "USING INDEX ix_newsflash_duplicate_of_pub_time (duplicate_of=? AND pub_time>? AND pub_time<?)" in plan
+        assert "TEMP B-TREE" not in plan
+
+        plan = _plan(engine, recent_risks_statement())
+        assert "USING INDEX ix_newsflash_duplicate_of_pub_time (duplicate_of=?)" in plan and "TEMP B-TREE" not in plan
+
+        # 快讯列表: 按来源筛选 + 日期范围 + 倒序分页
+        news_list = (
+            select(NewsFlash)
+            .where(NewsFlash.source == "aicoin", NewsFlash.pub_time >= start, NewsFlash.pub_time <= NOW)
+            .order_by(desc(NewsFlash.pub_time))
+            .offset(20).limit(20)
+        )
+        plan = _plan(engine, news_list)
+        assert "USING INDEX ix_newsflash_source_pub_time (source=? AND pub_time>? AND pub_time<?)" in plan
+        assert "TEMP B-TREE" not in plan
+        engine.dispose()
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,114 @@
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.ingest as ingest
+from src.models import NewsFlash
+from src.neardup import NearDupIndex, hamming_distance, simhash
+from src.scrapers.base import RawNews
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+STORY = (
+    "某 DeFi 协议遭黑客攻击，损失约 1200 万美元",
+    "据链上安全机构监测，某 DeFi 协议的借贷合约今日凌晨遭黑客攻击，攻击者利用价格预言机漏洞"
+    "反复操纵抵押品价格并借出资产，目前损失约 1200 万美元，项目方已暂停合约并表示将全额赔偿受影响用户。",
+)
+# 另一来源转载: 标点、空白与个别措辞不同
+REWRITE = (
+    "某DeFi协议遭黑客攻击,损失约1200万美元",
+    "据链上安全机构监测：某DeFi协议的借贷合约今日凌晨遭到黑客攻击，攻击者利用价格预言机漏洞"
+    "反复操纵抵押品价格并借出资产。目前损失约1200万美元，项目方已暂停合约并表示将全额赔偿受影响用户",
+)
+OTHER = (
+    "某交易所热钱包私钥泄露，多链资产被盗",
+    "某中心化交易所发布公告称，其热钱包私钥疑似泄露，以太坊、BSC 等多条链上资产被盗，"
+    "目前已暂停充提业务，冷钱包资产未受影响，平台承诺用自有资金弥补用户损失。",
+)
+
+def _item(source, source_id, text, minutes=0):
+    return RawNews(
+        source=source,
+        source_id=source_id,
+        title=text[0],
+        content=text[1],
+        url=f"https://example.com/{source_id}",
+        pub_time=NOW + datetime.timedelta(minutes=minutes),
+    )
+
+def test_simhash_distance():
+    base = simhash(*STORY)
+    assert hamming_distance(base, simhash(*REWRITE)) <= 3
+    assert hamming_distance(base, simhash(*OTHER)) > 10
+
+def test_index_window_and_eviction():
+    index = NearDupIndex(window_hours=1, max_distance=3, from_db=False)
+    fingerprint = simhash(*STORY)
+    index.add(1, fingerprint, NOW)
+    # 翻转 3 位仍能找到，翻转 4 位 (分布在不同分段) 则不算重复
+    assert index.find(fingerprint ^ 0b111, NOW) == 1
+    assert index.find(fingerprint ^ (1 | 1 << 16 | 1 << 32 | 1 << 48), NOW) is None
+    # 发布时间超出窗口不算重复
+    assert index.find(fingerprint, NOW + datetime.timedelta(hours=2)) is None
+    # 新条目把窗口推后，旧条目被淘汰
+    index.add(2, simhash(*OTHER), NOW + datetime.timedelta(hours=2))
+    assert len(index) == 1
+
+def test_readded_entry_survives_stale_expiry():
+    index = NearDupIndex(window_hours=1, max_distance=3, from_db=False)
+    fingerprint = simhash(*STORY)
+    index.add(1, fingerprint, NOW)
+    # 同一 ID 以更晚的发布时间重新加入，堆中的旧记录到期时不影响新条目
+    index.add(1, fingerprint, NOW + datetime.timedelta(minutes=90))
+    index.add(2, simhash(*OTHER), NOW + datetime.timedelta(minutes=100))
+    assert len(index) == 2
+    assert index.find(fingerprint, NOW + datetime.timedelta(minutes=100)) == 1
+    # 按历史时间段加载的索引不淘汰，也不保留到期堆
+    fixed = NearDupIndex(window_hours=1, from_db=False, sliding_window=False)
+    fixed.add(1, fingerprint, NOW)
+    fixed.add(2, simhash(*OTHER), NOW + datetime.timedelta(hours=5))
+    assert len(fixed) == 2 and fixed._expiry == []
+
+def test_ingest_links_cross_source_duplicate(db, monkeypatch):
+    monkeypatch.setattr(ingest, "NOTIFICATION_MODE", "realtime")
+    pushed = []
+    monkeypatch.setattr(ingest, "send_feishu_card", lambda title, *args: pushed.append(title) or True)
+    monkeypatch.setattr(ingest, "near_dup_index", NearDupIndex())
+    ingest.near_dup_index.rebuild(now=NOW)
+
+    # 同一批内的转载，以及下一轮另一来源的转载
+    result = ingest.ingest_news([_item("aicoin", "a-1", STORY), _item("blockbeats", "b-1", REWRITE, 2)])
+    assert (result.new_count, result.duplicate_count, result.push_count) == (1, 1, 1)
+    result = ingest.ingest_news([_item("odaily", "o-1", REWRITE, 5), _item("odaily", "o-2", OTHER, 6)])
+    assert (result.new_count, result.duplicate_count, result.push_count) == (1, 1, 1)
+    assert pushed == [STORY[0], OTHER[0]]
+
+    with Session(db) as session:
+        canonical = session.exec(select(NewsFlash).where(NewsFlash.source_id == "a-1")).one()
+        duplicates = session.exec(select(NewsFlash).where(NewsFlash.duplicate_of == canonical.id)).all()
+        assert sorted(news.source_id for news in duplicates) == ["b-1", "o-1"]
+
+    # 重启后从数据库重建索引，仍能识别
+    index = NearDupIndex()
+    index.rebuild(now=NOW)
+    assert len(index) == 2
+    assert index.find(simhash(*REWRITE), NOW + datetime.timedelta(minutes=30)) == canonical.id
+
+    # 入库事务回滚时不更新内存索引，后续条目不会关联到未提交的 ID
+    with monkeypatch.context() as patch:
+        patch.setattr(ingest, "apply_rollup", lambda *args: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            ingest.ingest_news([_item("odaily", "o-3", OTHER[::-1], 8)])
+    assert len(ingest.near_dup_index) == 2
+    result = ingest.ingest_news([_item("odaily", "o-4", OTHER[::-1], 9)])
+    assert (result.new_count, result.duplicate_count) == (1, 0)
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,187 @@
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, urlsplit
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.web.routes as routes
+from src.database import create_async_read_engine, create_read_engine, create_write_engine
+from src.migrations import run_migrations
+from src.models import NewsFlash, NewsTag
+from src.pagination import CountCache, apply_cursor, decode_cursor, encode_cursor, news_count_cache
+from src.tags import apply_tag_filter, insert_news_tags, tag_rows
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+PARAMS = ("page", "source", "tag", "keyword", "start_date", "end_date", "sort", "after", "before")
+
+def _engines(directory: str, count: int = 95):
+    """(写引擎, 只读引擎, 异步只读引擎)；页面查询与 Web 一样使用异步只读引擎"""
+    engine = create_write_engine(f"sqlite:///{os.path.join(directory, 'sentinel.db')}")
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
+    rows = []
+    for i in range(count):
+        # 每 3 条共用一个发布时间，翻页需按 id 区分
+        rows.append({
+            "source": "aicoin" if i % 2 else "blockbeats", "source_id": f"page-{i}", "title": f"快讯 {i}",
+            "content": "正文" * 500, "pub_time": NOW - datetime.timedelta(minutes=i // 3), "created_at": NOW,
+            "updated_at": NOW, "tags": "安全" if i % 4 else "宏观", "is_pushed": True,
+            "in_daily_report": False, "in_weekly_report": False,
+        })
+    with engine.begin() as conn:
+        conn.execute(insert(NewsFlash.__table__), rows)
+        news = conn.execute(select(NewsFlash.id, NewsFlash.tags, NewsFlash.pub_time)).all()
+        insert_news_tags(conn, [row for item in news for row in tag_rows(item.id, [item.tags], item.pub_time)])
+    return engine, create_read_engine(engine.url), create_async_read_engine(engine.url)
+
+def _list(async_engine, **params) -> dict:
+    """直接调用路由函数 (模板渲染替换为返回上下文)"""
+    values = {name: None for name in PARAMS}
+    values["page"] = 1
+    values.update(params)
+    values["page"] = int(values["page"])
+    request = SimpleNamespace(url="/news")
+
+    async def _call():
+        async with AsyncSession(async_engine) as session:
+            return await routes.news_list(request, session=session, **values)
+
+    return asyncio.run(_call())
+
+def _follow(async_engine, url: str) -> dict:
+    return _list(async_engine, **{key: value or None for key, value in parse_qsl(urlsplit(url).query, keep_blank_values=True)})
+
+def _walk(async_engine, **params):
+    """从第一页一直翻到最后一页，再从最后一页翻回第一页"""
+    context = _list(async_engine, **params)
+    pages = [[news.id for news in context["news_list"]]]
+    while context["next_url"]:
+        context = _follow(async_engine, context["next_url"])
+        assert context["page"] == len(pages) + 1
+        pages.append([news.id for news in context["news_list"]])
+    backward = [[news.id for news in context["news_list"]]]
+    while context["prev_url"]:
+        context = _follow(async_engine, context["prev_url"])
+        backward.append([news.id for news in context["news_list"]])
+    assert backward[::-1] == pages and context["page"] == 1
+    return pages, context["total"], context["total_pages"]
+
+def setup_module():
+    global _template_response
+    _template_response = routes.templates.TemplateResponse
+    routes.templates.TemplateResponse = lambda request, name, context: context
+    news_count_cache.invalidate()
+
+def teardown_module():
+    routes.templates.TemplateResponse = _template_response
+    news_count_cache.invalidate()
+
+def test_cursor_pagination_with_filters():
+    # 总数缓存是全局单例，每个测试使用新数据库前先清空
+    news_count_cache.invalidate()
+    with tempfile.TemporaryDirectory() as directory:
+        engine, read_engine, async_engine = _engines(directory)
+        with Session(read_engine) as session:
+            expected = list(session.exec(
+                select(NewsFlash.id).order_by(NewsFlash.pub_time.desc(), NewsFlash.id.desc())
+            ).all())
+            pages, total, total_pages = _walk(async_engine)
+            assert [len(page) for page in pages] == [20, 20, 20, 20, 15]
+            assert sum(pages, []) == expected and (total, total_pages) == (95, 5)
+
+            # 与各筛选条件组合
+            rows = session.exec(select(NewsFlash).order_by(NewsFlash.pub_time.desc(), NewsFlash.id.desc())).all()
+            cases = [
+                ({"source": "aicoin"}, lambda news: news.source == "aicoin"),
+                ({"tag": "安全"}, lambda news: news.tags == "安全"),
+                ({"keyword": "快讯 1"}, lambda news: "1" in news.title),
+                ({"start_date": "2026-10-17T11:45", "end_date": "2026-10-17T11:55"},
+                 lambda news: NOW - datetime.timedelta(minutes=15) <= news.pub_time <= NOW - datetime.timedelta(minutes=5)),
+                ({"source": "blockbeats", "tag": "宏观", "start_date": "2026-10-17T11:40"},
+                 lambda news: news.source == "blockbeats" and news.tags == "宏观" and news.pub_time >= NOW - datetime.timedelta(minutes=20)),
+            ]
+            for params, predicate in cases:
+                pages, total, _ = _walk(async_engine, **params)
+                expected = [news.id for news in rows if predicate(news)]
+                assert sum(pages, []) == expected and total == len(expected), params
+
+            # 列表只取摘要
+            news = _list(async_engine)["news_list"][0]
+            assert len(news.content) == 200 and not hasattr(news, "simhash")
+
+            # 相关度排序按页码分页
+            context = _list(async_engine, keyword="正文正文", sort="relevance")
+            assert context["total"] == 95 and "page=2" in context["next_url"] and "after" not in context["next_url"]
+            assert len(_follow(async_engine, context["next_url"])["news_list"]) == 20
+
+            # 无效游标退回第一页
+            first_page = [news.id for news in _list(async_engine)["news_list"]]
+            assert [news.id for news in _list(async_engine, after="bad")["news_list"]] == first_page
+        asyncio.run(async_engine.dispose())
+        read_engine.dispose()
+        engine.dispose()
+
+def test_count_cache_invalidation():
+    cache = CountCache(ttl_seconds=60)
+    generation = cache.generation
+    cache.set("key", 1, generation)
+    assert cache.get("key") == 1
+    cache.invalidate()
+    assert cache.get("key") is None
+    # 失效前开始的计数不会被缓存
+    cache.set("key", 1, generation)
+    assert cache.get("key") is None
+    assert decode_cursor(encode_cursor(NOW, 42)) == (NOW, 42)
+
+    # 总数缓存是全局单例，每个测试使用新数据库前先清空
+    news_count_cache.invalidate()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine, read_engine, async_engine = _engines(directory, count=30)
+        assert _list(async_engine)["total"] == 30
+        with engine.begin() as conn:
+            conn.execute(insert(NewsFlash.__table__).values(
+                source="aicoin", source_id="page-new", title="新快讯", content="", pub_time=NOW, created_at=NOW,
+                updated_at=NOW, tags="安全", is_pushed=True, in_daily_report=False, in_weekly_report=False,
+            ))
+        # 缓存未失效时仍是旧值，入库流程失效后重新计数
+        assert _list(async_engine)["total"] == 30
+        news_count_cache.invalidate()
+        assert _list(async_engine)["total"] == 31
+
+        # 游标翻页走索引范围，不需要临时排序
+        query = select(NewsFlash.id).where(NewsFlash.source == "aicoin")
+        query = apply_cursor(query, NewsFlash.pub_time, NewsFlash.id, after=(NOW, 10)).limit(20)
+        sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+        with engine.connect() as conn:
+            plan = "\n".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+        assert "USING COVERING INDEX ix_newsflash_source_pub_time (source=? AND pub_time<?)" in plan and "TEMP B-TREE" not in plan
+        query = apply_tag_filter(select(NewsFlash.id), "安全")
+        query = apply_cursor(query, NewsTag.pub_time, NewsTag.news_id, after=(NOW, 10)).limit(20)
+        sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+        with engine.connect() as conn:
+            plan = "\n".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+        assert "SEARCH news_tag USING COVERING INDEX ix_news_tag_tag_pub_time (tag=? AND pub_time<?)" in plan and "TEMP B-TREE" not in plan
+        asyncio.run(async_engine.dispose())
+        read_engine.dispose()
+        engine.dispose()
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_cursor_pagination_with_filters()
+        test_count_cache_invalidation()
+    finally:
+        teardown_module()
+    print("✅ 快讯列表分页测试通过")
@@ -0,0 +1,80 @@
+import datetime
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert
+from sqlmodel import Session, func, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.dedup as dedup
+import src.ingest as ingest
+import src.retention as retention
+from src import config
+from src.counters import SCAN_RECORD_COUNTER, get_counter
+from src.migrations import run_migrations
+from src.models import ScanRecord
+from src.scrapers.base import RawNews
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+def _item(source_id: str) -> RawNews:
+    return RawNews(source="test", source_id=source_id, title="普通快讯", content="行情平稳", url="", pub_time=NOW)
+
+def _setup(engine):
+    # 升级前已有的扫描记录: 8 月、9 月各 3 条，近期 2 条
+    with engine.begin() as conn:
+        conn.execute(insert(ScanRecord.__table__), [
+            {"source_id": f"old-{i}", "created_at": datetime.datetime(2026, 8 + i // 3, 10 + i)} for i in range(6)
+        ] + [
+            {"source_id": f"recent-{i}", "created_at": NOW - datetime.timedelta(days=i)} for i in range(2)
+        ])
+    run_migrations(engine)
+
+def test_compaction_keeps_dedup_and_totals(db, monkeypatch):
+    engine = db
+    _setup(engine)
+    monkeypatch.setattr(ingest, "NEAR_DUP_ENABLED", False)
+    with Session(engine) as session:
+        # 迁移用已有记录初始化累计数
+        assert get_counter(session, SCAN_RECORD_COUNTER) == 8
+
+    ingest.scan_cache.rebuild()
+    result = retention.compact_scan_records(now=NOW, retention_days=30)
+    assert result.compacted_count == 6 and result.months == ["2026-08", "2026-09"]
+    assert sorted(os.listdir(config.SCAN_SEGMENT_DIR)) == [".lock", "scan-2026-08.bin", "scan-2026-09.bin"]
+    assert os.path.getsize(os.path.join(config.SCAN_SEGMENT_DIR, "scan-2026-08.bin")) == 3 * 8
+    # 再次压缩没有新的过期记录
+    assert retention.compact_scan_records(now=NOW, retention_days=30).compacted_count == 0
+
+    with Session(engine) as session:
+        assert sorted(session.exec(select(ScanRecord.source_id)).all()) == ["recent-0", "recent-1"]
+    # 压缩后去重缓存只保留 live 表中的记录，旧记录由分段判断
+    assert len(ingest.scan_cache) == 2 and len(retention.scan_segments) == 6
+    assert "old-0" in retention.scan_segments and "recent-0" not in retention.scan_segments
+
+    # 旧条目 (含其他进程的新实例) 仍判定为重复，不重复计数
+    for segments in (retention.scan_segments, retention.ScanSegments()):
+        segments.refresh()
+        assert all(f"old-{i}" in segments for i in range(6))
+    monkeypatch.setattr(ingest, "scan_cache", dedup.ScanCache())
+    result = ingest.ingest_news([_item("old-1"), _item("recent-1"), _item("new-1")], notify=False)
+    assert (result.skip_count, result.scanned_count) == (2, 1)
+    with Session(engine) as session:
+        assert get_counter(session, SCAN_RECORD_COUNTER) == 9
+        assert session.exec(select(func.count()).select_from(ScanRecord)).one() == 3
+
+    # 追加压缩同一个月: 与已有分段合并，保持有序
+    with engine.begin() as conn:
+        conn.execute(insert(ScanRecord.__table__).values(source_id="old-9", created_at=datetime.datetime(2026, 9, 1)))
+    retention.compact_scan_records(now=NOW, retention_days=30)
+    fingerprints = retention._read_segment(os.path.join(config.SCAN_SEGMENT_DIR, "scan-2026-09.bin"))
+    assert len(fingerprints) == 4 and list(fingerprints) == sorted(fingerprints)
+    assert "old-9" in retention.scan_segments
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,124 @@
+import asyncio
+import datetime
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.ingest as ingest
+import src.retention as retention
+import src.web.routes as routes
+from src import config
+from src.counters import NEWSFLASH_COUNTER, get_counter
+from src.database import create_async_read_engine
+from src.migrations import run_migrations
+from src.models import NewsFlash, ScanRecord, StatsRollup
+from src.rollup import RollupTotals, get_rollup_totals, hour_bucket, rebuild_rollups
+from src.scrapers.base import RawNews
+
+NOW = datetime.datetime.now()
+OLD = NOW - datetime.timedelta(days=40)
+
+def _item(source: str, source_id: str, title: str) -> RawNews:
+    return RawNews(source=source, source_id=source_id, title=title, content=f"{title}，详情见公告。", url="", pub_time=NOW)
+
+def _snapshot(engine) -> list:
+    with engine.connect() as conn:
+        return sorted(tuple(row) for row in conn.execute(select(
+            StatsRollup.bucket, StatsRollup.source, StatsRollup.tag,
+            StatsRollup.scanned_count, StatsRollup.matched_count, StatsRollup.pushed_count,
+        )))
+
+def _setup(engine):
+    # 升级前已有的数据: 40 天前的扫描记录 (没有来源) 与一条已推送的快讯
+    with engine.begin() as conn:
+        conn.execute(insert(ScanRecord.__table__), [{"source_id": f"old-{i}", "created_at": OLD} for i in range(3)])
+        conn.execute(insert(NewsFlash.__table__).values(
+            source="aicoin", source_id="old-0", title="旧快讯", content="", pub_time=OLD, created_at=OLD, updated_at=OLD,
+            tags="安全,宏观", is_pushed=True, in_daily_report=False, in_weekly_report=False,
+        ))
+    run_migrations(engine)
+
+def test_incremental_rollups_match_rebuild(db, monkeypatch):
+    engine = db
+    _setup(engine)
+    # 迁移由原始表生成汇总
+    assert (hour_bucket(OLD), "", "", 3, 0, 0) in _snapshot(engine)
+    assert (hour_bucket(OLD), "aicoin", "安全", 0, 1, 1) in _snapshot(engine)
+
+    # 回填: 入库即为已推送
+    ingest.ingest_news([_item("aicoin", "backfill-1", "交易所遭黑客攻击"), _item("aicoin", "noise-1", "行情平稳")], notify=False)
+    # 实时推送: 第二条推送失败
+    monkeypatch.setattr(ingest, "NOTIFICATION_MODE", "realtime")
+    results = iter([True, False])
+    monkeypatch.setattr(ingest, "send_feishu_card", lambda *args: next(results))
+    ingest.ingest_news([_item("blockbeats", "push-1", "美联储宣布加息"), _item("blockbeats", "push-2", "合约漏洞被黑客利用")])
+    # 近似重复条目不推送、不计推送数；定时汇总稍后标记推送
+    monkeypatch.setattr(ingest, "NOTIFICATION_MODE", "interval")
+    monkeypatch.setattr(ingest, "NEAR_DUP_ENABLED", True)
+    ingest.ingest_news([
+        _item("aicoin", "interval-1", "某项目跨链桥遭黑客攻击，损失约 3000 万美元"),
+        _item("blockbeats", "interval-2", "某项目跨链桥遭黑客攻击，损失约 3000 万美元"),
+    ])
+    with Session(engine) as session:
+        ids = list(session.exec(select(NewsFlash.id).where(NewsFlash.is_pushed == False)).all())
+        assert len(ids) == 2
+        assert ingest.mark_pushed(session, ids) == 2
+        # 已标记的不会重复计数
+        assert ingest.mark_pushed(session, ids) == 0
+        session.commit()
+
+    with Session(engine) as session:
+        today = NOW.replace(hour=0, minute=0, second=0, microsecond=0)
+        # 扫描 6 条 (含噪音)，新增快讯 5 条 (含近似重复)；推送: 回填 1 + 实时 1 + 汇总 2 (含实时推送失败的一条，近似重复不计)
+        assert get_rollup_totals(session, today) == RollupTotals(scanned_count=6, matched_count=5, pushed_count=4)
+        assert get_counter(session, NEWSFLASH_COUNTER) == 6
+
+    # 增量维护的结果与从原始表重建一致
+    incremental = _snapshot(engine)
+    with engine.begin() as conn:
+        rebuild_rollups(conn)
+    assert _snapshot(engine) == incremental
+
+    # 旧扫描记录压缩后重建: 已压缩的小时保留原有扫描数
+    assert retention.compact_scan_records(retention_days=30).compacted_count == 3
+    with engine.begin() as conn:
+        rebuild_rollups(conn)
+    assert _snapshot(engine) == incremental
+
+def test_dashboard_reads_rollups(db, monkeypatch):
+    monkeypatch.setattr(routes.templates, "TemplateResponse", lambda request, name, context: context)
+    run_migrations(db)
+    today = hour_bucket(NOW)
+    with db.begin() as conn:
+        conn.execute(insert(StatsRollup.__table__), [
+            {"bucket": today, "source": "aicoin", "tag": "", "scanned_count": 100, "matched_count": 5, "pushed_count": 4},
+            {"bucket": today, "source": "aicoin", "tag": "安全", "scanned_count": 0, "matched_count": 3, "pushed_count": 2},
+            {"bucket": today - datetime.timedelta(days=2), "source": "blockbeats", "tag": "", "scanned_count": 40, "matched_count": 2, "pushed_count": 2},
+            {"bucket": today - datetime.timedelta(days=30), "source": "aicoin", "tag": "", "scanned_count": 9, "matched_count": 9, "pushed_count": 9},
+        ])
+    async_engine = create_async_read_engine(db.url)
+
+    async def _dashboard():
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+        async with AsyncSession(async_engine) as session:
+            context = await routes.dashboard(request, session=session)
+        await async_engine.dispose()
+        return context
+
+    context = asyncio.run(_dashboard())
+    assert (context["today_count"], context["today_risks"], context["today_pushed"]) == (100, 5, 4)
+    trend = context["trend"]
+    assert len(trend) == config.DASHBOARD_TREND_DAYS and trend[-1]["date"] == NOW.strftime("%m-%d")
+    assert [(item["scanned"], item["matched"], item["pushed"]) for item in trend[-3:]] == [(40, 2, 2), (0, 0, 0), (100, 5, 4)]
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,123 @@
+import datetime
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlmodel import Session, SQLModel, desc, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database import create_write_engine
+from src.migrations import run_migrations
+from src.models import NewsFlash
+from src.search import apply_keyword_filter, get_highlights
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+NEWS = [
+    ("某交易所遭黑客攻击", "攻击者盗取约 3000 万美元，交易所已暂停提币。"),
+    ("美联储宣布维持利率不变", "市场预期年内仍有一次降息，比特币小幅上涨。"),
+    ("跨链桥漏洞", "跨链桥合约存在重入漏洞，黑客攻击损失 <b>120</b> 万美元，黑客攻击已被确认。"),
+    ("比特币现货 ETF 净流入", "ETF 单日净流入创新高。"),
+]
+
+def _engine(directory: str):
+    engine = create_write_engine(f"sqlite:///{os.path.join(directory, 'sentinel.db')}")
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
+    with Session(engine) as session:
+        for i, (title, content) in enumerate(NEWS):
+            session.add(NewsFlash(
+                source="aicoin", source_id=f"search-{i}", title=title, content=content,
+                pub_time=NOW - datetime.timedelta(minutes=i), tags="安全",
+            ))
+        session.commit()
+    return engine
+
+def _search(session: Session, keyword: str, rank: bool = False):
+    query = apply_keyword_filter(select(NewsFlash).order_by(desc(NewsFlash.pub_time)), keyword, rank=rank)
+    return [news.title for news in session.exec(query).all()]
+
+def _plan(engine, keyword: str):
+    query = apply_keyword_filter(select(NewsFlash), keyword)
+    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+def test_keyword_search():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = _engine(directory)
+        with Session(engine) as session:
+            # 3 个字符以上走 FTS 索引，标题或正文命中均可，大小写不敏感
+            assert _search(session, "黑客攻击") == ["某交易所遭黑客攻击", "跨链桥漏洞"]
+            assert _search(session, "etf") == ["比特币现货 ETF 净流入"]
+            # 多个词同时命中
+            assert _search(session, "黑客攻击 跨链桥") == ["跨链桥漏洞"]
+            # 1~2 个字符的词走短词索引，可与长词组合
+            assert _search(session, "利率") == ["美联储宣布维持利率不变"]
+            assert _search(session, "黑客攻击 提币") == ["某交易所遭黑客攻击"]
+            assert _search(session, "黑客") == ["某交易所遭黑客攻击", "跨链桥漏洞"]
+            assert _search(session, "Et 币") == ["比特币现货 ETF 净流入"]
+            assert _search(session, "客攻 跨链") == ["跨链桥漏洞"]
+            # 跨越标点或标题/正文边界的不算命中
+            assert _search(session, "漏洞跨") == []
+            assert _search(session, "洞跨") == []
+            assert _search(session, "黑客", rank=True) == ["跨链桥漏洞", "某交易所遭黑客攻击"]
+            # FTS 语法字符按普通文本处理
+            assert _search(session, 'ETF"') == []
+            # 相关度: 命中次数多的排在前面
+            assert _search(session, "黑客攻击", rank=True) == ["跨链桥漏洞", "某交易所遭黑客攻击"]
+
+            # 触发器同步更新与删除
+            news = session.exec(select(NewsFlash).where(NewsFlash.source_id == "search-1")).one()
+            news.title = "美联储宣布降息"
+            session.add(news)
+            session.delete(session.exec(select(NewsFlash).where(NewsFlash.source_id == "search-0")).one())
+            session.commit()
+            assert _search(session, "维持利率") == []
+            assert _search(session, "宣布降息") == ["美联储宣布降息"]
+            assert _search(session, "黑客攻击") == ["跨链桥漏洞"]
+            assert _search(session, "利率") == []
+            assert _search(session, "降息") == ["美联储宣布降息"]
+            assert _search(session, "黑客") == ["跨链桥漏洞"]
+
+        # 走 FTS 索引 + 主键回表，不扫描 newsflash
+        plan = _plan(engine, "黑客攻击")
+        assert plan == ["SCAN newsflash_fts VIRTUAL TABLE INDEX 0:M2", "SEARCH newsflash USING INTEGER PRIMARY KEY (rowid=?)"]
+        # 2 个字符的词同样走全文索引，不扫描 newsflash
+        assert _plan(engine, "黑客") == ["SCAN newsflash_bigram VIRTUAL TABLE INDEX 0:M1", "SEARCH newsflash USING INTEGER PRIMARY KEY (rowid=?)"]
+        assert not any(step.startswith("SCAN newsflash ") for step in _plan(engine, "黑客攻击 提币"))
+        engine.dispose()
+
+def test_highlights_are_escaped():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = _engine(directory)
+        with Session(engine) as session:
+            ids = [news.id for news in session.exec(select(NewsFlash)).all()]
+            highlights = get_highlights(session, ids, "黑客攻击")
+            assert get_highlights(session, ids, "利率") == {}
+
+        news_id = next(news_id for news_id, (title, _) in highlights.items() if str(title) == "跨链桥漏洞")
+        snippet = str(highlights[news_id][1])
+        assert "<mark>黑客攻击</mark>" in snippet and "&lt;b&gt;120&lt;/b&gt;" in snippet and "<b>" not in snippet
+        assert [str(title) for title, _ in highlights.values() if "<mark>" in str(title)] == ["某交易所遭<mark>黑客攻击</mark>"]
+
+        # 模板渲染高亮结果
+        from src.web.routes import templates
+        with Session(engine) as session:
+            news_list = session.exec(select(NewsFlash).where(NewsFlash.id == news_id)).all()
+            html = templates.env.get_template("news_list.html").render(
+                request=SimpleNamespace(url=SimpleNamespace(path="/news")), news_list=news_list, highlights=highlights,
+                page=1, sort="relevance", keyword="黑客攻击",
+            )
+        assert "<mark>黑客攻击</mark>" in html and "&lt;b&gt;120" in html
+        engine.dispose()
+
+if __name__ == "__main__":
+    test_keyword_search()
+    test_highlights_are_escaped()
+    print("✅ 全文检索测试通过")
@@ -0,0 +1,91 @@
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert
+from sqlmodel import Session, desc, select
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.ingest as ingest
+from src.migrations import run_migrations
+from src.models import NewsFlash, NewsTag
+from src.rollup import tag_counts_statement
+from src.scrapers.base import RawNews
+from src.tags import apply_tag_filter, split_tags
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+
+def _news(i: int, tags: str) -> dict:
+    return {
+        "source": "aicoin", "source_id": f"tag-{i}", "title": f"快讯 {i}", "content": "正文",
+        "pub_time": NOW - datetime.timedelta(minutes=i), "created_at": NOW, "updated_at": NOW, "tags": tags,
+        "is_pushed": True, "in_daily_report": False, "in_weekly_report": False,
+    }
+
+def _tagged(session: Session, tag: str):
+    query = apply_tag_filter(select(NewsFlash), tag).order_by(desc(NewsTag.pub_time))
+    return [news.source_id for news in session.exec(query).all()]
+
+def test_backfill_and_filter(db):
+    assert split_tags(" 安全, 黑客,,安全 ") == ["安全", "黑客"]
+    engine = db
+    # 迁移前已有的快讯
+    with engine.begin() as conn:
+        conn.execute(insert(NewsFlash.__table__), [
+            _news(0, "安全,黑客"), _news(1, "安全审计"), _news(2, "ETF"), _news(3, ""), _news(4, "安全"),
+        ])
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        # 精确匹配: "安全" 不再命中 "安全审计"；不区分大小写
+        assert _tagged(session, "安全") == ["tag-0", "tag-4"]
+        assert _tagged(session, "安全审计") == ["tag-1"]
+        assert _tagged(session, "etf") == ["tag-2"]
+        # 仪表盘的标签计数读统计汇总 (迁移时由 news_tag 生成，按入库时间所在小时)
+        counts = dict(session.exec(tag_counts_statement(["安全", "黑客", "宏观"], NOW)).all())
+        assert counts == {"安全": 2, "黑客": 1}
+
+        # 删除快讯时同步删除标签
+        session.delete(session.exec(select(NewsFlash).where(NewsFlash.source_id == "tag-0")).one())
+        session.commit()
+        assert _tagged(session, "安全") == ["tag-4"]
+        assert session.exec(select(NewsTag).where(NewsTag.tag == "黑客")).all() == []
+
+    # 按标签筛选 + 时间倒序分页走 (tag, pub_time) 索引，各标签计数走汇总表的 (tag, bucket) 索引
+    with engine.connect() as conn:
+        query = apply_tag_filter(select(NewsFlash), "安全").where(NewsTag.pub_time >= NOW - datetime.timedelta(days=1))
+        sql = str(query.order_by(desc(NewsTag.pub_time)).limit(20).compile(engine, compile_kwargs={"literal_binds": True}))
+        plan = "\n".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+        assert "SEARCH news_tag USING COVERING INDEX ix_news_tag_tag_pub_time (tag=? AND pub_time>?)" in plan
+        assert "TEMP B-TREE" not in plan and "SCAN" not in plan
+        statement = tag_counts_statement(["安全", "黑客"], NOW)
+        sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+        plan = "\n".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+        assert "ix_stats_rollup_tag_bucket (tag=? AND bucket>?)" in plan
+
+def test_ingest_writes_tags(db, monkeypatch):
+    run_migrations(db)
+    monkeypatch.setattr(ingest, "NEAR_DUP_ENABLED", False)
+    items = [
+        RawNews(source="test", source_id=f"ingest-{i}", title=f"某交易所遭黑客攻击 {i}", content="被盗资金已转入混币器",
+                url="", pub_time=NOW + datetime.timedelta(seconds=i))
+        for i in range(3)
+    ]
+    result = ingest.bulk_ingest([(items[0], ["安全", "黑客"]), (items[1], ["宏观"]), (items[2], [])], rule_version=1, notify=False)
+    assert len(result.inserted) == 2
+
+    with Session(db) as session:
+        rows = session.exec(select(NewsTag).order_by(NewsTag.news_id, NewsTag.tag)).all()
+        news_ids = result.inserted
+        assert [(row.news_id, row.tag, row.pub_time) for row in rows] == sorted([
+            (news_ids["ingest-0"], "安全", items[0].pub_time),
+            (news_ids["ingest-0"], "黑客", items[0].pub_time),
+            (news_ids["ingest-1"], "宏观", items[1].pub_time),
+        ])
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,125 @@
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.web.routes as routes
+from src.config import WEB_BLOCKING_WORKERS
+from src.database import create_async_read_engine, create_write_engine
+from src.migrations import run_migrations
+from src.models import NewsFlash
+from src.pagination import news_count_cache
+from src.web.app import create_app
+from src.web.blocking import run_blocking, shutdown_blocking
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0)
+# 约数百毫秒的纯 CPU 查询 (递归计数)，模拟慢查询
+SLOW_QUERY = text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 2000000) SELECT count(*) FROM c")
+
+def _engines(directory: str):
+    engine = create_write_engine(f"sqlite:///{os.path.join(directory, 'sentinel.db')}")
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
+    with Session(engine) as session:
+        for i in range(3):
+            session.add(NewsFlash(
+                source="aicoin", source_id=f"web-{i}", title=f"交易所遭黑客攻击 {i}", content="黑客攻击损失约 100 万美元",
+                pub_time=NOW - datetime.timedelta(minutes=i), tags="安全",
+            ))
+        session.commit()
+    return engine, create_async_read_engine(engine.url)
+
+def test_pages_use_async_session():
+    news_count_cache.invalidate()
+    with tempfile.TemporaryDirectory() as directory:
+        engine, async_engine = _engines(directory)
+        app = create_app()
+
+        async def _session():
+            async with AsyncSession(async_engine) as session:
+                yield session
+
+        app.dependency_overrides[routes.get_session] = _session
+
+        async def _requests():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = await asyncio.gather(*(
+                    client.get(url) for url in ("/", "/news", "/news?keyword=黑客攻击", "/news/1", "/reports", "/logs")
+                ))
+                assert [response.status_code for response in responses] == [200] * 6
+                dashboard, news, search, detail = (response.text for response in responses[:4])
+                assert "交易所遭黑客攻击 0" in dashboard
+                assert "共 3 条" in news
+                assert "<mark>黑客攻击</mark>" in search
+                assert "交易所遭黑客攻击 0" in detail
+            await async_engine.dispose()
+
+        try:
+            asyncio.run(_requests())
+        finally:
+            news_count_cache.invalidate()
+            engine.dispose()
+
+def test_slow_work_does_not_block_event_loop():
+    with tempfile.TemporaryDirectory() as directory:
+        engine, async_engine = _engines(directory)
+
+        async def _run():
+            ticks = []
+
+            async def _ticker():
+                while True:
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.create_task(_ticker())
+            # 慢查询执行期间事件循环仍在调度其他任务 (心跳间隔不受查询耗时影响)
+            async with AsyncSession(async_engine) as session:
+                start = time.perf_counter()
+                count = (await session.exec(SLOW_QUERY)).one()[0]
+                elapsed = time.perf_counter() - start
+            ticker.cancel()
+            assert count == 2_000_000
+            gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+            assert len(ticks) >= 5 and max(gaps) < elapsed / 2
+
+            # 同步操作的线程池有上限，超出的调用排队
+            active, peak = [0], [0]
+            lock = threading.Lock()
+
+            def _work():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+
+            await asyncio.gather(*(run_blocking(_work) for _ in range(WEB_BLOCKING_WORKERS * 3)))
+            assert peak[0] == WEB_BLOCKING_WORKERS
+            await async_engine.dispose()
+
+        try:
+            asyncio.run(_run())
+        finally:
+            shutdown_blocking()
+            engine.dispose()
+
+if __name__ == "__main__":
+    test_pages_use_async_session()
+    test_slow_work_does_not_block_event_loop()
+    print("✅ Web 异步数据库访问测试通过")